@@ -1,14 +1,18 @@
-from abc import ABC, abstractmethod
-
+import asyncio
 import time
 import pandas as pd
 
-import google.generativeai as genai
-from huggingface_hub import InferenceClient
-from openai import OpenAI
-from anthropic import Anthropic
 from tqdm import tqdm
 
+from roostai.back_end.chatbot.llm_providers import (
+    AnthropicProvider,
+    GeminiProvider,
+    GenerationParams,
+    HuggingFaceProvider,
+    LLMProvider,
+    OpenAIProvider,
+)
+
 # Enable tqdm support for all pandas operations
 tqdm.pandas()
 
@@ -24,17 +28,21 @@ def _get_column_average(df: pd.DataFrame, column: str) -> float:
     return df[column].progress_apply(lambda x: len(x.split())).mean()
 
 
-class LLM(ABC):
-    def __init__(self, name: str, token: str, df: pd.DataFrame):
+class LLM:
+    def __init__(self, name: str, token: str, df: pd.DataFrame, provider: LLMProvider):
         """
         Initialize the LLM.
         @param name: The name of the LLM.
         @param token: The token for the API.
         @param df: The DataFrame of questions and answers.
+        @param provider: The provider used to query the LLM.
         """
         self.name: str = name
         self.token: str = token
         self.df: pd.DataFrame = df
+        self.provider: LLMProvider = provider
+        # Async clients are bound to the loop they were first used on, so reuse one loop
+        self.loop = asyncio.new_event_loop()
 
         # Get the average length of the questions and answers. Round to the nearest 10
         avg_question_length: int = round(_get_column_average(df, "answer")) // 10 * 10
@@ -55,9 +63,25 @@ class LLM(ABC):
             "interested in learning more about USC."
         )
 
-    @abstractmethod
     def get_response(self, question: str) -> str:
-        pass  # Leave for subclasses
+        """
+        Get a response from the LLM provider given a prompt.
+        @param question: The question to send to the LLM.
+        @return: The response from the LLM.
+        """
+        question = question + " " + self.prompt_addition
+
+        response = self.loop.run_until_complete(
+            self.provider.generate(
+                question,
+                GenerationParams(max_tokens=2048, system_prompt=self.system_prompt),
+            )
+        )
+
+        # To avoid overloading the API, sleep
+        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
+        time.sleep(2)
+        return response
 
     def get_responses(self) -> pd.Series:
         """
@@ -71,35 +95,15 @@ class LLM(ABC):
 class phi_3_5_mini_ins(LLM):
     def __init__(self, df, token):
         """
-        Initialize the Meta Llama 3 8B LLM.
+        Initialize the Microsoft Phi 3.5 mini LLM.
         @param df: The DataFrame of questions and answers.
         """
-        super().__init__("Phi-3.5-mini-ins ", token, df)
-
-    def get_response(self, question: str) -> str:
-        """
-        Get response from the HuggingFace serverless API given a prompt.
-        @param question: The question to send to the LLM.
-        @return: The response from the LLM.
-        """
-        question = question + " " + self.prompt_addition
-
-        client = InferenceClient("microsoft/Phi-3.5-mini-instruct", token=self.token)
-
-        return_str: str = ""
-
-        for message in client.chat_completion(
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": question},
-            ],
-            max_tokens=2048,
-            stream=True,
-        ):
-            return_str += message.choices[0].delta.content
-        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
-        time.sleep(2)
-        return return_str
+        super().__init__(
+            "Phi-3.5-mini-ins ",
+            token,
+            df,
+            HuggingFaceProvider("microsoft/Phi-3.5-mini-instruct", token=token),
+        )
 
 
 class llama_3_8b_ins(LLM):
@@ -108,35 +112,13 @@ class llama_3_8b_ins(LLM):
         Initialize the Meta Llama 3 8B LLM.
         @param df: The DataFrame of questions and answers.
         """
-        super().__init__("Meta-Llama-3-8B-Instruct", token, df)
-
-    def get_response(self, question: str) -> str:
-        """
-        Get response from the HuggingFace serverless API given a prompt.
-        @param question: The question to send to the LLM.
-        @return: The response from the LLM.
-        """
-        question = question + " " + self.prompt_addition
-
-        client = InferenceClient(
-            "meta-llama/Meta-Llama-3-8B-Instruct", token=self.token
+        super().__init__(
+            "Meta-Llama-3-8B-Instruct",
+            token,
+            df,
+            HuggingFaceProvider("meta-llama/Meta-Llama-3-8B-Instruct", token=token),
         )
 
-        return_str: str = ""
-
-        for message in client.chat_completion(
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": question},
-            ],
-            max_tokens=2048,
-            stream=True,
-        ):
-            return_str += message.choices[0].delta.content
-        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
-        time.sleep(2)
-        return return_str
-
 
 class gemini_flash(LLM):
     def __init__(self, df, token):
@@ -144,23 +126,12 @@ class gemini_flash(LLM):
         Initialize the Gemini 1.5 Flash LLM.
         @param df: The DataFrame of questions and answers.
         """
-        super().__init__("gemini-1.5-flash", token, df)
-
-    def get_response(self, question: str) -> str:
-        """
-        Get response from the Gemini API given a prompt.
-        @param question: The question to send to the LLM.
-        @return: The response from the LLM.
-        """
-        question = question + " " + self.prompt_addition
-
-        genai.configure(api_key=self.token)
-        model = genai.GenerativeModel(
-            "gemini-1.5-flash", system_instruction=self.system_prompt
+        super().__init__(
+            "gemini-1.5-flash",
+            token,
+            df,
+            GeminiProvider("gemini-1.5-flash", token=token),
         )
-        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
-        time.sleep(2)
-        return model.generate_content(question).text
 
 
 class mixtral_8x7b_ins(LLM):
@@ -169,35 +140,13 @@ class mixtral_8x7b_ins(LLM):
         Initialize the Mixtral 8x7B LLM.
         @param df: The DataFrame of questions and answers.
         """
-        super().__init__("mixtral-8x7B-instruct", token, df)
-
-    def get_response(self, question: str) -> str:
-        """
-        Get response from the HuggingFace serverless API given a prompt.
-        @param question: The question to send to the LLM.
-        @return: The response from the LLM.
-        """
-        question = question + " " + self.prompt_addition
-
-        client = InferenceClient(
-            "mistralai/Mixtral-8x7B-Instruct-v0.1", token=self.token
+        super().__init__(
+            "mixtral-8x7B-instruct",
+            token,
+            df,
+            HuggingFaceProvider("mistralai/Mixtral-8x7B-Instruct-v0.1", token=token),
         )
 
-        return_str: str = ""
-
-        for message in client.chat_completion(
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": question},
-            ],
-            max_tokens=2048,
-            stream=True,
-        ):
-            return_str += message.choices[0].delta.content
-        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
-        time.sleep(2)
-        return return_str
-
 
 class claude_sonnet(LLM):
     def __init__(self, df, token):
@@ -205,31 +154,13 @@ class claude_sonnet(LLM):
         Initialize the Claude 3.5 Sonnet LLM.
         @param df: The DataFrame of questions and answers.
         """
-        super().__init__("claude-3.5-sonnet", token, df)
-
-    def get_response(self, question: str) -> str:
-        """
-        Get a response from the Anthropic API given a prompt.
-        @param question: The question to send to the LLM.
-        @return: The response from the LLM.
-        """
-        question = question + " " + self.prompt_addition
-
-        client = Anthropic()
-
-        message = client.messages.create(
-            max_tokens=2048,
-            system=self.system_prompt,
-            messages=[{"role": "user", "content": question,}],
-            model="claude-3-5-sonnet-20240620",
+        super().__init__(
+            "claude-3.5-sonnet",
+            token,
+            df,
+            AnthropicProvider("claude-3-5-sonnet-20240620", token=token),
         )
 
-        # To avoid overloading the API, sleep
-        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
-        time.sleep(2)
-
-        return message.content[0].text
-
 
 class gpt_4o(LLM):
     def __init__(self, df, token):
@@ -237,61 +168,15 @@ class gpt_4o(LLM):
         Initialize the OpenAI GPT-4o LLM.
         @param df: The DataFrame of questions and answers.
         """
-        super().__init__("gpt-4o", token, df)
-
-    def get_response(self, question: str) -> str:
-        """
-        Get a response from the OpenAI API given a prompt.
-        @param question: The question to send to the LLM.
-        @return: The response from the LLM.
-        """
-        question = question + " " + self.prompt_addition
-
-        client = OpenAI()
-
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": question},
-            ],
-        )
-
-        # To avoid overloading the API, sleep
-        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
-        time.sleep(2)
-
-        return completion.choices[0].message.content
+        super().__init__("gpt-4o", token, df, OpenAIProvider("gpt-4o", token=token))
 
 
 class gpt_4o_mini(LLM):
     def __init__(self, df, token):
         """
-        Initialize the OpenAI GPT-4o LLM.
+        Initialize the OpenAI GPT-4o mini LLM.
         @param df: The DataFrame of questions and answers.
         """
-        super().__init__("gpt-4o-mini", token, df)
-
-    def get_response(self, question: str) -> str:
-        """
-        Get a response from the OpenAI API given a prompt.
-        @param question: The question to send to the LLM.
-        @return: The response from the LLM.
-        """
-        question = question + " " + self.prompt_addition
-
-        client = OpenAI()
-
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": question},
-            ],
+        super().__init__(
+            "gpt-4o-mini", token, df, OpenAIProvider("gpt-4o-mini", token=token)
         )
-
-        # To avoid overloading the API, sleep
-        # print(f"Sleeping for 2 seconds to avoid overloading the API...")
-        time.sleep(2)
-
-        return completion.choices[0].message.content
@@ -6,6 +6,7 @@ import logging
 from pathlib import Path
 from datetime import datetime
 
+from roostai.back_end.chatbot.config import Config
 from roostai.back_end.main import UniversityChatbot
 
 logging.basicConfig(
@@ -28,7 +29,10 @@ class LocalRAGTester:
     async def initialize(self, db_path: str):
         """Initialize the chatbot and load data."""
         try:
-            self.chatbot = UniversityChatbot(db_path)
+            # The FAQ fast path would answer the evaluation questions from the ground truth
+            config = Config.load_config()
+            config.faq.enabled = False
+            self.chatbot = UniversityChatbot(db_path, config=config)
 
             # Verify database has documents
             doc_count = await self.chatbot.get_document_count()
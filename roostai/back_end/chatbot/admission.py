@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from .config import AdmissionConfig
+from .metrics import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a pipeline stage is saturated and does not accept more work."""
+
+    def __init__(self, stage: str, retry_after: float):
+        super().__init__(
+            f"Stage '{stage}' is saturated, retry after {retry_after:.1f}s"
+        )
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StageLimiter:
+    """Bounded concurrency with a bounded FIFO queue for one pipeline stage.
+
+    Requests beyond `max_concurrency` wait in a queue of at most `max_queue`
+    entries for at most `max_wait` seconds; anything else is rejected right away
+    with an estimate of when to retry. Waiters may live on different event loops
+    (Streamlit runs every script thread with its own `asyncio.run`), so the state
+    is guarded by a thread lock and waiters are woken through their own loop.
+    """
+
+    def __init__(
+        self, name: str, max_concurrency: int, max_queue: int, max_wait: float
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_queue_depth = 0
+        self.wait_times = LatencyTracker()
+        self.service_times = LatencyTracker()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.waiters)
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the stage's capacity (slots plus queue) in use."""
+        capacity = self.max_concurrency + self.max_queue
+        return (self.active + len(self.waiters)) / capacity
+
+    def retry_after(self) -> float:
+        """Estimated time until a new request would be served."""
+        service_time = self.service_times.percentile(0.5) or 0.1
+        return (len(self.waiters) + 1) * service_time / self.max_concurrency
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """Take a slot, waiting in the queue if needed; raises AdmissionRejected."""
+        start = time.monotonic()
+        with self._lock:
+            if self.active < self.max_concurrency and not self.waiters:
+                self.active += 1
+                self.admitted += 1
+                self.wait_times.add(0.0)
+                return
+
+            if len(self.waiters) >= self.max_queue:
+                self.rejected += 1
+                rejection = AdmissionRejected(self.name, self.retry_after())
+                logger.warning(str(rejection))
+                raise rejection
+
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            self.max_queue_depth = max(self.max_queue_depth, len(self.waiters))
+
+        max_wait = self.max_wait if timeout is None else min(self.max_wait, timeout)
+        try:
+            await asyncio.wait_for(waiter, timeout=max_wait)
+        except asyncio.TimeoutError:
+            with self._lock:
+                still_queued = waiter in self.waiters
+                if still_queued:
+                    self.waiters.remove(waiter)
+                self.timed_out += 1
+            if not still_queued and not waiter.cancelled():
+                # The slot was handed over just as the wait timed out; give it back.
+                # (If the waiter was cancelled first, `release` passes the slot on.)
+                self.release()
+            rejection = AdmissionRejected(self.name, self.retry_after())
+            logger.warning(f"{rejection} (queue wait timed out)")
+            raise rejection
+
+        with self._lock:
+            self.admitted += 1
+        self.wait_times.add(time.monotonic() - start)
+
+    def release(self):
+        """Free a slot, handing it directly to the oldest waiter if there is one."""
+        with self._lock:
+            if not self.waiters:
+                self.active -= 1
+                return
+            waiter = self.waiters.popleft()
+
+        def _wake():
+            if not waiter.done():
+                waiter.set_result(None)
+            else:
+                # The waiter gave up before it was woken
+                self.release()
+
+        waiter.get_loop().call_soon_threadsafe(_wake)
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None):
+        await self.acquire(timeout)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.service_times.add(time.monotonic() - start)
+            self.release()
+
+    def snapshot(self) -> Dict:
+        """Queue depth and wait-time metrics of the stage."""
+        return {
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_p50": self.wait_times.percentile(0.5),
+            "wait_p95": self.wait_times.percentile(0.95),
+            "service_p50": self.service_times.percentile(0.5),
+        }
+
+
+class AdmissionController:
+    """Per-stage admission control for `UniversityChatbot.process_query`."""
+
+    def __init__(self, config: AdmissionConfig):
+        self.enabled = config.enabled
+        self.policy = config.policy
+        self.stages = {
+            stage: StageLimiter(
+                stage,
+                max_concurrency=concurrency,
+                max_queue=config.max_queue_depth,
+                max_wait=config.max_queue_wait,
+            )
+            for stage, concurrency in config.stage_concurrency.items()
+        }
+
+    @asynccontextmanager
+    async def slot(self, stage: str, timeout: Optional[float] = None):
+        """Hold a slot of `stage` for the duration of the block."""
+        limiter = self.stages.get(stage)
+        if not self.enabled or limiter is None:
+            yield
+            return
+
+        async with limiter.slot(timeout):
+            yield
+
+    def load(self) -> float:
+        """Utilization of the most loaded stage (0 = idle, 1 = saturated)."""
+        if not self.enabled or not self.stages:
+            return 0.0
+        return max(limiter.utilization for limiter in self.stages.values())
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {stage: limiter.snapshot() for stage, limiter in self.stages.items()}
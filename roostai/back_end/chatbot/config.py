@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -6,6 +7,14 @@ class ModelConfig:
     embedding_model: str = "all-MiniLM-L6-v2"
     cross_encoder_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     llm_model: str = "mistralai/Mixtral-8x7B-Instruct-v0.1"
+    # Backend serving `llm_model`: "huggingface", "openai", "anthropic", "gemini" or "local"
+    # ("local" is an offline stand-in for load tests and benchmarks, see `llm_providers.py`)
+    llm_provider: str = "huggingface"
+    # Optional pool of "provider:model" specs; when set, requests are routed to the fastest
+    # healthy entry (see `llm_router.py`) instead of `llm_provider`/`llm_model`. Examples:
+    # "huggingface:mistralai/Mixtral-8x7B-Instruct-v0.1", "huggingface:meta-llama/Meta-Llama-3-8B-Instruct",
+    # "huggingface:https://<endpoint>.endpoints.huggingface.cloud", "openai:gpt-4o-mini"
+    llm_providers: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -17,6 +26,10 @@ class ThresholdConfig:
     # Primarily used in `quality_checker.py` and `llm_manager` - Also using cross-encoder scores
     quality_min_score: float = -2.0
 
+    # Quality check threshold when documents keep their vector similarity scores (no
+    # reranking in degraded modes), which are on a different scale than cross-encoder scores
+    vector_quality_min_score: float = 0.4
+
     # Minimum number of documents required for quality check; Primarily used in `quality_checker.py`
     quality_min_docs: int = 1
 
@@ -27,6 +40,15 @@ class VectorDBConfig:
     db_path: str = "/Users/nitingupta/usc/projects/RoostAI/roostai/data/v2"
     collection_name: str = "university_docs"
     top_k: int = 5
+    # Serve retrieval from a memory-mapped index snapshot (`scripts/index_snapshot.py`)
+    # instead of the Chroma database at `db_path`
+    snapshot_path: Optional[str] = None
+
+    # Blue/green index switching (`index_manager.py`): a JSON pointer naming the
+    # version and db_path/snapshot_path to serve; overrides the two settings above
+    index_pointer: Optional[str] = None
+    index_poll_interval: float = 5.0  # Seconds between checks of the pointer
+    index_drain_seconds: float = 30.0  # Keep a replaced index open this long
 
 
 @dataclass
@@ -36,6 +58,222 @@ class LLMConfig:
     top_p: float = 0.9
     repetition_penalty: float = 1.1
 
+    # Upper bound for a single LLM call; a call never gets more than the remaining request budget
+    attempt_timeout: float = 5.0
+
+    # Maximum number of LLM calls per query (retries happen when the <response> tags are missing)
+    max_attempts: int = 2
+
+    # Expected duration of an LLM call until enough latencies have been observed;
+    # a retry is only started if this estimate fits in the remaining budget
+    default_latency_estimate: float = 2.0
+
+    # Hedged requests: send a second identical request when the first one is slower
+    # than the observed `hedge_percentile` latency; whichever answers first wins
+    hedge_requests: bool = False
+    hedge_percentile: float = 0.95
+    # Number of observed latencies required before hedging kicks in
+    hedge_min_samples: int = 20
+
+    # Multi-provider routing (only used when `ModelConfig.llm_providers` is set)
+    router_provider_timeout: float = 2.5  # Per-provider timeout before failing over
+    router_failure_threshold: int = (
+        3  # Consecutive failures that open the circuit breaker
+    )
+    router_cooldown: float = 30.0  # Seconds a provider with an open circuit is skipped
+    router_ewma_alpha: float = 0.2  # Smoothing of the latency/error profile
+
+    # Behaviour of the "local" stand-in provider
+    local_latency: float = 0.2  # Time to first token (seconds)
+    local_tokens_per_second: float = 50.0
+    local_response_tokens: int = 64
+    local_failure_rate: float = 0.0
+
+
+@dataclass
+class CacheConfig:
+    # On-disk LRU cache of LLM responses, keyed by model, sampling params, query and context chunks
+    response_cache_enabled: bool = True
+    response_cache_path: str = "cache/responses.sqlite3"
+    response_cache_max_entries: int = 10000
+
+    # Content-addressed embedding store (text hash + model -> vector, memory-mapped
+    # shards) written by ingestion; query embedding only reads it. See `embedding_store.py`
+    embedding_store_enabled: bool = True
+    embedding_store_dir: str = "cache/embeddings"
+    embedding_store_shard_size: int = 65536  # Vectors per shard file
+
+
+@dataclass
+class PipelineConfig:
+    # End-to-end latency budget (seconds) for a single query, passed through all stages
+    request_deadline: float = 10.0
+
+
+@dataclass
+class AdmissionConfig:
+    # Bound the work admitted to each `process_query` stage instead of letting requests pile up
+    enabled: bool = True
+    # "reject": fail fast with a retry-after hint when a stage is saturated
+    # "degrade": skip reranking / answer from the response cache only where possible, else reject
+    policy: str = "degrade"
+    # Maximum concurrent requests per stage
+    stage_concurrency: Dict[str, int] = field(
+        default_factory=lambda: {"embedding": 4, "search": 8, "rerank": 2, "llm": 8}
+    )
+    # Requests beyond the concurrency limit wait in a queue of this size per stage...
+    max_queue_depth: int = 32
+    # ...for at most this many seconds before being rejected
+    max_queue_wait: float = 2.0
+
+
+@dataclass
+class DegradationConfig:
+    # Degradation ladder for `process_query`, driven by the load signal: the larger of the
+    # admission utilization and the recent p95 latency divided by `target_latency`.
+    # Opt-in: it trades answer quality for latency under sustained load
+    enabled: bool = False
+    # Load at which each step is entered (see `degradation.DegradationMode`)
+    thresholds: Dict[str, float] = field(
+        default_factory=lambda: {
+            "reduced_top_k": 0.5,
+            "cascade_rerank": 0.6,
+            "no_rerank": 0.7,
+            "short_context": 0.8,
+            "cache_only": 0.95,
+        }
+    )
+    # A step is left once the load is this far below its threshold
+    hysteresis: float = 0.1
+    target_latency: float = 6.0
+    # Only latencies from the last `latency_window` seconds count towards the load
+    latency_window: float = 30.0
+    # The latency term counts only with this many queries in the window, so a
+    # single slow LLM call does not degrade an otherwise idle chatbot
+    min_latency_samples: int = 20
+
+    reduced_top_k: int = 3
+    cascade_rerank_k: int = 2  # Vector hits passed to the cross-encoder in cascade mode
+    short_context_docs: int = 1  # Chunks sent to the LLM in short-context mode
+    extractive_max_chars: int = 600  # Length of extractive answers in cache-only mode
+
+
+@dataclass
+class WarmupConfig:
+    # Run representative queries through embedding, search and reranking at startup
+    enabled: bool = True
+    # FAQ question files (relative to the repository root) used as warmup queries
+    faq_files: List[str] = field(
+        default_factory=lambda: [
+            "eval/ragas_evaluation/data/faq_pairs.csv",
+            "eval/first_faq_evaluation/data/faq_pairs.csv",
+        ]
+    )
+    # Recent queries from the query logs are used first, if available
+    query_log_dir: str = "query_logs"
+    max_queries: int = 50
+
+
+@dataclass
+class FAQConfig:
+    # Answer close matches of curated FAQ questions directly, skipping search, reranking and the LLM
+    enabled: bool = True
+    # Precomputed index (see `scripts/build_faq_index.py`), relative to the repository root
+    index_path: str = "roostai/data/faq_index.npz"
+    # Build the index from `faq_files` at startup if `index_path` does not exist
+    build_if_missing: bool = True
+    faq_files: List[str] = field(
+        default_factory=lambda: ["eval/ragas_evaluation/data/faq_pairs.csv"]
+    )
+    # Minimum cosine similarity between the query and an FAQ question to use its answer
+    min_score: float = 0.92
+
+
+@dataclass
+class RuntimeConfig:
+    # Torch thread counts applied at startup; None uses the values tuned for this host by
+    # `scripts/tune_threads.py` (if `apply_tuned_settings`), else torch's defaults
+    torch_intra_op_threads: Optional[int] = None
+    torch_inter_op_threads: Optional[int] = None
+    apply_tuned_settings: bool = True
+    thread_settings_path: str = "roostai/data/thread_settings.json"
+
+
+@dataclass
+class WorkerConfig:
+    # Pre-fork worker mode (`python -m roostai.back_end.workers`): workers share the
+    # parent's model weights copy-on-write. None uses the tuned values (see `RuntimeConfig`),
+    # else 4 workers with one torch thread each
+    num_workers: Optional[int] = None
+    torch_threads_per_worker: Optional[int] = None
+
+
+@dataclass
+class QueryLogConfig:
+    # Query results are appended to JSONL segments by a background thread (see `query_log.py`)
+    enabled: bool = True
+    log_dir: str = "query_logs"
+    # A segment is closed once it reaches either limit (bytes of UTF-8 JSONL, before gzip)
+    max_segment_bytes: int = 64 * 1024 * 1024
+    max_segment_seconds: float = 3600.0
+    compress: bool = False  # gzip closed segments
+    # "batch": fsync after every written batch, "rotate": only when a segment is closed, "never"
+    fsync: str = "rotate"
+    batch_size: int = 256
+    flush_interval: float = 1.0  # Seconds a record may wait before its batch is written
+    # Records waiting to be written; when full, "drop" discards new records (and counts
+    # them) while "block" makes `log_query` wait up to `block_timeout` seconds first
+    queue_size: int = 10000
+    overflow: str = "drop"
+    block_timeout: float = 0.05
+
+
+@dataclass
+class LoggingConfig:
+    level: str = "INFO"
+    # "text" uses `text_format`; "json" writes one JSON object per line, including `extra=` fields
+    format: str = "text"
+    text_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    # None writes to "<script name>.log", as `logging.basicConfig` did before; "" disables the file
+    log_file: Optional[str] = None
+    # Format and write records on a background thread (QueueHandler/QueueListener)
+    use_queue: bool = True
+    # Fraction of DEBUG records kept per logger, for per-query detail on the hot path
+    sample_rates: Dict[str, float] = field(
+        default_factory=lambda: {
+            "roostai.back_end.chatbot.reranker": 0.01,
+            "roostai.back_end.chatbot.quality_checker": 0.01,
+            "roostai.back_end.chatbot.vector_store": 0.01,
+        }
+    )
+
+
+@dataclass
+class IngestionConfig:
+    # Chunks per `SentenceTransformer.encode` call when embedding documents in bulk
+    embedding_batch_size: int = 64
+    # Encode with this many worker processes (sentence-transformers multi-process pool);
+    # 1 encodes in the ingesting process
+    encode_processes: int = 1
+
+    # Streaming ingestion pipeline (readers -> dedup -> embedders -> writer)
+    reader_threads: int = 2
+    embed_workers: int = 1
+    queue_size: int = 8  # Items (files or batches) waiting in front of each stage
+    report_interval: float = 30.0  # Seconds between throughput / queue depth logs
+
+    # Skip files whose content is unchanged since the last run (see the manifest
+    # in `scripts/ingestion_manifest.py`); False re-ingests every file
+    incremental: bool = True
+
+    # Chunk deduplication (`scripts/dedup_store.py`): exact duplicates by content
+    # hash, near-duplicates by MinHash/LSH over word shingles
+    near_duplicates: bool = True
+    near_duplicate_threshold: float = 0.85  # Estimated Jaccard similarity
+    minhash_permutations: int = 128
+    lsh_bands: int = 16  # Must divide `minhash_permutations`
+    shingle_size: int = 5  # Words per shingle
+
 
 @dataclass
 class Config:
@@ -43,6 +281,17 @@ class Config:
     thresholds: ThresholdConfig
     vector_db: VectorDBConfig
     llm: LLMConfig
+    pipeline: PipelineConfig
+    cache: CacheConfig
+    admission: AdmissionConfig
+    degradation: DegradationConfig
+    warmup: WarmupConfig
+    faq: FAQConfig
+    runtime: RuntimeConfig
+    workers: WorkerConfig
+    query_log: QueryLogConfig
+    logging: LoggingConfig
+    ingestion: IngestionConfig
 
     @classmethod
     def load_config(cls) -> "Config":
@@ -53,6 +302,17 @@ class Config:
             "thresholds": ThresholdConfig(),
             "vector_db": VectorDBConfig(),
             "llm": LLMConfig(),
+            "pipeline": PipelineConfig(),
+            "cache": CacheConfig(),
+            "admission": AdmissionConfig(),
+            "degradation": DegradationConfig(),
+            "warmup": WarmupConfig(),
+            "faq": FAQConfig(),
+            "runtime": RuntimeConfig(),
+            "workers": WorkerConfig(),
+            "query_log": QueryLogConfig(),
+            "logging": LoggingConfig(),
+            "ingestion": IngestionConfig(),
         }
 
         return cls(**default_config)
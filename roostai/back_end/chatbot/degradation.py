@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Callable, Deque, List, Optional, Tuple
+
+from .config import DegradationConfig
+from .types import Document
+
+
+class DegradationMode(IntEnum):
+    """Steps of the degradation ladder; every step includes the ones before it."""
+
+    NORMAL = 0
+    REDUCED_TOP_K = 1  # Retrieve fewer candidates
+    CASCADE_RERANK = 2  # Cross-encode only the best vector hits
+    NO_RERANK = 3  # Keep the vector search ranking
+    SHORT_CONTEXT = 4  # Send fewer chunks to the LLM
+    CACHE_ONLY = 5  # No LLM call: cached or extractive answers only
+
+
+class DegradationController:
+    """Picks a degradation mode for each query from the current load.
+
+    The load is the larger of the admission controller's utilization and the
+    recent p95 end-to-end latency relative to `target_latency`, which only counts
+    once `min_latency_samples` queries finished within the window. Modes are entered
+    as soon as the load crosses their threshold and left one step at a time once
+    it drops `hysteresis` below, so the ladder does not flap.
+    """
+
+    def __init__(
+        self, config: DegradationConfig, utilization: Callable[[], float] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.utilization = utilization or (lambda: 0.0)
+        self.thresholds = {
+            DegradationMode[name.upper()]: value
+            for name, value in config.thresholds.items()
+        }
+        self.mode = DegradationMode.NORMAL
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=500)
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float):
+        """Record the end-to-end latency of a finished query."""
+        with self._lock:
+            self._latencies.append((time.monotonic(), latency))
+
+    def _latency_p95(self) -> float:
+        cutoff = time.monotonic() - self.config.latency_window
+        with self._lock:
+            while self._latencies and self._latencies[0][0] < cutoff:
+                self._latencies.popleft()
+            recent = sorted(latency for _, latency in self._latencies)
+        if len(recent) < max(1, self.config.min_latency_samples):
+            return 0.0
+        return recent[min(len(recent) - 1, int(0.95 * len(recent)))]
+
+    def load(self) -> float:
+        """Current load signal (0 = idle, 1 = at capacity / at the latency target)."""
+        return max(self.utilization(), self._latency_p95() / self.config.target_latency)
+
+    def current_mode(self) -> DegradationMode:
+        """Mode for the next query."""
+        if not self.config.enabled:
+            return DegradationMode.NORMAL
+
+        load = self.load()
+        target = DegradationMode.NORMAL
+        for mode, threshold in self.thresholds.items():
+            if load >= threshold and mode > target:
+                target = mode
+
+        with self._lock:
+            previous = self.mode
+            if target > self.mode:
+                self.mode = target
+            elif (
+                target < self.mode
+                and load < self.thresholds.get(self.mode, 0.0) - self.config.hysteresis
+            ):
+                self.mode = DegradationMode(self.mode - 1)
+            mode = self.mode
+
+        if mode != previous:
+            self.logger.warning(
+                f"Degradation mode {previous.name} -> {mode.name} (load {load:.2f})"
+            )
+        return mode
+
+
+def extractive_answer(documents: List[Document], max_chars: int) -> Optional[str]:
+    """Answer with the opening sentences of the best-ranked chunk."""
+    if not documents:
+        return None
+
+    content = documents[0].content.strip()
+    if len(content) <= max_chars:
+        return content
+
+    # Cut at the last sentence boundary that fits
+    excerpt = content[:max_chars]
+    end = excerpt.rfind(". ")
+    return excerpt[: end + 1] if end > 0 else excerpt.rstrip() + "..."
@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Bound parameters per SQLite statement (older builds allow at most 999)
+_MAX_PARAMETERS = 500
+
+
+class EmbeddingStore:
+    """Content-addressed on-disk store of embeddings: (model, text) -> vector.
+
+    Vectors live in fixed-size float32 shard files (`shard_00000.f32`, ...) that
+    are memory-mapped, so lookups read straight from the page cache. A SQLite
+    index maps a hash of each text to its shard and row. Every model has its own
+    directory, so the same text embedded by another model never matches.
+
+    Several processes can share a store (e.g. ingestion of several databases and
+    the chatbot workers): rows are allocated and indexed in one write transaction,
+    after the vector has been written, so readers never see unwritten rows.
+    """
+
+    INDEX_FILENAME = "index.sqlite3"
+
+    def __init__(
+        self, directory: str, model_id: str, dimension: int, shard_size: int = 65536
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory) / re.sub(r"[^\w.-]+", "_", model_id)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.model_id = model_id
+        self.dimension = dimension
+        self.shard_size = shard_size
+        self.hits = 0
+        self.misses = 0
+        self._connect()
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._shards: Dict[int, np.memmap] = {}  # Writable maps, used by `put_many`
+        self._readers: Dict[int, np.memmap] = {}  # Read-only maps, used by lookups
+        self._conn = sqlite3.connect(
+            str(self.directory / self.INDEX_FILENAME),
+            check_same_thread=False,
+            isolation_level=None,  # Transactions are explicit (BEGIN IMMEDIATE)
+            timeout=30.0,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "key BLOB PRIMARY KEY, shard INTEGER NOT NULL, row INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS info (name TEXT PRIMARY KEY, value INTEGER)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO info VALUES ('dimension', ?), ('shard_size', ?), "
+            "('next_slot', 0)",
+            (self.dimension, self.shard_size),
+        )
+        info = dict(self._conn.execute("SELECT name, value FROM info"))
+        if (info["dimension"], info["shard_size"]) != (
+            self.dimension,
+            self.shard_size,
+        ):
+            raise ValueError(
+                f"Embedding store {self.directory} holds {info['dimension']}-d vectors "
+                f"in shards of {info['shard_size']}, expected {self.dimension}-d "
+                f"in shards of {self.shard_size}"
+            )
+
+    def reopen(self):
+        """Open a new index connection, e.g. in a forked worker."""
+        self._connect()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.sha256(text.encode()).digest()[:16]
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.directory / f"shard_{shard:05d}.f32"
+
+    def _reader(self, shard: int) -> Optional[np.memmap]:
+        """Read-only map of an existing shard, or None if it is missing.
+
+        Lookups never create, extend or write shard files; only `put_many` does.
+        """
+        if shard in self._shards:
+            return self._shards[shard]
+        if shard not in self._readers:
+            path = self._shard_path(shard)
+            try:
+                if path.stat().st_size < self.shard_size * self.dimension * 4:
+                    return None
+            except FileNotFoundError:
+                return None
+            self._readers[shard] = np.memmap(
+                path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self.shard_size, self.dimension),
+            )
+        return self._readers[shard]
+
+    def _shard(self, shard: int) -> np.memmap:
+        """Writable map of a shard, creating it if needed."""
+        if shard not in self._shards:
+            path = self._shard_path(shard)
+            size = self.shard_size * self.dimension * 4
+            # Shards are created at full size (sparse), so maps stay valid as they fill
+            with open(path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            self._shards[shard] = np.memmap(
+                path,
+                dtype=np.float32,
+                mode="r+",
+                shape=(self.shard_size, self.dimension),
+            )
+        return self._shards[shard]
+
+    def _locate(self, keys: List[bytes]) -> Dict[bytes, Tuple[int, int]]:
+        locations = {}
+        for start in range(0, len(keys), _MAX_PARAMETERS):
+            batch = keys[start : start + _MAX_PARAMETERS]
+            locations.update(
+                (key, (shard, row))
+                for key, shard, row in self._conn.execute(
+                    "SELECT key, shard, row FROM vectors WHERE key IN ("
+                    + ", ".join("?" for _ in batch)
+                    + ")",
+                    batch,
+                )
+            )
+        return locations
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        vectors, missing = self.get_many([text])
+        return None if missing else vectors[0]
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """Look up `texts`; returns their vectors and the indices of texts not stored.
+
+        Rows of missing texts are left uninitialized.
+        """
+        keys = [self._key(text) for text in texts]
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        missing = []
+        with self._lock:
+            locations = self._locate(keys)
+            for i, key in enumerate(keys):
+                location = locations.get(key)
+                shard = None if location is None else self._reader(location[0])
+                if shard is None:
+                    missing.append(i)
+                else:
+                    vectors[i] = shard[location[1]]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return vectors, missing
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Store the vectors of `texts`; texts already stored are skipped."""
+        keys = list(dict.fromkeys(self._key(text) for text in texts))
+        rows = {self._key(text): i for i, text in enumerate(texts)}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have stored some of them in the meantime
+                existing = self._locate(keys)
+                new_keys = [key for key in keys if key not in existing]
+                next_slot = self._conn.execute(
+                    "SELECT value FROM info WHERE name = 'next_slot'"
+                ).fetchone()[0]
+
+                index_rows = []
+                touched = set()
+                for slot, key in enumerate(new_keys, start=next_slot):
+                    shard, row = divmod(slot, self.shard_size)
+                    self._shard(shard)[row] = vectors[rows[key]]
+                    touched.add(shard)
+                    index_rows.append((key, shard, row))
+                for shard in touched:
+                    self._shards[shard].flush()
+
+                self._conn.executemany(
+                    "INSERT INTO vectors (key, shard, row) VALUES (?, ?, ?)", index_rows
+                )
+                self._conn.execute(
+                    "UPDATE info SET value = ? WHERE name = 'next_slot'",
+                    (next_slot + len(new_keys),),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def put(self, text: str, vector: np.ndarray):
+        self.put_many([text], np.asarray(vector, dtype=np.float32)[None, :])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT value FROM info WHERE name = 'next_slot'"
+            ).fetchone()[0]
+        return {"stored": stored, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            for shard in self._shards.values():
+                shard.flush()
+            self._shards.clear()
+            self._readers.clear()
+            self._conn.close()
+        self.logger.info(
+            f"Embedding store {self.directory}: {self.hits} hits, {self.misses} misses"
+        )
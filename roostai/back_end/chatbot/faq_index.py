@@ -0,0 +1,118 @@
+import csv
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .warmup import resolve_path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FAQMatch:
+    question: str
+    answer: str
+    score: float  # Cosine similarity between the query and the FAQ question
+
+
+def load_faq_pairs(csv_files: List[str]) -> List[Tuple[str, str]]:
+    """Read (question, answer) pairs from FAQ CSVs, keeping the first answer per question."""
+    pairs = []
+    seen = set()
+    for csv_file in csv_files:
+        path = resolve_path(csv_file)
+        if not path.exists():
+            logger.warning(f"FAQ file not found: {path}")
+            continue
+
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                question = (row.get("question") or "").strip()
+                answer = (row.get("answer") or "").strip()
+                if question and answer and question.lower() not in seen:
+                    seen.add(question.lower())
+                    pairs.append((question, answer))
+    return pairs
+
+
+class FAQIndex:
+    """Precomputed FAQ question embeddings for answering common questions directly.
+
+    The embeddings are L2-normalized and stored as one float32 matrix, so matching
+    a query is a single matrix-vector product.
+    """
+
+    def __init__(
+        self,
+        questions: List[str],
+        answers: List[str],
+        embeddings: np.ndarray,
+        model_name: str,
+    ):
+        self.questions = questions
+        self.answers = answers
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.model_name = model_name
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    @classmethod
+    def build(cls, csv_files: List[str], model, model_name: str) -> "FAQIndex":
+        """Embed the questions of the FAQ CSVs with a SentenceTransformer `model`."""
+        pairs = load_faq_pairs(csv_files)
+        questions = [question for question, _ in pairs]
+        answers = [answer for _, answer in pairs]
+        if questions:
+            embeddings = model.encode(
+                questions, normalize_embeddings=True, convert_to_numpy=True
+            )
+        else:
+            embeddings = np.empty((0, model.get_sentence_embedding_dimension()))
+        logger.info(f"Built FAQ index with {len(questions)} questions")
+        return cls(questions, answers, embeddings, model_name)
+
+    def save(self, path: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write through a file object so numpy does not append another ".npz"
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                embeddings=self.embeddings,
+                questions=np.array(self.questions, dtype=str),
+                answers=np.array(self.answers, dtype=str),
+                model_name=np.array(self.model_name),
+            )
+        logger.info(f"Saved FAQ index to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "FAQIndex":
+        with np.load(path) as data:
+            return cls(
+                questions=data["questions"].tolist(),
+                answers=data["answers"].tolist(),
+                embeddings=data["embeddings"],
+                model_name=str(data["model_name"]),
+            )
+
+    def match(self, query_embedding) -> Optional[FAQMatch]:
+        """Return the FAQ entry closest to the query embedding."""
+        if not len(self):
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+
+        scores = self.embeddings @ (query / norm)
+        best = int(np.argmax(scores))
+        return FAQMatch(
+            question=self.questions[best],
+            answer=self.answers[best],
+            score=float(scores[best]),
+        )
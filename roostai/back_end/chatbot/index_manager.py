@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, Union
+
+from .config import VectorDBConfig
+from .snapshot import IndexSnapshot
+from .vector_store import VectorStore
+
+Store = Union[VectorStore, IndexSnapshot]
+
+
+@dataclass
+class IndexPointer:
+    """Which index to serve: a Chroma database or a snapshot, under a version label."""
+
+    version: str
+    db_path: Optional[str] = None
+    snapshot_path: Optional[str] = None
+    collection_name: Optional[str] = None
+
+
+def read_index_pointer(path: str) -> IndexPointer:
+    with open(path, "r", encoding="utf-8") as f:
+        pointer = IndexPointer(**json.load(f))
+    if not (pointer.db_path or pointer.snapshot_path):
+        raise ValueError(
+            f"Index pointer {path} names neither db_path nor snapshot_path"
+        )
+    return pointer
+
+
+def write_index_pointer(path: str, pointer: IndexPointer):
+    """Replace the pointer atomically, so readers see either the old or the new one."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_name(target.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(asdict(pointer), f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, target)
+
+
+class IndexManager:
+    """Blue/green switching between index versions named by a pointer file.
+
+    Requests call `maybe_swap`, which checks the pointer at most every
+    `poll_interval` seconds. When it names a new version, the new store is
+    opened and warmed (`warm(store)`) in a background thread while the current
+    one keeps serving. The next request after that swaps it in through
+    `on_swap(store)`, which installs it and returns the replaced store. That one
+    is closed `index_drain_seconds` later, once requests still using it are done.
+    A version that fails to open is not retried until the pointer changes.
+    """
+
+    def __init__(
+        self,
+        config: VectorDBConfig,
+        warm: Callable[[Store], Any],
+        on_swap: Callable[[Store], Store],
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.pointer_path = config.index_pointer
+        self.warm = warm
+        self.on_swap = on_swap
+        self.pointer: Optional[IndexPointer] = None
+        self.swaps = 0
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._pointer_mtime: Optional[int] = None
+        self._preparing: Optional[str] = None  # Version being opened and warmed
+        self._failed: Optional[str] = None
+        self._ready: Optional[Tuple[Store, IndexPointer]] = None
+
+    def open_store(self, pointer: IndexPointer) -> Store:
+        if pointer.snapshot_path:
+            return IndexSnapshot(pointer.snapshot_path)
+        return VectorStore(
+            collection_name=pointer.collection_name or self.config.collection_name,
+            db_path=pointer.db_path,
+        )
+
+    def open_current(self) -> Store:
+        """Open the version the pointer names now (at startup)."""
+        self._pointer_mtime = os.stat(self.pointer_path).st_mtime_ns
+        self.pointer = read_index_pointer(self.pointer_path)
+        self.logger.info(f"Serving index version {self.pointer.version}")
+        return self.open_store(self.pointer)
+
+    def after_fork(self, store: Store) -> Store:
+        """State for a forked worker: background threads did not survive the fork.
+
+        A snapshot's read-only memory map is shared with the parent; a Chroma
+        database is reopened, since its connections must not cross the fork.
+        """
+        # Keep the mtime of the version being served: a pointer published between
+        # `open_current` and the fork must still be picked up by the workers
+        pointer_mtime = self._pointer_mtime
+        self._reset()
+        self._pointer_mtime = pointer_mtime
+        if self.pointer.snapshot_path:
+            return store
+        from chromadb.api.client import SharedSystemClient
+
+        # Chroma caches one client system per path; drop the one inherited from the parent
+        SharedSystemClient.clear_system_cache()
+        return self.open_store(self.pointer)
+
+    def maybe_swap(self) -> bool:
+        """Swap in a prepared version, or start preparing a new one; cheap otherwise."""
+        with self._lock:
+            ready, self._ready = self._ready, None
+        if ready is not None:
+            self._swap(*ready)
+            return True
+
+        now = time.monotonic()
+        if now - self._last_check < self.config.index_poll_interval:
+            return False
+        self._last_check = now
+        self._check_pointer()
+        return False
+
+    def _check_pointer(self):
+        try:
+            mtime = os.stat(self.pointer_path).st_mtime_ns
+            if mtime == self._pointer_mtime:
+                return
+            pointer = read_index_pointer(self.pointer_path)
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.warning(
+                f"Could not read index pointer {self.pointer_path}: {e}"
+            )
+            return
+        self._pointer_mtime = mtime
+
+        with self._lock:
+            if pointer.version in (
+                self.pointer.version,
+                self._preparing,
+                self._failed,
+            ):
+                return
+            self._preparing = pointer.version
+        self.logger.info(
+            f"Index pointer moved to version {pointer.version}; preparing it"
+        )
+        threading.Thread(
+            target=self._prepare,
+            args=(pointer,),
+            name=f"index-{pointer.version}",
+            daemon=True,
+        ).start()
+
+    def _prepare(self, pointer: IndexPointer):
+        start = time.monotonic()
+        try:
+            store = self.open_store(pointer)
+            self.warm(store)
+        except Exception as e:
+            self.logger.error(f"Failed to prepare index version {pointer.version}: {e}")
+            with self._lock:
+                self._preparing = None
+                self._failed = pointer.version
+            return
+
+        self.logger.info(
+            f"Index version {pointer.version} ready after "
+            f"{time.monotonic() - start:.1f}s"
+        )
+        with self._lock:
+            self._preparing = None
+            if self._ready is not None:
+                # A newer version finished first; keep the latest one only
+                self._retire(self._ready[0], delay=0.0)
+            self._ready = (store, pointer)
+
+    def _swap(self, store: Store, pointer: IndexPointer):
+        old_version = self.pointer.version
+        self._retire(self.on_swap(store), self.config.index_drain_seconds)
+        self.pointer = pointer
+        self.swaps += 1
+        self.logger.info(f"Swapped index version {old_version} -> {pointer.version}")
+
+    def _retire(self, store: Store, delay: float):
+        timer = threading.Timer(delay, self._close_store, args=(store,))
+        timer.daemon = True
+        timer.start()
+
+    def _close_store(self, store: Store):
+        if isinstance(store, IndexSnapshot):
+            asyncio.run(store.close())
+            return
+        # Free Chroma's cached system for the path, unless a live version uses it
+        with self._lock:
+            live = [self.pointer] + ([self._ready[1]] if self._ready else [])
+        release = all(
+            pointer.snapshot_path or pointer.db_path != store.db_path
+            for pointer in live
+        )
+        asyncio.run(store.close(release_system=release))
+
+    async def close(self):
+        """Close a prepared but not yet swapped-in store; retired ones close on their own."""
+        with self._lock:
+            ready, self._ready = self._ready, None
+        if ready is not None:
+            await ready[0].close()
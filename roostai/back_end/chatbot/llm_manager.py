@@ -1,18 +1,31 @@
 import asyncio
 import logging
-import os
+import time
 from typing import Optional
 
-from dotenv import load_dotenv
-from huggingface_hub import InferenceClient
-
 from .config import Config
-from .types import QueryResult
+from .llm_providers import GenerationParams, create_provider
+from .llm_router import LLMRouter
+from .metrics import LatencyTracker
+from .response_cache import ResponseCache
+from .types import Deadline, QueryResult
+
+# Answers given instead of an LLM response
+LLM_ERROR_RESPONSE = "I apologize, but I encountered an error generating the response."
+LLM_TIMEOUT_RESPONSE = (
+    "I apologize, but the response is taking too long. Please try again."
+)
 
 
 class LLMManager:
-    def __init__(self, model_name: str, config: Config, llm_model: str):
-        """Initialize the Hugging Face Inference API client for LLM."""
+    def __init__(
+        self,
+        model_name: str,
+        config: Config,
+        llm_model: str,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        """Initialize the LLM provider selected by `config.model.llm_provider`."""
 
         self.logger = logging.getLogger(__name__)
         self.model_name = model_name
@@ -22,13 +35,16 @@ class LLMManager:
             config.thresholds.quality_min_score
         )  # Get from main config
 
-        load_dotenv()
-        self.api_token = os.getenv("HF_API_KEY")
-        if not self.api_token:
-            raise ValueError("HF_API_KEY environment variable not set")
-
-        self.client = InferenceClient(token=self.api_token)
+        if config.model.llm_providers:
+            self.provider = LLMRouter.from_specs(config.model.llm_providers, config.llm)
+        else:
+            self.provider = create_provider(
+                config.model.llm_provider, self.model_name, config.llm
+            )
+        self.generation_params = GenerationParams.from_config(config.llm)
         self.model = llm_model
+        self.latencies = LatencyTracker()
+        self.response_cache = response_cache
 
         self.system_prompt: str = (
             "You are a chatbot specifically designed to provide information about the "
@@ -60,7 +76,20 @@ Please provide a helpful response based on the context above. If the context doe
 Additionally, make sure to enclose your response in <response> tags.
 """
 
-    async def generate_response(self, query: str, result: QueryResult) -> Optional[str]:
+    async def generate_response(
+        self,
+        query: str,
+        result: QueryResult,
+        deadline: Optional[Deadline] = None,
+        check_cache: bool = True,
+    ) -> Optional[str]:
+        """Generate an answer from the retrieved documents.
+
+        Pass `check_cache=False` if the caller already looked up the response cache.
+        """
+        if deadline is None:
+            deadline = Deadline.after(self.config.pipeline.request_deadline)
+
         try:
             if result.quality_score < self.quality_min_score:
                 self.logger.warning(
@@ -85,51 +114,126 @@ Additionally, make sure to enclose your response in <response> tags.
                     "Please try asking something about USC."
                 )
 
+            if check_cache:
+                cached = self.get_cached_response(query, result)
+                if cached is not None:
+                    return cached
+
             prompt = self.generate_prompt(query, result)
             # print(f"Prompt:\n{prompt}")
 
-            # Use asyncio.wait_for to add timeout
-            response = await asyncio.wait_for(
-                self._generate_response(prompt), timeout=5.0  # 5 seconds timeout
-            )
+            for attempt in range(self.config.llm.max_attempts):
+                # A retry that cannot finish before the deadline only delays the error
+                if attempt > 0 and deadline.remaining() < self._latency_estimate():
+                    self.logger.warning(
+                        f"Skipping LLM retry: {deadline.remaining():.2f}s left, "
+                        f"expected latency {self._latency_estimate():.2f}s"
+                    )
+                    break
+
+                timeout = min(self.config.llm.attempt_timeout, deadline.remaining())
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
 
-            # Get the response within the <response> tags
-            if "<response>" in response:
-                return response.split("<response>")[1].split("</response>")[0].strip()
-            else:  # Try again maximum two times
                 response = await asyncio.wait_for(
-                    self._generate_response(prompt), timeout=5.0  # 5 seconds timeout
+                    self._generate_with_hedging(prompt), timeout=timeout
                 )
+
+                # Get the response within the <response> tags
                 if "<response>" in response:
-                    return (
+                    answer = (
                         response.split("<response>")[1].split("</response>")[0].strip()
                     )
-                else:
-                    return "I apologize, but I encountered an error generating the response."
+                    if self.response_cache is not None:
+                        self.response_cache.put(self._cache_key(query, result), answer)
+                    return answer
+
+            return LLM_ERROR_RESPONSE
 
         except asyncio.TimeoutError:
             self.logger.error("LLM response generation timed out")
-            return "I apologize, but the response is taking too long. Please try again."
+            return LLM_TIMEOUT_RESPONSE
         except Exception as e:
             self.logger.error(f"LLM response generation failed: {e}")
-            return "I apologize, but I encountered an error generating the response."
+            return LLM_ERROR_RESPONSE
+
+    def _cache_key(self, query: str, result: QueryResult) -> str:
+        return ResponseCache.make_key(
+            self.provider.model,
+            self.generation_params,
+            self.system_prompt,
+            query,
+            result.documents,
+        )
+
+    def get_cached_response(self, query: str, result: QueryResult) -> Optional[str]:
+        """Return a previously generated response for the same prompt, if cached."""
+        if self.response_cache is None or not result.documents:
+            return None
+        return self.response_cache.get(self._cache_key(query, result))
+
+    def _latency_estimate(self) -> float:
+        """Typical duration of an LLM call, based on observed latencies."""
+        if len(self.latencies) < self.config.llm.hedge_min_samples:
+            return self.config.llm.default_latency_estimate
+        return self.latencies.percentile(0.5)
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Delay after which a hedged request is sent, or None if hedging is off."""
+        if not self.config.llm.hedge_requests:
+            return None
+        if len(self.latencies) < self.config.llm.hedge_min_samples:
+            return None
+        return self.latencies.percentile(self.config.llm.hedge_percentile)
+
+    async def _generate_with_hedging(self, prompt: str) -> str:
+        """Generate a response, sending a hedged duplicate if the first call is slow."""
+        hedge_delay = self._hedge_delay()
+        tasks = [asyncio.ensure_future(self._timed_generate(prompt))]
+        try:
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done:
+                    self.logger.info(
+                        f"LLM call slower than p{self.config.llm.hedge_percentile * 100:.0f} "
+                        f"({hedge_delay:.2f}s), sending hedged request"
+                    )
+                    tasks.append(asyncio.ensure_future(self._timed_generate(prompt)))
+
+            # Whichever call succeeds first wins; only fail once all calls failed
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _timed_generate(self, prompt: str) -> str:
+        """Call the LLM and record the latency of successful calls."""
+        start = time.monotonic()
+        response = await self._generate_response(prompt)
+        self.latencies.add(time.monotonic() - start)
+        return response
 
     async def _generate_response(self, prompt: str) -> str:
         """Separate method for actual response generation to allow for timeout."""
-        return self.client.text_generation(
-            prompt,
-            model=self.model_name,
-            max_new_tokens=self.config.llm.max_length,
-            temperature=self.config.llm.temperature,
-            top_p=self.config.llm.top_p,
-            repetition_penalty=self.config.llm.repetition_penalty,
-        )
+        return await self.provider.generate(prompt, self.generation_params)
 
     async def close(self):
         """Close LLM connections and clean up resources."""
         try:
-            if hasattr(self, "client"):
-                self.client = None
+            if getattr(self, "provider", None) is not None:
+                await self.provider.close()
+                self.provider = None
             self.logger.info("LLM manager cleaned up successfully")
         except Exception as e:
             self.logger.error(f"Error during LLM cleanup: {e}")
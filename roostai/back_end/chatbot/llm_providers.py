@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from .config import LLMConfig
+
+
+class LLMProviderError(Exception):
+    """Raised when an LLM provider fails to produce a response."""
+
+
+@dataclass
+class GenerationParams:
+    max_tokens: int = 512
+    temperature: Optional[float] = None
+    top_p: Optional[float] = None
+    repetition_penalty: Optional[float] = None
+    # Sent as a separate system message by chat-style providers
+    system_prompt: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> "GenerationParams":
+        """Build generation parameters from the LLM section of the config."""
+        return cls(
+            max_tokens=config.max_length,
+            temperature=config.temperature,
+            top_p=config.top_p,
+            repetition_penalty=config.repetition_penalty,
+        )
+
+
+class LLMProvider(ABC):
+    """Async interface shared by all LLM backends."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def name(self) -> str:
+        return f"{type(self).__name__}({self.model})"
+
+    @abstractmethod
+    async def generate(self, prompt: str, params: GenerationParams) -> str:
+        """Generate a completion for `prompt`."""
+
+    async def close(self):
+        """Release any resources held by the provider."""
+
+
+def _get_api_key(env_var: str, token: Optional[str]) -> str:
+    """Return `token` or the API key from the environment."""
+    if token:
+        return token
+    load_dotenv()
+    api_key = os.getenv(env_var)
+    if not api_key:
+        raise ValueError(f"{env_var} environment variable not set")
+    return api_key
+
+
+class _LoopClient:
+    """Async SDK client for the running event loop, created on first use.
+
+    The SDK clients keep httpx connection pools bound to the loop that created
+    them, and the Streamlit front end runs every message in a new `asyncio.run`
+    loop (one per session thread), so each loop gets its own client.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # A client of a closed loop cannot be closed anymore; drop it so its
+            # connection pool (and the loop it references) can be freed
+            for closed in [other for other in self._clients if other.is_closed()]:
+                del self._clients[closed]
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = self.factory()
+        return client
+
+    async def close(self):
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+class HuggingFaceProvider(LLMProvider):
+    """Hugging Face serverless inference API / inference endpoints."""
+
+    def __init__(self, model: str, token: Optional[str] = None):
+        super().__init__(model)
+        from huggingface_hub import InferenceClient
+
+        self.client = InferenceClient(token=_get_api_key("HF_API_KEY", token))
+
+    async def generate(self, prompt: str, params: GenerationParams) -> str:
+        # The client is blocking; run it in a thread so timeouts and hedging can take effect
+        if params.system_prompt is None:
+            return await asyncio.to_thread(
+                self.client.text_generation,
+                prompt,
+                model=self.model,
+                max_new_tokens=params.max_tokens,
+                temperature=params.temperature,
+                top_p=params.top_p,
+                repetition_penalty=params.repetition_penalty,
+            )
+
+        completion = await asyncio.to_thread(
+            self.client.chat_completion,
+            messages=[
+                {"role": "system", "content": params.system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            model=self.model,
+            max_tokens=params.max_tokens,
+            temperature=params.temperature,
+            top_p=params.top_p,
+        )
+        return completion.choices[0].message.content
+
+    async def close(self):
+        self.client = None
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions API."""
+
+    def __init__(self, model: str, token: Optional[str] = None):
+        super().__init__(model)
+        from openai import AsyncOpenAI
+
+        api_key = _get_api_key("OPENAI_API_KEY", token)
+        self.client = _LoopClient(lambda: AsyncOpenAI(api_key=api_key))
+
+    async def generate(self, prompt: str, params: GenerationParams) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        if params.system_prompt is not None:
+            messages.insert(0, {"role": "system", "content": params.system_prompt})
+
+        completion = await self.client.get().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=params.max_tokens,
+            temperature=params.temperature,
+            top_p=params.top_p,
+        )
+        return completion.choices[0].message.content
+
+    async def close(self):
+        await self.client.close()
+
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic messages API."""
+
+    def __init__(self, model: str, token: Optional[str] = None):
+        super().__init__(model)
+        from anthropic import AsyncAnthropic
+
+        api_key = _get_api_key("ANTHROPIC_API_KEY", token)
+        self.client = _LoopClient(lambda: AsyncAnthropic(api_key=api_key))
+
+    async def generate(self, prompt: str, params: GenerationParams) -> str:
+        kwargs = {}
+        if params.system_prompt is not None:
+            kwargs["system"] = params.system_prompt
+        if params.temperature is not None:
+            kwargs["temperature"] = params.temperature
+
+        message = await self.client.get().messages.create(
+            model=self.model,
+            max_tokens=params.max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            **kwargs,
+        )
+        return message.content[0].text
+
+    async def close(self):
+        await self.client.close()
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini API."""
+
+    def __init__(self, model: str, token: Optional[str] = None):
+        super().__init__(model)
+        import google.generativeai as genai
+
+        self.genai = genai
+        self.genai.configure(api_key=_get_api_key("GOOGLE_API_KEY", token))
+
+    async def generate(self, prompt: str, params: GenerationParams) -> str:
+        model = self.genai.GenerativeModel(
+            self.model, system_instruction=params.system_prompt
+        )
+        response = await model.generate_content_async(
+            prompt,
+            generation_config=self.genai.GenerationConfig(
+                max_output_tokens=params.max_tokens,
+                temperature=params.temperature,
+                top_p=params.top_p,
+            ),
+        )
+        return response.text
+
+
+class LocalProvider(LLMProvider):
+    """Offline stand-in for a real LLM, used for load tests and benchmarks.
+
+    Simulates a request as `latency` seconds of time-to-first-token followed by
+    `response_tokens` tokens generated at `tokens_per_second`, and fails a
+    `failure_rate` fraction of requests. The answer echoes the first line of the
+    prompt context, wrapped in <response> tags like a well-behaved model.
+    """
+
+    def __init__(
+        self,
+        model: str = "local",
+        latency: float = 0.2,
+        tokens_per_second: float = 50.0,
+        response_tokens: int = 64,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(model)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+    async def generate(self, prompt: str, params: GenerationParams) -> str:
+        num_tokens = min(self.response_tokens, params.max_tokens)
+        duration = self.latency
+        if self.tokens_per_second > 0:
+            duration += num_tokens / self.tokens_per_second
+        await asyncio.sleep(duration)
+
+        if self.random.random() < self.failure_rate:
+            raise LLMProviderError(f"{self.name}: simulated failure")
+
+        context_lines = [
+            line[2:] for line in prompt.splitlines() if line.startswith("- ")
+        ]
+        words = (context_lines[0] if context_lines else prompt).split()
+        return f"<response>{' '.join(words[:num_tokens])}</response>"
+
+
+def create_provider(
+    provider: str, model: str, config: LLMConfig, token: Optional[str] = None
+) -> LLMProvider:
+    """Create the LLM provider named `provider` ("huggingface", "openai", "anthropic", "gemini" or "local")."""
+    if provider == "huggingface":
+        return HuggingFaceProvider(model, token=token)
+    if provider == "openai":
+        return OpenAIProvider(model, token=token)
+    if provider == "anthropic":
+        return AnthropicProvider(model, token=token)
+    if provider == "gemini":
+        return GeminiProvider(model, token=token)
+    if provider == "local":
+        return LocalProvider(
+            model=model,
+            latency=config.local_latency,
+            tokens_per_second=config.local_tokens_per_second,
+            response_tokens=config.local_response_tokens,
+            failure_rate=config.local_failure_rate,
+        )
+    raise ValueError(f"Unknown LLM provider: {provider}")
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .config import LLMConfig
+from .llm_providers import (
+    GenerationParams,
+    LLMProvider,
+    LLMProviderError,
+    create_provider,
+)
+
+
+@dataclass
+class ProviderStats:
+    """Moving latency/error profile and circuit breaker state of one provider."""
+
+    latency_ewma: Optional[float] = None
+    error_ewma: float = 0.0
+    consecutive_failures: int = 0
+    # Circuit breaker: the provider is skipped until this time (monotonic clock)
+    open_until: float = 0.0
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+    def expected_latency(self) -> float:
+        """Latency estimate of a successful call; busy providers look slower."""
+        # Providers without samples are tried first so every provider gets profiled
+        return (self.latency_ewma or 0.0) * (1 + self.in_flight)
+
+    def routing_cost(self, failure_penalty: float) -> float:
+        """Expected latency plus the time lost to failures at the current error rate."""
+        return self.expected_latency() + self.error_ewma * failure_penalty
+
+
+class LLMRouter(LLMProvider):
+    """Routes each request to the fastest healthy provider, failing over on errors.
+
+    Every provider keeps an exponentially weighted moving average of its latency
+    and error rate; providers are ranked by their expected latency plus their
+    error rate times `provider_timeout`, so a fast but failing provider drops
+    back before its breaker trips. Stats are kept per `names` entry (the
+    "provider:model" specs when built by `from_specs`). After `failure_threshold` consecutive failures (errors or
+    timeouts) a provider's circuit opens for `cooldown` seconds; afterwards one
+    trial request decides whether it closes again.
+    """
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        provider_timeout: float = 2.5,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        ewma_alpha: float = 0.2,
+        names: Optional[List[str]] = None,
+    ):
+        super().__init__(model=",".join(p.model for p in providers))
+        if not providers:
+            raise ValueError("LLMRouter requires at least one provider")
+        names = names or [p.name for p in providers]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate LLM providers: {names}")
+
+        self.providers = providers
+        self.provider_names = {id(p): name for p, name in zip(providers, names)}
+        self.provider_timeout = provider_timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma_alpha = ewma_alpha
+        self.provider_stats: Dict[str, ProviderStats] = {
+            name: ProviderStats() for name in names
+        }
+
+    @classmethod
+    def from_specs(cls, specs: List[str], config: LLMConfig) -> "LLMRouter":
+        """Build a router from "provider:model" specs, e.g. "huggingface:mistralai/Mixtral-8x7B-Instruct-v0.1"."""
+        providers = []
+        for spec in specs:
+            provider, _, model = spec.partition(":")
+            if not model:
+                raise ValueError(
+                    f"Invalid LLM provider spec (expected provider:model): {spec}"
+                )
+            providers.append(create_provider(provider, model, config))
+
+        return cls(
+            providers,
+            provider_timeout=config.router_provider_timeout,
+            failure_threshold=config.router_failure_threshold,
+            cooldown=config.router_cooldown,
+            ewma_alpha=config.router_ewma_alpha,
+            names=specs,
+        )
+
+    def ranked_providers(self) -> List[LLMProvider]:
+        """Providers in the order they should be tried."""
+        now = time.monotonic()
+        healthy = [p for p in self.providers if not self._stats(p).is_open(now)]
+        healthy.sort(key=lambda p: self._stats(p).routing_cost(self.provider_timeout))
+
+        # Providers with an open circuit are only a last resort
+        broken = [p for p in self.providers if p not in healthy]
+        broken.sort(key=lambda p: self._stats(p).open_until)
+        return healthy + broken
+
+    def _stats(self, provider: LLMProvider) -> ProviderStats:
+        return self.provider_stats[self.provider_names[id(provider)]]
+
+    async def generate(self, prompt: str, params: GenerationParams) -> str:
+        error: Optional[BaseException] = None
+        for provider in self.ranked_providers():
+            stats = self._stats(provider)
+            stats.in_flight += 1
+            stats.requests += 1
+            start = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    provider.generate(prompt, params), timeout=self.provider_timeout
+                )
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    # A timed out call took at least this long; keep slow providers ranked low
+                    self._record_latency(stats, self.provider_timeout)
+                self._record_failure(stats)
+                self.logger.warning(
+                    f"LLM provider {provider.name} failed ({type(e).__name__}: {e}), "
+                    f"failing over"
+                )
+                error = e
+                continue
+            finally:
+                stats.in_flight -= 1
+
+            self._record_success(stats, time.monotonic() - start)
+            return response
+
+        raise LLMProviderError(f"All LLM providers failed, last error: {error!r}")
+
+    def _record_latency(self, stats: ProviderStats, latency: float):
+        if stats.latency_ewma is None:
+            stats.latency_ewma = latency
+        else:
+            alpha = self.ewma_alpha
+            stats.latency_ewma = alpha * latency + (1 - alpha) * stats.latency_ewma
+
+    def _record_success(self, stats: ProviderStats, latency: float):
+        self._record_latency(stats, latency)
+        stats.error_ewma = (1 - self.ewma_alpha) * stats.error_ewma
+        stats.consecutive_failures = 0
+        stats.open_until = 0.0
+
+    def _record_failure(self, stats: ProviderStats):
+        alpha = self.ewma_alpha
+        stats.error_ewma = alpha + (1 - alpha) * stats.error_ewma
+        stats.consecutive_failures += 1
+        stats.failures += 1
+        if stats.consecutive_failures >= self.failure_threshold:
+            # Also re-opens a half-open circuit whose trial request failed
+            stats.open_until = time.monotonic() + self.cooldown
+
+    def stats(self) -> Dict[str, Dict]:
+        """Snapshot of the routing profile of every provider."""
+        now = time.monotonic()
+        return {
+            name: {
+                "latency_ewma": s.latency_ewma,
+                "error_rate": s.error_ewma,
+                "circuit_open": s.is_open(now),
+                "in_flight": s.in_flight,
+                "requests": s.requests,
+                "failures": s.failures,
+            }
+            for name, s in self.provider_stats.items()
+        }
+
+    async def close(self):
+        await asyncio.gather(*(p.close() for p in self.providers))
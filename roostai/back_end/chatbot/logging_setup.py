@@ -0,0 +1,134 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from typing import List, Optional
+
+from .config import LoggingConfig
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+# Listener started by the last `configure_logging` call, and the process that started it
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the DEBUG records of a logger.
+
+    Hot-path debug detail (e.g. per-document scores) is still visible when
+    debugging under load, without a log line for every query.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are; the listener thread does all the formatting.
+
+    The stock `QueueHandler` formats every record in the logging thread so it can
+    be pickled. Records here stay in process, so that work is left to the
+    listener. Arguments must therefore not be mutated after the logging call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(
+    config: LoggingConfig,
+) -> Optional[logging.handlers.QueueListener]:
+    """Configure the root logger from `config`.
+
+    With `config.use_queue`, the root logger only puts records on a queue and a
+    `QueueListener` thread formats them and writes them to the stream and file
+    handlers, so request handling never waits for log I/O. Returns the listener,
+    which is also stopped (flushing the queue) at exit.
+
+    Calling it again replaces the handlers, e.g. in a forked worker, which does
+    not inherit the parent's listener thread.
+    """
+    if config.format == "json":
+        formatter: logging.Formatter = StructuredFormatter()
+    else:
+        formatter = logging.Formatter(config.text_format)
+
+    log_file = config.log_file
+    if log_file is None:
+        log_file = sys.argv[0].replace(".py", ".log")
+
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    global _listener, _listener_pid
+    # A listener inherited through fork has no thread (and possibly a locked queue)
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+    root = logging.getLogger()
+    root.setLevel(config.level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    for name, rate in config.sample_rates.items():
+        sampled = logging.getLogger(name)
+        for existing in [f for f in sampled.filters if isinstance(f, SamplingFilter)]:
+            sampled.removeFilter(existing)
+        sampled.addFilter(SamplingFilter(rate))
+
+    if not config.use_queue:
+        for handler in handlers:
+            root.addHandler(handler)
+        return None
+
+    log_queue: "queue.Queue" = queue.Queue(-1)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    _listener_pid = os.getpid()
+    return _listener
+
+
+@atexit.register
+def _stop_listener():
+    # Write out whatever is still queued
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
@@ -0,0 +1,22 @@
+from collections import deque
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def add(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, p: float) -> float:
+        """Return the `p` percentile (0-1) of the recorded latencies (0.0 if empty)."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self.samples)
@@ -42,9 +42,13 @@ class QualityChecker:
             if len(scores) >= 2:
                 quality_score *= 1 + 0.1 * len(scores)  # Bonus for more docs
 
-            self.logger.info(f"Quality check completed. Score: {quality_score:.2f}")
-            self.logger.debug(f"Number of documents: {len(documents)}")
-            self.logger.debug(f"Top document scores: {scores}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Quality check completed. Score: %.2f (%d documents)",
+                    quality_score,
+                    len(documents),
+                    extra={"quality_score": quality_score, "weighted_scores": scores},
+                )
 
             return QueryResult(documents=documents, quality_score=quality_score)
 
@@ -0,0 +1,190 @@
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import QueryLogConfig
+
+SEGMENT_PATTERN = "queries_*.jsonl*"
+
+# Put on the queue by `close()` to stop the writer thread
+_STOP = object()
+
+
+def list_segments(log_dir: str) -> List[Path]:
+    """Query log segments in `log_dir`, oldest first."""
+    path = Path(log_dir)
+    if not path.is_dir():
+        return []
+    # Names start with the creation time, so lexical order is chronological
+    return sorted(path.glob(SEGMENT_PATTERN))
+
+
+def read_segment(segment: Path) -> Iterator[Dict[str, Any]]:
+    """Records of one segment; a partially written last line is skipped."""
+    opener = gzip.open if segment.suffix == ".gz" else open
+    try:
+        with opener(segment, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except (OSError, EOFError) as e:
+        logging.getLogger(__name__).debug(f"Stopped reading {segment}: {e}")
+
+
+class QueryLogger:
+    """Append query results to JSONL segments from a background thread.
+
+    `log_query` only puts the record on a bounded queue; the writer thread
+    serializes queued records in batches and appends them to the current segment,
+    which is closed (and optionally gzipped) once it reaches the configured size
+    or age. When the disk falls behind and the queue is full, records are dropped
+    and counted, or `log_query` blocks briefly first (`overflow="block"`).
+
+    Threads do not survive a fork, so forked workers must create their own logger.
+    """
+
+    def __init__(self, config: QueryLogConfig):
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.log_dir = Path(config.log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=config.queue_size)
+        self._file = None
+        self._segment_path: Optional[Path] = None
+        self._segment_opened = 0.0
+        self._segment_bytes = 0
+        self._thread = threading.Thread(
+            target=self._run, name="query-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def log_query(self, results: Dict[str, Any]):
+        """Queue query results for writing; never waits on disk I/O.
+
+        The record is serialized right away, since the caller may keep using `results`.
+        """
+        record = json.dumps(
+            {"timestamp": datetime.now().isoformat(), **results}, default=str
+        )
+        try:
+            if self.config.overflow == "block":
+                self._queue.put(record, timeout=self.config.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            # Log the first drop and then every 1000th, not every one
+            if self.dropped % 1000 == 1:
+                self.logger.warning(
+                    f"Query log queue full, {self.dropped} records dropped so far"
+                )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "segments": self.segments,
+        }
+
+    def close(self, timeout: float = 10.0):
+        """Write the queued records and close the current segment."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning("Query log writer did not finish in time")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                record = self._queue.get(timeout=self.config.flush_interval)
+            except queue.Empty:
+                record = None
+            # Drain whatever else is waiting, up to one batch
+            while record is not None:
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+                if len(batch) >= self.config.batch_size:
+                    break
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    record = None
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+                if self._file is not None and self._segment_full():
+                    self._close_segment()
+            except Exception as e:
+                self.logger.error(f"Failed to write query log: {e}")
+        try:
+            self._close_segment()
+        except Exception as e:
+            self.logger.error(f"Failed to close query log segment: {e}")
+
+    def _write_batch(self, batch: List[str]):
+        if self._file is None:
+            self._open_segment()
+        data = "".join(record + "\n" for record in batch)
+        self._file.write(data)
+        self._file.flush()
+        if self.config.fsync == "batch":
+            os.fsync(self._file.fileno())
+        self._segment_bytes += len(data.encode("utf-8"))
+        self.written += len(batch)
+
+    def _segment_full(self) -> bool:
+        return (
+            self._segment_bytes >= self.config.max_segment_bytes
+            or time.monotonic() - self._segment_opened
+            >= self.config.max_segment_seconds
+        )
+
+    def _open_segment(self):
+        # The pid keeps segments of concurrent (e.g. pre-forked) processes apart
+        name = (
+            f"queries_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}.jsonl"
+        )
+        self._segment_path = self.log_dir / name
+        self._file = open(self._segment_path, "a", encoding="utf-8")
+        self._segment_opened = time.monotonic()
+        self._segment_bytes = 0
+        self.segments += 1
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        if self.config.fsync in ("batch", "rotate"):
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+        if self.config.compress:
+            compressed = self._segment_path.with_name(self._segment_path.name + ".gz")
+            with open(self._segment_path, "rb") as src, gzip.open(
+                compressed, "wb"
+            ) as dst:
+                shutil.copyfileobj(src, dst)
+            self._segment_path.unlink()
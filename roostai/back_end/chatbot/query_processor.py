@@ -1,13 +1,27 @@
 import logging
 from functools import lru_cache
-from typing import List
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from .embedding_store import EmbeddingStore
+
 
 class QueryProcessor:
-    def __init__(self, model_name: str):
-        """Initialize query processor with specified embedding model."""
+    def __init__(
+        self,
+        model_name: str,
+        embedding_store_dir: Optional[str] = None,
+        embedding_store_shard_size: int = 65536,
+    ):
+        """Initialize query processor with specified embedding model.
+
+        With `embedding_store_dir`, embeddings are looked up in the shared on-disk
+        `EmbeddingStore`. Only `embed_documents` (ingestion) adds to it; queries
+        just read it, so user queries are not persisted and requests never wait
+        on a write lock.
+        """
         self.logger = logging.getLogger(__name__)
         try:
             self.model = SentenceTransformer(model_name)
@@ -15,11 +29,82 @@ class QueryProcessor:
             self.logger.error(f"Failed to load embedding model: {e}")
             raise
 
+        self.embedding_store = None
+        if embedding_store_dir:
+            self.embedding_store = EmbeddingStore(
+                embedding_store_dir,
+                model_name,
+                self.model.get_sentence_embedding_dimension(),
+                shard_size=embedding_store_shard_size,
+            )
+
     @lru_cache(maxsize=1000)
     def _generate_embedding(self, query: str) -> List[float]:
         """Generate and cache embeddings for queries."""
+        if self.embedding_store is not None:
+            embedding = self.embedding_store.get(query)
+            if embedding is not None:
+                return embedding.tolist()
         return self.model.encode(query).tolist()
 
+    def embed_documents(
+        self,
+        texts: List[str],
+        batch_size: int = 64,
+        pool: Optional[Dict[str, Any]] = None,
+    ) -> np.ndarray:
+        """Embed many texts into one float32 array (row `i` belongs to `texts[i]`).
+
+        Texts found in the embedding store are not encoded again; the others are
+        encoded in order of decreasing length, so every batch pads its token
+        sequences to similar lengths and the longest (most memory hungry) batch
+        runs first. With a `pool` from `start_encode_pool`, batches are spread
+        over its worker processes.
+        """
+        if self.embedding_store is None:
+            return self._encode_sorted(texts, batch_size, pool)
+
+        embeddings, missing = self.embedding_store.get_many(texts)
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            encoded = self._encode_sorted(missing_texts, batch_size, pool)
+            embeddings[missing] = encoded
+            self.embedding_store.put_many(missing_texts, encoded)
+        return embeddings
+
+    def _encode_sorted(
+        self, texts: List[str], batch_size: int, pool: Optional[Dict[str, Any]]
+    ) -> np.ndarray:
+        embeddings = np.empty(
+            (len(texts), self.model.get_sentence_embedding_dimension()),
+            dtype=np.float32,
+        )
+        if not texts:
+            return embeddings
+
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        if pool is not None:
+            embeddings[order] = self.model.encode_multi_process(
+                [texts[i] for i in order], pool, batch_size=batch_size
+            )
+            return embeddings
+
+        for start in range(0, len(texts), batch_size):
+            batch = order[start : start + batch_size]
+            embeddings[batch] = self.model.encode(
+                [texts[i] for i in batch],
+                batch_size=batch_size,
+                convert_to_numpy=True,
+            )
+        return embeddings
+
+    def start_encode_pool(self, processes: int) -> Dict[str, Any]:
+        """Start `processes` CPU encode workers for `embed_documents`."""
+        return self.model.start_multi_process_pool(target_devices=["cpu"] * processes)
+
+    def stop_encode_pool(self, pool: Dict[str, Any]):
+        self.model.stop_multi_process_pool(pool)
+
     async def process_query(self, query: str) -> tuple[str, List[float]]:
         """Process and embed a user query."""
         try:
@@ -34,6 +119,12 @@ class QueryProcessor:
             self.logger.error(f"Error processing query: {e}")
             raise
 
+    def close(self):
+        """Close the embedding store, if any."""
+        if self.embedding_store is not None:
+            self.embedding_store.close()
+            self.embedding_store = None
+
     def clear_cache(self):
         """Clear any cached embeddings."""
         if hasattr(self, "model"):
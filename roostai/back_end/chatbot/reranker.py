@@ -38,13 +38,13 @@ class Reranker:
             ]
 
             # Log both vector similarity and cross-encoder scores for comparison
-            self.logger.info("\nScore comparison for top documents:")
-            for i, (doc, cross_score) in enumerate(zip(documents[:3], scores[:3])):
-                self.logger.info(
-                    f"Doc {i + 1}:"
-                    f"\n  - Vector similarity score: {doc.score:.3f}"
-                    f"\n  - Cross-encoder score: {cross_score:.3f}"
-                    f"\n  - Content preview: {doc.content[:100]}..."
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Score comparison for top documents (vector, cross-encoder, preview): %s",
+                    [
+                        (round(doc.score, 3), round(cross_score, 3), doc.content[:100])
+                        for doc, cross_score in zip(documents[:3], scores[:3])
+                    ],
                 )
 
             # Update document scores and filter
@@ -60,13 +60,18 @@ class Reranker:
             # Sort by cross-encoder score descending
             scored_docs.sort(key=lambda x: x.score, reverse=True)
 
-            self.logger.info(
-                f"Reranking results:"
-                f"\n - Input documents: {len(documents)}"
-                f"\n - Passed threshold ({threshold}): {len(scored_docs)}"
-                f"\n - Best cross-encoder score: {max(scores) if scores else 'N/A'}"
-                f"\n - Best vector similarity: {max(doc.vector_score for doc in documents) if documents else 'N/A'}"
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Reranked %d documents, %d passed threshold %s",
+                    len(documents),
+                    len(scored_docs),
+                    threshold,
+                    extra={
+                        "input_docs": len(documents),
+                        "passed_docs": len(scored_docs),
+                        "best_cross_score": max(scores),
+                    },
+                )
 
             return scored_docs
 
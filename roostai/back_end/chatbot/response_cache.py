@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
+
+from .llm_providers import GenerationParams
+from .types import Document
+
+
+def _chunk_id(doc: Document) -> str:
+    """Vector store id of a document, falling back to the content hash used at ingestion."""
+    return doc.id or hashlib.md5(doc.content.encode()).hexdigest()
+
+
+def store_version(store) -> str:
+    """Collection version of a vector store or snapshot, qualified by its location.
+
+    Collections in different databases can report the same version (e.g. the same
+    "version" metadata), so the location keeps their cached responses apart.
+    """
+    if hasattr(store, "collection"):
+        location = f"{Path(store.db_path).resolve()}/{store.collection.name}"
+    else:
+        location = str(store.path.resolve())
+    return f"{location}|{store.get_collection_version()}"
+
+
+class ResponseCache:
+    """On-disk LRU cache of LLM responses, scoped to one collection version.
+
+    Entries are keyed by a fingerprint of everything that determines the prompt:
+    model, sampling parameters, system prompt, cleaned query and the ordered ids of
+    the context chunks. Only entries of the current collection version are
+    returned; the cache file can be shared by chatbots serving different
+    collections or versions (see `store_version`), and entries of versions no
+    longer served age out through the LRU limit.
+    """
+
+    def __init__(self, path: str, version: str, max_entries: int = 10000):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS cached_responses ("
+            "version TEXT NOT NULL, key TEXT NOT NULL, response TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL, "
+            "PRIMARY KEY (version, key));"
+            "CREATE INDEX IF NOT EXISTS cached_responses_last_access "
+            "ON cached_responses(last_access);"
+        )
+        self._conn.commit()
+        self.version = version
+
+    @staticmethod
+    def make_key(
+        model: str,
+        params: GenerationParams,
+        system_prompt: str,
+        query: str,
+        documents: List[Document],
+    ) -> str:
+        """Fingerprint of the prompt `LLMManager.generate_prompt` would build."""
+        fingerprint = {
+            "model": model,
+            "params": asdict(params),
+            "system_prompt": hashlib.sha256(system_prompt.encode()).hexdigest(),
+            "query": query,
+            "chunks": [_chunk_id(doc) for doc in documents],
+        }
+        return hashlib.sha256(
+            json.dumps(fingerprint, sort_keys=True).encode()
+        ).hexdigest()
+
+    def set_version(self, version: str):
+        """Switch to a new collection version; entries of other versions are not served."""
+        self.version = version
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, if any."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response FROM cached_responses WHERE version = ? AND key = ?",
+                (self.version, key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE cached_responses SET last_access = ? "
+                "WHERE version = ? AND key = ?",
+                (time.time(), self.version, key),
+            )
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, response: str):
+        """Store a response and evict the least recently used entries over the limit."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cached_responses VALUES (?, ?, ?, ?, ?)",
+                (self.version, key, response, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM cached_responses WHERE rowid IN (SELECT rowid FROM "
+                "cached_responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,442 @@
+import json
+import logging
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .types import Document, DocumentMetadata
+from .vector_store import VectorStore
+
+# File layout: MAGIC, sections (each 64-byte aligned), JSON footer,
+# footer length (uint64), MAGIC. Fixed-size sections (embeddings, scales, norms)
+# come first, so they can be written while the collection is still being read.
+MAGIC = b"RSNAP001"
+_ALIGN = 64
+_FOOTER = struct.Struct("<Q")
+_MISSING = 0xFFFFFFFF  # Metadata code of rows without that metadata key
+
+TEXT_BLOCK_SIZE = 64  # Texts per compressed block (a query decompresses k blocks)
+STRING_BLOCK_SIZE = 1024  # Ids per compressed block
+SEARCH_CHUNK_ROWS = 65536  # Rows dequantized at a time when searching
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+class _StringColumnWriter:
+    """Strings in zlib-compressed JSON blocks, with the byte offset of every block."""
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self.blocks: List[bytes] = []
+        self.pending: List[str] = []
+
+    def extend(self, values: List[str]):
+        self.pending.extend(values)
+        while len(self.pending) >= self.block_size:
+            self._compress(self.pending[: self.block_size])
+            del self.pending[: self.block_size]
+
+    def _compress(self, values: List[str]):
+        self.blocks.append(zlib.compress(json.dumps(values).encode(), 6))
+
+    def finish(self) -> List[bytes]:
+        if self.pending:
+            self._compress(self.pending)
+            self.pending = []
+        return self.blocks
+
+
+class SnapshotWriter:
+    """Write a snapshot file row batch by row batch (see `export_snapshot`)."""
+
+    def __init__(self, path: str, count: int, dimension: int, dtype: str = "int8"):
+        if dtype not in ("int8", "float16"):
+            raise ValueError(f"Unsupported snapshot embedding dtype: {dtype}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = count
+        self.dimension = dimension
+        self.dtype = dtype
+        self.rows = 0
+
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self._end = _ALIGN
+        self._reserve("embeddings", dtype, [count, dimension])
+        if dtype == "int8":
+            self._reserve("scales", "float32", [count])
+        self._reserve("norms", "float32", [count])
+
+        self._ids = _StringColumnWriter(STRING_BLOCK_SIZE)
+        self._texts = _StringColumnWriter(TEXT_BLOCK_SIZE)
+        self._metadata_values: Dict[str, Dict[str, int]] = {}
+        self._metadata_codes: Dict[str, np.ndarray] = {}
+
+    def _reserve(self, name: str, dtype: str, shape: List[int]):
+        offset = _aligned(self._end)
+        length = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self.sections[name] = {
+            "offset": offset,
+            "length": length,
+            "dtype": dtype,
+            "shape": shape,
+        }
+        self._end = offset + length
+
+    def _write_rows(self, name: str, values: np.ndarray):
+        section = self.sections[name]
+        row_bytes = section["length"] // section["shape"][0]
+        self._file.seek(section["offset"] + self.rows * row_bytes)
+        self._file.write(np.ascontiguousarray(values, dtype=section["dtype"]).tobytes())
+
+    def add(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+    ):
+        if self.rows + len(ids) > self.count:
+            raise ValueError(f"Snapshot was sized for {self.count} rows")
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        if self.dtype == "int8":
+            # Symmetric per-row quantization: row ~= codes * scale
+            scales = np.abs(embeddings).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.rint(embeddings / scales[:, None]).astype(np.int8)
+            restored = codes.astype(np.float32) * scales[:, None]
+            self._write_rows("embeddings", codes)
+            self._write_rows("scales", scales)
+        else:
+            codes = embeddings.astype(np.float16)
+            restored = codes.astype(np.float32)
+            self._write_rows("embeddings", codes)
+        self._write_rows("norms", np.linalg.norm(restored, axis=1))
+
+        self._ids.extend(ids)
+        self._texts.extend(texts)
+        for i, metadata in enumerate(metadatas):
+            for key, value in (metadata or {}).items():
+                if key not in self._metadata_codes:
+                    self._metadata_values[key] = {}
+                    self._metadata_codes[key] = np.full(
+                        self.count, _MISSING, dtype=np.uint32
+                    )
+                encoded = json.dumps(value)
+                values = self._metadata_values[key]
+                code = values.setdefault(encoded, len(values))
+                self._metadata_codes[key][self.rows + i] = code
+        self.rows += len(ids)
+
+    def _append(self, name: str, data: bytes, dtype: str = "uint8") -> None:
+        offset = _aligned(self._end)
+        self._file.seek(offset)
+        self._file.write(data)
+        self.sections[name] = {
+            "offset": offset,
+            "length": len(data),
+            "dtype": dtype,
+            "shape": [len(data) // np.dtype(dtype).itemsize],
+        }
+        self._end = offset + len(data)
+
+    def _append_strings(self, name: str, column: _StringColumnWriter):
+        blocks = column.finish()
+        offsets = np.zeros(len(blocks) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(block) for block in blocks])
+        self._append(f"{name}.blocks", b"".join(blocks))
+        self._append(f"{name}.offsets", offsets.tobytes(), "uint64")
+
+    def close(self, **info: Any):
+        """Write the variable-size sections and the footer; `info` goes into the footer."""
+        if self.rows != self.count:
+            raise ValueError(f"Snapshot has {self.rows} of {self.count} rows")
+        self._append_strings("ids", self._ids)
+        self._append_strings("texts", self._texts)
+        for key, codes in self._metadata_codes.items():
+            self._append(f"metadata.{key}.codes", codes.tobytes(), "uint32")
+            values = sorted(
+                self._metadata_values[key], key=self._metadata_values[key].get
+            )
+            self._append(
+                f"metadata.{key}.values", zlib.compress(json.dumps(values).encode())
+            )
+
+        footer = json.dumps(
+            {
+                "format": 1,
+                "count": self.count,
+                "dimension": self.dimension,
+                "embedding_dtype": self.dtype,
+                "text_block_size": TEXT_BLOCK_SIZE,
+                "string_block_size": STRING_BLOCK_SIZE,
+                "metadata_keys": list(self._metadata_codes),
+                "sections": self.sections,
+                "created_at": time.time(),
+                **info,
+            }
+        ).encode()
+        self._file.seek(self._end)
+        self._file.write(footer + _FOOTER.pack(len(footer)) + MAGIC)
+        self._file.close()
+
+
+class _StringColumnReader:
+    def __init__(
+        self, blocks: np.ndarray, offsets: np.ndarray, block_size: int, cache: int
+    ):
+        self.blocks = blocks
+        self.offsets = offsets
+        self.block_size = block_size
+        self.cache_size = cache
+        self._cache: "OrderedDict[int, List[str]]" = OrderedDict()
+
+    def _block(self, index: int) -> List[str]:
+        if index in self._cache:
+            self._cache.move_to_end(index)
+            return self._cache[index]
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        values = json.loads(zlib.decompress(self.blocks[start:end].tobytes()))
+        self._cache[index] = values
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return values
+
+    def __getitem__(self, row: int) -> str:
+        return self._block(row // self.block_size)[row % self.block_size]
+
+    def all(self) -> List[str]:
+        return [
+            value
+            for index in range(len(self.offsets) - 1)
+            for value in json.loads(
+                zlib.decompress(
+                    self.blocks[
+                        int(self.offsets[index]) : int(self.offsets[index + 1])
+                    ].tobytes()
+                )
+            )
+        ]
+
+
+class IndexSnapshot:
+    """A memory-mapped snapshot, usable as a read-only vector store.
+
+    Opening reads the footer and maps the file; no index is rebuilt. Search is
+    exact (brute-force cosine similarity). Unless it would exceed
+    `max_search_matrix_bytes`, the embeddings are dequantized and normalized once
+    into a float32 matrix at open, so a query is a single matrix-vector product;
+    otherwise each query dequantizes the mapped rows chunk by chunk. Texts are
+    decompressed per block for the returned rows only.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        text_cache_blocks: int = 256,
+        max_search_matrix_bytes: int = 2 << 30,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self._map = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if (
+            bytes(self._map[: len(MAGIC)]) != MAGIC
+            or bytes(self._map[-len(MAGIC) :]) != MAGIC
+        ):
+            raise ValueError(f"{path} is not an index snapshot")
+        footer_end = len(self._map) - len(MAGIC) - _FOOTER.size
+        (footer_length,) = _FOOTER.unpack(bytes(self._map[footer_end : -len(MAGIC)]))
+        self.info = json.loads(
+            bytes(self._map[footer_end - footer_length : footer_end])
+        )
+        self.count = self.info["count"]
+
+        self.embeddings = self._section("embeddings")
+        self.scales = (
+            self._section("scales") if "scales" in self.info["sections"] else None
+        )
+        self.norms = self._section("norms")
+        self.texts = _StringColumnReader(
+            self._section("texts.blocks"),
+            self._section("texts.offsets"),
+            self.info["text_block_size"],
+            text_cache_blocks,
+        )
+        self.ids = _StringColumnReader(
+            self._section("ids.blocks"),
+            self._section("ids.offsets"),
+            self.info["string_block_size"],
+            text_cache_blocks,
+        )
+        self._metadata = {
+            key: (
+                self._section(f"metadata.{key}.codes"),
+                json.loads(
+                    zlib.decompress(self._section(f"metadata.{key}.values").tobytes())
+                ),
+            )
+            for key in self.info["metadata_keys"]
+        }
+        self._id_map: Optional[Dict[str, int]] = None
+
+        self._search_matrix: Optional[np.ndarray] = None
+        if self.count * self.info["dimension"] * 4 <= max_search_matrix_bytes:
+            self._search_matrix = np.empty(
+                (self.count, self.info["dimension"]), dtype=np.float32
+            )
+            for start in range(0, self.count, SEARCH_CHUNK_ROWS):
+                end = min(start + SEARCH_CHUNK_ROWS, self.count)
+                self._search_matrix[start:end] = self._scaled_rows(start, end)
+        self.logger.info(
+            f"Opened snapshot {self.path} with {self.count} "
+            f"{self.info['embedding_dtype']} embeddings"
+        )
+
+    def _section(self, name: str) -> np.ndarray:
+        section = self.info["sections"][name]
+        return np.ndarray(
+            shape=tuple(section["shape"]),
+            dtype=section["dtype"],
+            buffer=self._map,
+            offset=section["offset"],
+        )
+
+    def row_of(self, doc_id: str) -> Optional[int]:
+        """Row of a chunk id (the id map is built on first use)."""
+        if self._id_map is None:
+            self._id_map = {doc_id: row for row, doc_id in enumerate(self.ids.all())}
+        return self._id_map.get(doc_id)
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        return {
+            key: json.loads(values[codes[row]])
+            for key, (codes, values) in self._metadata.items()
+            if codes[row] != _MISSING
+        }
+
+    def embedding(self, row: int) -> np.ndarray:
+        vector = self.embeddings[row].astype(np.float32)
+        return vector * self.scales[row] if self.scales is not None else vector
+
+    def _scaled_rows(self, start: int, end: int) -> np.ndarray:
+        """Rows `start:end` dequantized and scaled to unit length."""
+        rows = self.embeddings[start:end].astype(np.float32)
+        factors = 1.0 / np.maximum(self.norms[start:end], 1e-12)
+        if self.scales is not None:
+            factors *= self.scales[start:end]
+        rows *= factors[:, None]
+        return rows
+
+    def search(self, query_embedding: List[float], k: int) -> List[tuple]:
+        """`(row, cosine similarity)` of the `k` most similar rows, best first."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (float(np.linalg.norm(query)) or 1.0)
+        if self._search_matrix is not None:
+            scores = self._search_matrix @ query
+        else:
+            scores = np.empty(self.count, dtype=np.float32)
+            for start in range(0, self.count, SEARCH_CHUNK_ROWS):
+                end = min(start + SEARCH_CHUNK_ROWS, self.count)
+                scores[start:end] = self._scaled_rows(start, end) @ query
+
+        k = min(k, self.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    async def query(self, query_embedding: List[float], k: int) -> List[Document]:
+        """Same results as `VectorStore.query`, served from the snapshot."""
+        if self.count == 0:
+            self.logger.warning("Snapshot is empty")
+            return []
+        documents = [
+            Document(
+                content=self.texts[row],
+                metadata=DocumentMetadata(**self.metadata(row)),
+                score=score,
+                id=self.ids[row],
+            )
+            for row, score in self.search(query_embedding, k)
+        ]
+        if documents and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Retrieved %d documents from snapshot, top score %.3f",
+                len(documents),
+                documents[0].score,
+            )
+        return documents
+
+    def get_collection_version(self) -> str:
+        return f"snapshot:{self.info.get('version')}:{self.info['created_at']}"
+
+    async def get_document_count(self) -> int:
+        return self.count
+
+    async def close(self):
+        self._metadata.clear()
+        self._search_matrix = None
+        self._map = None
+
+
+async def export_snapshot(
+    store: VectorStore, path: str, dtype: str = "int8"
+) -> Dict[str, Any]:
+    """Write the whole collection of `store` to a snapshot file; returns its footer."""
+    count = store.collection.count()
+    page_size = store.client.get_max_batch_size()
+    writer = None
+    for offset in range(0, max(count, 1), page_size):
+        page = store.collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=page_size,
+            offset=offset,
+        )
+        if not page["ids"]:
+            break
+        embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+        if writer is None:
+            writer = SnapshotWriter(path, count, embeddings.shape[1], dtype)
+        writer.add(page["ids"], page["documents"], page["metadatas"], embeddings)
+        store.logger.info(f"Exported {writer.rows}/{count} documents")
+
+    if writer is None:
+        raise ValueError("Cannot snapshot an empty collection")
+    writer.close(
+        collection=store.collection.name,
+        collection_metadata=store.collection.metadata or {},
+        version=store.get_collection_version(),
+    )
+    return IndexSnapshot(path).info
+
+
+async def import_snapshot(snapshot: IndexSnapshot, store: VectorStore) -> int:
+    """Add every row of `snapshot` to `store`, keeping the chunk ids; returns rows added."""
+    page_size = store.client.get_max_batch_size()
+    ids = snapshot.ids.all()
+    added = 0
+    for start in range(0, snapshot.count, page_size):
+        rows = range(start, min(start + page_size, snapshot.count))
+        embeddings = snapshot.embeddings[start : rows.stop].astype(np.float32)
+        if snapshot.scales is not None:
+            embeddings *= snapshot.scales[start : rows.stop, None]
+        documents = [
+            Document(
+                content=snapshot.texts[row],
+                metadata=DocumentMetadata(**snapshot.metadata(row)),
+            )
+            for row in rows
+        ]
+        added += await store.bulk_add_documents(
+            documents, embeddings, doc_ids=ids[start : rows.stop]
+        )
+        store.logger.info(f"Imported {rows.stop}/{snapshot.count} documents")
+    return added
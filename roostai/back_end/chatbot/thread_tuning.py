@@ -0,0 +1,76 @@
+import json
+import logging
+import os
+import platform
+from typing import Any, Dict, Optional
+
+from .config import RuntimeConfig
+from .warmup import resolve_path
+
+logger = logging.getLogger(__name__)
+
+
+def host_fingerprint() -> Dict[str, Any]:
+    """Identify the host so tuned settings are not applied to different hardware."""
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "system": platform.system(),
+    }
+
+
+def load_tuned_settings(
+    path: str, single_process: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Load settings written by `scripts/tune_threads.py` if they match this host.
+
+    By default this is the best overall setting (which may use several pre-fork
+    workers); `single_process` selects the best setting for one process.
+    """
+    settings_path = resolve_path(path)
+    if not settings_path.exists():
+        return None
+
+    with open(settings_path) as f:
+        settings = json.load(f)
+
+    if settings.get("host") != host_fingerprint():
+        logger.warning(
+            f"Ignoring thread settings in {settings_path}: tuned on a different host"
+        )
+        return None
+    return settings.get("best_single_process" if single_process else "best")
+
+
+def apply_thread_settings(
+    intra_op_threads: Optional[int], inter_op_threads: Optional[int]
+):
+    """Set torch's intra-op and inter-op thread counts (None keeps the default)."""
+    import torch
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            # Only possible before the first inter-op parallel work in the process
+            logger.warning(f"Could not set inter-op threads: {e}")
+
+
+def configure_runtime_threads(config: RuntimeConfig) -> Dict[str, Any]:
+    """Apply explicit thread settings from the config, falling back to tuned ones."""
+    settings = {}
+    if config.apply_tuned_settings:
+        settings = (
+            load_tuned_settings(config.thread_settings_path, single_process=True) or {}
+        )
+
+    intra = config.torch_intra_op_threads or settings.get("intra_op_threads")
+    inter = config.torch_inter_op_threads or settings.get("inter_op_threads")
+    apply_thread_settings(intra, inter)
+
+    applied = {"intra_op_threads": intra, "inter_op_threads": inter}
+    logger.info(f"Torch thread settings: {applied}")
+    return applied
@@ -1,3 +1,4 @@
+import time
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -16,6 +17,7 @@ class Document:
     metadata: DocumentMetadata
     score: Optional[float] = None  # Score after reranking
     vector_score: Optional[float] = None  # Original vector similarity score
+    id: Optional[str] = None  # Chunk id in the vector store
 
 
 @dataclass
@@ -23,3 +25,23 @@ class QueryResult:
     documents: List[Document]
     quality_score: float
     response: Optional[str] = None
+
+
+@dataclass
+class Deadline:
+    """Absolute point in time (monotonic clock) by which a request must be answered."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Create a deadline `seconds` from now."""
+        return cls(expires_at=time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
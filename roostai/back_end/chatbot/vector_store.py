@@ -1,8 +1,10 @@
 import hashlib
 import logging
-from typing import List
+from typing import List, Optional, Set
 
 import chromadb
+import numpy as np
+from chromadb.api.client import SharedSystemClient
 from chromadb.config import Settings
 from chromadb.errors import InvalidCollectionException
 
@@ -17,6 +19,8 @@ def _generate_document_id(content: str) -> str:
 class VectorStore:
     def __init__(self, collection_name: str, db_path: str):
         self.logger = logging.getLogger(__name__)
+        # Ids in the collection, loaded on the first bulk write (see `_known_ids`)
+        self._ids: Optional[Set[str]] = None
         try:
             self.db_path = db_path
             self.client = chromadb.PersistentClient(
@@ -71,7 +75,8 @@ class VectorStore:
                 and results["documents"]
                 and len(results["documents"][0]) > 0
             ):
-                for doc, metadata, distance in zip(
+                for doc_id, doc, metadata, distance in zip(
+                    results["ids"][0],
                     results["documents"][0],
                     results["metadatas"][0],
                     results["distances"][0],
@@ -84,13 +89,19 @@ class VectorStore:
                     doc_metadata = DocumentMetadata(**metadata)
                     documents.append(
                         Document(
-                            content=doc, metadata=doc_metadata, score=similarity_score
+                            content=doc,
+                            metadata=doc_metadata,
+                            score=similarity_score,
+                            id=doc_id,
                         )
                     )
 
-                self.logger.info(f"Retrieved {len(documents)} documents")
-                if documents:
-                    self.logger.debug(f"Top document score: {documents[0].score}")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        "Retrieved %d documents, top score %.3f",
+                        len(documents),
+                        documents[0].score,
+                    )
             else:
                 self.logger.info("No matching documents found")
                 return []
@@ -105,57 +116,121 @@ class VectorStore:
         self, documents: List[Document], embeddings: List[List[float]]
     ):
         """Add documents to the vector store, skipping existing ones."""
+        await self.bulk_add_documents(
+            documents, np.asarray(embeddings, dtype=np.float32)
+        )
+
+    def _known_ids(self) -> Set[str]:
+        """Ids in the collection, read once in pages and then kept up to date.
+
+        Writes through this store update the set, so it is only exact while this
+        process is the only one writing to the collection (as during ingestion).
+        """
+        if self._ids is None:
+            ids: Set[str] = set()
+            page_size = self.client.get_max_batch_size()
+            offset = 0
+            while True:
+                page = self.collection.get(include=[], limit=page_size, offset=offset)
+                ids.update(page["ids"])
+                if len(page["ids"]) < page_size:
+                    break
+                offset += page_size
+            self._ids = ids
+            self.logger.info(f"Loaded {len(ids)} existing document ids")
+        return self._ids
+
+    async def bulk_add_documents(
+        self,
+        documents: List[Document],
+        embeddings: np.ndarray,
+        doc_ids: Optional[List[str]] = None,
+    ) -> int:
+        """Add documents with an `(n, dimension)` embedding array, skipping existing ids.
+
+        Ids are content hashes, so an existing id already holds the same chunk and is
+        left as is. Existence is checked against the local id set instead of a
+        `collection.get` per batch, and new rows are written in chunks of Chroma's
+        maximum batch size, passing embedding rows without converting them to
+        lists. Returns the number of documents added.
+        """
         try:
-            # Generate unique IDs for documents
-            doc_ids = [_generate_document_id(doc.content) for doc in documents]
+            if doc_ids is None:
+                doc_ids = [_generate_document_id(doc.content) for doc in documents]
+            known_ids = self._known_ids()
+
+            new_rows = []
+            batch_ids: Set[str] = set()
+            for row, doc_id in enumerate(doc_ids):
+                if doc_id not in known_ids and doc_id not in batch_ids:
+                    batch_ids.add(doc_id)
+                    new_rows.append(row)
+
+            if not new_rows:
+                self.logger.info("No new documents to add")
+                return 0
 
-            # Check which documents already exist
-            existing_ids = set()
-            try:
-                existing_docs = self.collection.get(ids=doc_ids)
-                existing_ids = set(existing_docs["ids"])
-            except Exception as e:
-                self.logger.debug(f"Error checking existing documents: {e}")
-
-            # Filter out existing documents
-            new_docs = []
-            new_embeddings = []
-            new_ids = []
-            new_metadata = []
-
-            for doc, embedding, doc_id in zip(documents, embeddings, doc_ids):
-                if doc_id not in existing_ids:
-                    new_docs.append(doc.content)
-                    new_embeddings.append(embedding)
-                    new_ids.append(doc_id)
-
-                    # Convert DocumentMetadata to dictionary based on the fields in `doc.metadata`
-                    # Append to `new_metadata`
-                    new_metadata.append(doc.metadata.__dict__)
-
-            if new_docs:
+            new_embeddings = embeddings[new_rows]
+            batch_size = self.client.get_max_batch_size()
+            for start in range(0, len(new_rows), batch_size):
+                rows = new_rows[start : start + batch_size]
+                ids = [doc_ids[row] for row in rows]
                 self.collection.add(
-                    documents=new_docs,
-                    embeddings=new_embeddings,
-                    metadatas=new_metadata,
-                    ids=new_ids,
+                    documents=[documents[row].content for row in rows],
+                    embeddings=new_embeddings[start : start + batch_size],
+                    metadatas=[documents[row].metadata.__dict__ for row in rows],
+                    ids=ids,
                 )
-                self.logger.info(f"Added {len(new_docs)} new documents to collection")
-            else:
-                self.logger.info("No new documents to add")
+                known_ids.update(ids)
+            self.logger.info(f"Added {len(new_rows)} new documents to collection")
+            return len(new_rows)
 
         except Exception as e:
             self.logger.error(f"Failed to add documents: {e}")
             raise
 
+    async def delete_documents(self, doc_ids: List[str]):
+        """Delete documents by id; ids not in the collection are ignored."""
+        try:
+            batch_size = self.client.get_max_batch_size()
+            for start in range(0, len(doc_ids), batch_size):
+                self.collection.delete(ids=doc_ids[start : start + batch_size])
+            if self._ids is not None:
+                self._ids.difference_update(doc_ids)
+            self.logger.info(f"Deleted {len(doc_ids)} documents from collection")
+        except Exception as e:
+            self.logger.error(f"Failed to delete documents: {e}")
+            raise
+
+    def get_collection_version(self) -> str:
+        """Identify the current contents of the collection.
+
+        Uses the "version" collection metadata if the ingestion set one, otherwise
+        the collection id and document count, which change on every re-ingestion.
+        """
+        metadata = self.collection.metadata or {}
+        if "version" in metadata:
+            return str(metadata["version"])
+        return f"{self.collection.id}:{self.collection.count()}"
+
     async def get_document_count(self) -> int:
         """Get the total number of documents in the collection."""
         return self.collection.count()
 
-    async def close(self):
-        """Close the vector store connection without destroying data."""
+    async def close(self, release_system: bool = False):
+        """Close the vector store connection without destroying data.
+
+        Chroma keeps one system (with the loaded HNSW index) per path for the whole
+        process; `release_system` also stops it and drops it from that cache. Only
+        use it when no other store in this process is open on the same path.
+        """
         try:
             if hasattr(self, "client"):
+                if release_system and self.client is not None:
+                    systems = SharedSystemClient._identifier_to_system
+                    system = systems.pop(self.client._identifier, None)
+                    if system is not None:
+                        system.stop()
                 # Don't reset, just remove the references
                 self.collection = None
                 self.client = None
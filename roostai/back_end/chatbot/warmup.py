@@ -0,0 +1,59 @@
+import csv
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from .query_log import list_segments, read_segment
+
+logger = logging.getLogger(__name__)
+
+# Relative paths in the config are resolved against the repository root
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+def resolve_path(path: str) -> Path:
+    """Resolve `path` relative to the repository root unless it is absolute."""
+    resolved = Path(path)
+    return resolved if resolved.is_absolute() else PROJECT_ROOT / resolved
+
+
+def load_faq_questions(csv_path: str) -> List[str]:
+    """Read the `question` column of a FAQ pairs CSV."""
+    path = resolve_path(csv_path)
+    if not path.exists():
+        logger.warning(f"FAQ file not found: {path}")
+        return []
+
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row["question"] for row in csv.DictReader(f) if row.get("question")]
+
+
+def load_logged_queries(log_dir: str, limit: int) -> List[str]:
+    """Read the most recent queries from the query log segments written by `QueryLogger`."""
+    queries = []
+    for segment in reversed(list_segments(log_dir)):
+        records = [record.get("query") for record in read_segment(segment)]
+        queries.extend(query for query in reversed(records) if query)
+        if len(queries) >= limit:
+            break
+    return queries[:limit]
+
+
+def load_warmup_queries(
+    faq_files: List[str], query_log_dir: Optional[str], max_queries: int
+) -> List[str]:
+    """Representative queries for warmup: recent logged queries first, then FAQ questions."""
+    candidates = []
+    if query_log_dir:
+        candidates.extend(load_logged_queries(query_log_dir, max_queries))
+    for faq_file in faq_files:
+        candidates.extend(load_faq_questions(faq_file))
+
+    queries = []
+    seen = set()
+    for query in candidates:
+        key = query.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            queries.append(query.strip())
+    return queries[:max_queries]
@@ -10,44 +10,45 @@ import sys
 
 import asyncio
 import logging
+import math
 import time
-from pathlib import Path
-import json
-from datetime import datetime
+from contextlib import contextmanager
 
+from roostai.back_end.chatbot.admission import AdmissionController, AdmissionRejected
 from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.degradation import (
+    DegradationController,
+    DegradationMode,
+    extractive_answer,
+)
+from roostai.back_end.chatbot.faq_index import FAQIndex
+from roostai.back_end.chatbot.index_manager import IndexManager, read_index_pointer
 from roostai.back_end.chatbot.llm_manager import LLMManager
+from roostai.back_end.chatbot.logging_setup import configure_logging
+from roostai.back_end.chatbot.query_log import QueryLogger
 from roostai.back_end.chatbot.quality_checker import QualityChecker
 from roostai.back_end.chatbot.query_processor import QueryProcessor
 from roostai.back_end.chatbot.reranker import Reranker
+from roostai.back_end.chatbot.response_cache import ResponseCache, store_version
+from roostai.back_end.chatbot.snapshot import IndexSnapshot
+from roostai.back_end.chatbot.thread_tuning import configure_runtime_threads
+from roostai.back_end.chatbot.types import Deadline, QueryResult
 from roostai.back_end.chatbot.vector_store import VectorStore
+from roostai.back_end.chatbot.warmup import load_warmup_queries, resolve_path
 
-# Enhanced logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(sys.argv[0].replace(".py", ".log")),
-    ],
-)
+# Stream and file handlers run on a background thread (see `chatbot/logging_setup.py`)
+configure_logging(Config.load_config().logging)
 logger = logging.getLogger(__name__)
 
 
-class QueryLogger:
-    """Helper class to log query results for analysis."""
-
-    def __init__(self, log_dir: str = "query_logs"):
-        self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
-
-    def log_query(self, results: Dict[str, Any]):
-        """Log query results to a JSON file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.log_dir / f"query_{timestamp}.json"
-
-        with open(filename, "w") as f:
-            json.dump(results, f, indent=2)
+@contextmanager
+def stage_timer(results: Dict[str, Any], stage: str):
+    """Record the duration of a pipeline stage in `results["metrics"]["timings"]`."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        results["metrics"]["timings"][stage] = time.monotonic() - start
 
 
 def verify_db_path(db_path: str) -> bool:
@@ -66,53 +67,160 @@ def verify_db_path(db_path: str) -> bool:
 
 
 class UniversityChatbot:
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize the chatbot with optional custom database path."""
-        self.config = Config.load_config()
+    def __init__(self, db_path: Optional[str] = None, config: Optional[Config] = None):
+        """Initialize the chatbot with optional custom database path and configuration."""
+        self.config = config or Config.load_config()
         if db_path:
             self.config.vector_db.db_path = db_path
 
-        if not verify_db_path(self.config.vector_db.db_path):
-            raise ValueError(f"Invalid database path: {self.config.vector_db.db_path}")
+        self._verify_index_source()
 
         self.logger = logging.getLogger(__name__)
-        self.query_logger = QueryLogger()
+        self.query_logger = (
+            QueryLogger(self.config.query_log)
+            if self.config.query_log.enabled
+            else None
+        )
+
+        # Set once `warmup()` has finished; the chatbot should not be reported as ready before
+        self.ready = False
+        self.warmup_stats: Optional[Dict[str, Any]] = None
+
+        # Thread settings must be in place before the models run for the first time
+        self.thread_settings = configure_runtime_threads(self.config.runtime)
 
         # Initialize components
         self._init_components()
 
+    def _verify_index_source(self):
+        """Check that the index to serve exists before loading any models."""
+        vector_db = self.config.vector_db
+        if vector_db.index_pointer:
+            # The pointer names the version to serve; db_path/snapshot_path are unused
+            try:
+                pointer = read_index_pointer(vector_db.index_pointer)
+            except (OSError, ValueError, TypeError) as e:
+                raise ValueError(
+                    f"Invalid index pointer {vector_db.index_pointer}: {e}"
+                ) from e
+            if pointer.snapshot_path:
+                if not os.path.isfile(pointer.snapshot_path):
+                    raise ValueError(
+                        f"Snapshot of index version {pointer.version} not found: "
+                        f"{pointer.snapshot_path}"
+                    )
+            elif not verify_db_path(pointer.db_path):
+                raise ValueError(
+                    f"Invalid database path for index version {pointer.version}: "
+                    f"{pointer.db_path}"
+                )
+            logger.info(f"Index pointer names version {pointer.version}")
+        elif vector_db.snapshot_path:
+            # A snapshot replaces the Chroma database, which need not exist
+            if not os.path.isfile(vector_db.snapshot_path):
+                raise ValueError(f"Snapshot file not found: {vector_db.snapshot_path}")
+            logger.info(f"Found snapshot at: {vector_db.snapshot_path}")
+        elif not verify_db_path(vector_db.db_path):
+            raise ValueError(f"Invalid database path: {vector_db.db_path}")
+
     def _init_components(self):
         """Initialize all chatbot components."""
         try:
+            cache = self.config.cache
             self.query_processor = QueryProcessor(
-                model_name=self.config.model.embedding_model
+                model_name=self.config.model.embedding_model,
+                embedding_store_dir=(
+                    cache.embedding_store_dir if cache.embedding_store_enabled else None
+                ),
+                embedding_store_shard_size=cache.embedding_store_shard_size,
             )
 
-            self.vector_store = VectorStore(
-                collection_name=self.config.vector_db.collection_name,
-                db_path=self.config.vector_db.db_path,
-            )
+            self.index_manager = None
+            if self.config.vector_db.index_pointer:
+                self.index_manager = IndexManager(
+                    self.config.vector_db,
+                    warm=self._warm_index,
+                    on_swap=self._swap_index,
+                )
+                self.vector_store = self.index_manager.open_current()
+            elif self.config.vector_db.snapshot_path:
+                self.vector_store = IndexSnapshot(self.config.vector_db.snapshot_path)
+            else:
+                self.vector_store = VectorStore(
+                    collection_name=self.config.vector_db.collection_name,
+                    db_path=self.config.vector_db.db_path,
+                )
 
             self.reranker = Reranker(model_name=self.config.model.cross_encoder_model)
 
+            self.faq_index = self._load_faq_index()
+
             self.quality_checker = QualityChecker(
                 min_score=self.config.thresholds.quality_min_score,
                 min_docs=self.config.thresholds.quality_min_docs,
             )
 
+            self.response_cache = None
+            if self.config.cache.response_cache_enabled:
+                self.response_cache = ResponseCache(
+                    path=self.config.cache.response_cache_path,
+                    version=store_version(self.vector_store),
+                    max_entries=self.config.cache.response_cache_max_entries,
+                )
+
             self.llm_manager = LLMManager(
                 model_name=self.config.model.llm_model,
                 config=self.config,
                 llm_model=self.config.model.llm_model,
+                response_cache=self.response_cache,
             )
 
-            # Verify database access
-            asyncio.create_task(self._verify_db_access())
+            self.admission = AdmissionController(self.config.admission)
+            self.degradation = DegradationController(
+                self.config.degradation, utilization=self.admission.load
+            )
+
+            # Verify database access (only possible when created inside an event loop)
+            try:
+                asyncio.get_running_loop().create_task(self._verify_db_access())
+            except RuntimeError:
+                self.logger.debug(
+                    "No running event loop, skipping database verification"
+                )
 
         except Exception as e:
             self.logger.error(f"Failed to initialize components: {e}")
             raise
 
+    def _load_faq_index(self) -> Optional[FAQIndex]:
+        """Load the FAQ fast-path index, building it if configured to."""
+        faq_config = self.config.faq
+        if not faq_config.enabled:
+            return None
+
+        index_path = resolve_path(faq_config.index_path)
+        if index_path.exists():
+            faq_index = FAQIndex.load(str(index_path))
+            if faq_index.model_name != self.config.model.embedding_model:
+                self.logger.warning(
+                    f"FAQ index was built with {faq_index.model_name}, not "
+                    f"{self.config.model.embedding_model}; disabling FAQ answers"
+                )
+                return None
+        elif faq_config.build_if_missing:
+            faq_index = FAQIndex.build(
+                faq_config.faq_files,
+                self.query_processor.model,
+                self.config.model.embedding_model,
+            )
+            faq_index.save(str(index_path))
+        else:
+            self.logger.warning(f"FAQ index not found at {index_path}")
+            return None
+
+        self.logger.info(f"Loaded FAQ index with {len(faq_index)} questions")
+        return faq_index
+
     async def _verify_db_access(self):
         """Verify database access and log statistics."""
         try:
@@ -122,8 +230,135 @@ class UniversityChatbot:
             self.logger.error(f"Database verification failed: {e}")
             raise
 
-    async def process_query(self, query: str, verbose: bool = False) -> Dict[str, Any]:
-        """Process a query and return detailed results dictionary."""
+    async def warmup(self) -> Dict[str, Any]:
+        """Run representative queries through embedding, search and reranking.
+
+        Loads model weights, warms up the tokenizers and fills the embedding and
+        SQLite page caches so the first real query does not pay for them. The
+        chatbot is marked ready afterwards.
+        """
+        stats = {
+            "queries": 0,
+            "failed": 0,
+            "embedding_seconds": 0.0,
+            "search_seconds": 0.0,
+            "rerank_seconds": 0.0,
+            "total_seconds": 0.0,
+        }
+        warmup_config = self.config.warmup
+        if not warmup_config.enabled:
+            self.warmup_stats = stats
+            self.ready = True
+            return stats
+
+        queries = load_warmup_queries(
+            warmup_config.faq_files,
+            warmup_config.query_log_dir,
+            warmup_config.max_queries,
+        )
+        self.logger.info(f"Warming up with {len(queries)} queries...")
+
+        start_time = time.monotonic()
+        for query in queries:
+            try:
+                stage_start = time.monotonic()
+                (
+                    cleaned_query,
+                    query_embedding,
+                ) = await self.query_processor.process_query(query)
+                stats["embedding_seconds"] += time.monotonic() - stage_start
+
+                stage_start = time.monotonic()
+                documents = await self.vector_store.query(
+                    query_embedding, k=self.config.vector_db.top_k
+                )
+                stats["search_seconds"] += time.monotonic() - stage_start
+
+                stage_start = time.monotonic()
+                await self.reranker.rerank(
+                    cleaned_query,
+                    documents,
+                    threshold=self.config.thresholds.reranking_threshold,
+                )
+                stats["rerank_seconds"] += time.monotonic() - stage_start
+                stats["queries"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                self.logger.warning(f"Warmup query failed: {e}")
+
+        stats["total_seconds"] = time.monotonic() - start_time
+        self.warmup_stats = stats
+        self.ready = True
+        self.logger.info(
+            f"Warmup finished in {stats['total_seconds']:.2f}s "
+            f"({stats['queries']} queries, {stats['failed']} failed; "
+            f"embedding {stats['embedding_seconds']:.2f}s, "
+            f"search {stats['search_seconds']:.2f}s, "
+            f"rerank {stats['rerank_seconds']:.2f}s)"
+        )
+        return stats
+
+    def _warm_index(self, store):
+        """Run the warmup searches against a newly opened index (in a background thread)."""
+        warmup_config = self.config.warmup
+        if not warmup_config.enabled:
+            return
+        queries = load_warmup_queries(
+            warmup_config.faq_files,
+            warmup_config.query_log_dir,
+            warmup_config.max_queries,
+        )
+
+        async def _search():
+            for query in queries:
+                _, query_embedding = await self.query_processor.process_query(query)
+                await store.query(query_embedding, k=self.config.vector_db.top_k)
+
+        asyncio.run(_search())
+
+    def _swap_index(self, store):
+        """Serve from `store` from the next search on; returns the replaced store.
+
+        Cached responses are scoped to the collection version, so the response
+        cache moves to the new one. Query embeddings and FAQ answers do not depend
+        on the index and are kept.
+        """
+        old_store, self.vector_store = self.vector_store, store
+        if self.response_cache is not None:
+            self.response_cache.set_version(store_version(store))
+        return old_store
+
+    def is_ready(self) -> bool:
+        """Whether the chatbot has finished warming up."""
+        return self.ready
+
+    async def process_query(
+        self, query: str, verbose: bool = False, deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Process a query and return detailed results dictionary.
+
+        `deadline` bounds the end-to-end latency of the query; it defaults to
+        `config.pipeline.request_deadline` seconds from now.
+        """
+        if deadline is None:
+            deadline = Deadline.after(self.config.pipeline.request_deadline)
+        if self.index_manager is not None:
+            self.index_manager.maybe_swap()
+
+        start_time = time.monotonic()
+        mode = self.degradation.current_mode()
+        results = await self._run_pipeline(query, verbose, deadline, mode)
+        latency = time.monotonic() - start_time
+        self.degradation.observe(latency)
+        results["metrics"]["timings"]["total"] = latency
+        if self.query_logger is not None:
+            self.query_logger.log_query(results)
+        return results
+
+    async def _run_pipeline(
+        self, query: str, verbose: bool, deadline: Deadline, mode: DegradationMode
+    ) -> Dict[str, Any]:
+        """Run the query through all stages using the given degradation mode."""
         try:
             results = {
                 "query": query,  # user query
@@ -131,11 +366,15 @@ class UniversityChatbot:
                 "stage": None,  # for debugging
                 "error": None,  # for debugging
                 "contexts": None,  # retrieved contexts
+                "retry_after": None,  # seconds to wait before retrying a rejected query
+                "degraded": [],  # shortcuts taken because a stage was saturated
+                "mode": mode.name.lower(),  # degradation mode that served the query
                 "metrics": {
                     "initial_docs_count": 0,
                     "reranked_docs_count": 0,
                     "quality_score": 0.0,
                     "top_doc_score": None,
+                    "timings": {},  # seconds spent in each stage
                 },
             }
 
@@ -146,20 +385,44 @@ class UniversityChatbot:
 
             # 1. Query Processing
             try:
-                (
-                    cleaned_query,
-                    query_embedding,
-                ) = await self.query_processor.process_query(query)
+                with stage_timer(results, "query_processing"):
+                    async with self.admission.slot("embedding", deadline.remaining()):
+                        (
+                            cleaned_query,
+                            query_embedding,
+                        ) = await self.query_processor.process_query(query)
                 results["metrics"]["cleaned_query"] = cleaned_query
+            except AdmissionRejected as e:
+                return self._reject(results, e)
             except Exception as e:
                 results["error"] = f"Query processing failed: {str(e)}"
                 results["stage"] = "query_processing"
                 return results
 
+            # FAQ fast path: answer curated questions without search, reranking or LLM
+            if self.faq_index is not None:
+                with stage_timer(results, "faq"):
+                    match = self.faq_index.match(query_embedding)
+                if match is not None and match.score >= self.config.faq.min_score:
+                    results["metrics"]["faq_score"] = match.score
+                    results["metrics"]["faq_question"] = match.question
+                    results["response"] = match.answer
+                    results["contexts"] = [match.answer]
+                    results["stage"] = "faq"
+                    return results
+
             # 2. Vector Search
-            documents = await self.vector_store.query(
-                query_embedding, k=self.config.vector_db.top_k
-            )
+            top_k = self.config.vector_db.top_k
+            if mode >= DegradationMode.REDUCED_TOP_K:
+                top_k = min(top_k, self.config.degradation.reduced_top_k)
+            try:
+                with stage_timer(results, "vector_search"):
+                    async with self.admission.slot("search", deadline.remaining()):
+                        documents = await self.vector_store.query(
+                            query_embedding, k=top_k
+                        )
+            except AdmissionRejected as e:
+                return self._reject(results, e)
             results["metrics"]["initial_docs_count"] = len(documents)
 
             if documents:
@@ -180,11 +443,28 @@ class UniversityChatbot:
                 return results
 
             # 3. Reranking
-            reranked_docs = await self.reranker.rerank(
-                cleaned_query,
-                documents,
-                threshold=self.config.thresholds.reranking_threshold,
-            )
+            try:
+                if mode >= DegradationMode.NO_RERANK:
+                    reranked_docs = documents
+                else:
+                    candidates = documents
+                    if mode >= DegradationMode.CASCADE_RERANK:
+                        candidates = documents[
+                            : self.config.degradation.cascade_rerank_k
+                        ]
+                    with stage_timer(results, "rerank"):
+                        async with self.admission.slot("rerank", deadline.remaining()):
+                            reranked_docs = await self.reranker.rerank(
+                                cleaned_query,
+                                candidates,
+                                threshold=self.config.thresholds.reranking_threshold,
+                            )
+            except AdmissionRejected as e:
+                if self.admission.policy != "degrade":
+                    return self._reject(results, e)
+                # Fall back to the vector search ranking
+                reranked_docs = documents
+                results["degraded"].append("rerank_skipped")
             results["metrics"]["reranked_docs_count"] = len(reranked_docs)
 
             if reranked_docs:
@@ -196,12 +476,26 @@ class UniversityChatbot:
                     ]
 
             # 4. Quality Check
-            quality_result = await self.quality_checker.check_quality(
-                cleaned_query, reranked_docs
-            )
+            with stage_timer(results, "quality_check"):
+                quality_result = await self.quality_checker.check_quality(
+                    cleaned_query, reranked_docs
+                )
             results["metrics"]["quality_score"] = quality_result.quality_score
 
-            if quality_result.quality_score < self.config.thresholds.quality_min_score:
+            # Without reranking the scores are vector similarities, not cross-encoder scores
+            vector_ranked = (
+                mode >= DegradationMode.NO_RERANK
+                or "rerank_skipped" in results["degraded"]
+            )
+            results["metrics"]["quality_scale"] = (
+                "vector" if vector_ranked else "cross_encoder"
+            )
+            min_score = (
+                self.config.thresholds.vector_quality_min_score
+                if vector_ranked
+                else self.config.thresholds.quality_min_score
+            )
+            if quality_result.quality_score < min_score:
                 results["error"] = "Failed quality check"
                 results["stage"] = "quality_check"
                 results["response"] = (
@@ -210,10 +504,46 @@ class UniversityChatbot:
                 )
                 return results
 
+            if mode >= DegradationMode.SHORT_CONTEXT:
+                quality_result = QueryResult(
+                    documents=quality_result.documents[
+                        : self.config.degradation.short_context_docs
+                    ],
+                    quality_score=quality_result.quality_score,
+                )
+
             # 5. LLM Response Generation
-            response = await self.llm_manager.generate_response(
-                cleaned_query, quality_result
-            )
+            try:
+                with stage_timer(results, "llm"):
+                    if mode >= DegradationMode.CACHE_ONLY:
+                        response = self.llm_manager.get_cached_response(
+                            cleaned_query, quality_result
+                        ) or extractive_answer(
+                            quality_result.documents,
+                            self.config.degradation.extractive_max_chars,
+                        )
+                    else:
+                        # Cache hits must not queue behind (or be shed with) LLM calls
+                        response = self.llm_manager.get_cached_response(
+                            cleaned_query, quality_result
+                        )
+                        if response is None:
+                            async with self.admission.slot("llm", deadline.remaining()):
+                                response = await self.llm_manager.generate_response(
+                                    cleaned_query,
+                                    quality_result,
+                                    deadline=deadline,
+                                    check_cache=False,
+                                )
+            except AdmissionRejected as e:
+                response = None
+                if self.admission.policy == "degrade":
+                    response = self.llm_manager.get_cached_response(
+                        cleaned_query, quality_result
+                    )
+                if response is None:
+                    return self._reject(results, e)
+                results["degraded"].append("cache_only")
             results["response"] = response
             results["stage"] = "complete"
             results["contexts"] = [
@@ -228,6 +558,19 @@ class UniversityChatbot:
             results["response"] = "An error occurred processing your query."
             return results
 
+    def _reject(
+        self, results: Dict[str, Any], rejection: AdmissionRejected
+    ) -> Dict[str, Any]:
+        """Fill in the results of a query turned away by admission control."""
+        results["error"] = str(rejection)
+        results["stage"] = "admission"
+        results["retry_after"] = rejection.retry_after
+        results["response"] = (
+            "RoostAI is answering a lot of questions right now. "
+            f"Please try again in {math.ceil(rejection.retry_after)} seconds."
+        )
+        return results
+
     async def get_document_count(self) -> int:
         """Get the total number of documents in the system."""
         return await self.vector_store.get_document_count()
@@ -241,6 +584,13 @@ class UniversityChatbot:
             tasks.append(self.llm_manager.close())
         if hasattr(self, "query_processor"):
             self.query_processor.clear_cache()
+            self.query_processor.close()
+        if getattr(self, "index_manager", None) is not None:
+            tasks.append(self.index_manager.close())
+        if getattr(self, "response_cache", None) is not None:
+            self.response_cache.close()
+        if getattr(self, "query_logger", None) is not None:
+            self.query_logger.close()
 
         if tasks:
             await asyncio.gather(*tasks)
@@ -280,6 +630,7 @@ async def interactive_session(chatbot: UniversityChatbot):
             if verbose:
                 print("\nDebug Information:")
                 print(f"Processing stage: {results['stage']}")
+                print(f"Degradation mode: {results['mode']}")
                 print(f"Time taken: {end_time - start_time:.2f} seconds")
 
                 if results.get("metrics"):
@@ -303,6 +654,7 @@ async def main():
     chatbot = None
     try:
         chatbot = UniversityChatbot()
+        await chatbot.warmup()
 
         # Check document count
         doc_count = await chatbot.get_document_count()
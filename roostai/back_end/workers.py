@@ -0,0 +1,276 @@
+import asyncio
+import gc
+import logging
+import multiprocessing
+import multiprocessing.queues
+import multiprocessing.util
+import os
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Set
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.logging_setup import configure_logging
+from roostai.back_end.chatbot.query_log import QueryLogger
+from roostai.back_end.chatbot.response_cache import ResponseCache, store_version
+from roostai.back_end.chatbot.thread_tuning import (
+    apply_thread_settings,
+    load_tuned_settings,
+)
+from roostai.back_end.chatbot.vector_store import VectorStore
+from roostai.back_end.main import UniversityChatbot, interactive_session
+
+logger = logging.getLogger(__name__)
+
+# Chatbot created by the parent before forking; every worker inherits it copy-on-write
+_chatbot: Optional[UniversityChatbot] = None
+# Event loop of the current worker process
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _reopen_storage(chatbot: UniversityChatbot):
+    """Open fresh SQLite-backed connections and the query log writer thread.
+
+    Connections must not be shared across a fork, and threads do not survive it.
+    """
+    from chromadb.api.client import SharedSystemClient
+
+    if chatbot.index_manager is not None:
+        chatbot.vector_store = chatbot.index_manager.after_fork(chatbot.vector_store)
+    # A snapshot is a read-only memory map, which is safe to share across the fork
+    elif not chatbot.config.vector_db.snapshot_path:
+        # Chroma caches one client system per path; drop the one inherited from the parent
+        SharedSystemClient.clear_system_cache()
+        chatbot.vector_store = VectorStore(
+            collection_name=chatbot.config.vector_db.collection_name,
+            db_path=chatbot.config.vector_db.db_path,
+        )
+
+    if chatbot.response_cache is not None:
+        chatbot.response_cache = ResponseCache(
+            path=chatbot.config.cache.response_cache_path,
+            version=store_version(chatbot.vector_store),
+            max_entries=chatbot.config.cache.response_cache_max_entries,
+        )
+        chatbot.llm_manager.response_cache = chatbot.response_cache
+
+    if chatbot.query_processor.embedding_store is not None:
+        chatbot.query_processor.embedding_store.reopen()
+
+    if chatbot.query_logger is not None:
+        chatbot.query_logger = QueryLogger(chatbot.config.query_log)
+
+
+def _init_worker(
+    intra_op_threads: int,
+    inter_op_threads: Optional[int],
+    ready: multiprocessing.queues.SimpleQueue,
+):
+    """Pool initializer, runs once in every forked worker; reports its pid when done."""
+    global _loop
+
+    # The parent's log listener thread does not survive the fork
+    configure_logging(_chatbot.config.logging)
+
+    # Every worker gets its own small intra-op pool instead of competing for all cores
+    apply_thread_settings(intra_op_threads, inter_op_threads)
+
+    # A fork from inside a running event loop leaves it marked as running in the child
+    asyncio._set_running_loop(None)
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+    _reopen_storage(_chatbot)
+    if _chatbot.query_logger is not None:
+        # Pool workers skip atexit handlers; finalizers still run when they exit
+        multiprocessing.util.Finalize(
+            _chatbot.query_logger, _chatbot.query_logger.close, exitpriority=10
+        )
+    _loop.run_until_complete(_chatbot.warmup())
+    ready.put(os.getpid())
+
+
+def _worker_process_query(query: str, verbose: bool) -> Dict[str, Any]:
+    results = _loop.run_until_complete(_chatbot.process_query(query, verbose=verbose))
+    results["worker_pid"] = os.getpid()
+    return results
+
+
+def memory_usage(pid: int) -> Dict[str, float]:
+    """Memory of a process in MB from /proc/<pid>/smaps_rollup (Linux only).
+
+    `pss` charges shared pages proportionally to every process mapping them, so the
+    sum of `pss` over the parent and workers is the real total; `shared` is what a
+    process shares with others (e.g. copy-on-write model weights).
+    """
+    fields = {
+        "Rss": "rss",
+        "Pss": "pss",
+        "Shared_Clean": "shared",
+        "Shared_Dirty": "shared",
+        "Private_Clean": "private",
+        "Private_Dirty": "private",
+    }
+    usage = {"pid": pid, "rss": 0.0, "pss": 0.0, "shared": 0.0, "private": 0.0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    usage[fields[name]] += int(value.split()[0]) / 1024
+    except OSError as e:
+        logger.debug(f"Cannot read memory usage of {pid}: {e}")
+    return usage
+
+
+class PreforkWorkerPool:
+    """Serve `process_query` from forked workers sharing the parent's model weights.
+
+    The parent loads the SentenceTransformer and CrossEncoder weights once and then
+    forks `num_workers` processes. The weights are only read afterwards, so their
+    pages stay shared copy-on-write; `gc.freeze()` keeps the garbage collector from
+    writing to (and thereby copying) the objects created before the fork. Queries
+    are handed to whichever worker is idle.
+
+    Forking while another thread holds a lock (torch's OpenMP pool, the logging
+    queue, the query log writer) can deadlock the workers, so before forking the
+    parent stops its log listener and query log writer, and warmup runs in the
+    workers. The vector store, response cache, logging and query log are set up
+    again in every worker.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        db_path: Optional[str] = None,
+        torch_threads_per_worker: int = 1,
+        torch_inter_op_threads: Optional[int] = None,
+        config: Optional[Config] = None,
+    ):
+        global _chatbot
+        config = config or Config.load_config()
+
+        # Keep the parent single-threaded so any inference during startup (e.g. building a
+        # missing FAQ index) does not start an OpenMP pool the workers would inherit
+        config.runtime.torch_intra_op_threads = 1
+        config.runtime.torch_inter_op_threads = None
+        config.runtime.apply_tuned_settings = False
+        _chatbot = UniversityChatbot(db_path, config=config)
+        self.config = config
+
+        # No threads may be running at the fork: log directly from the parent and
+        # stop its query log writer (every worker starts its own)
+        configure_logging(replace(config.logging, use_queue=False))
+        if _chatbot.query_logger is not None:
+            _chatbot.query_logger.close()
+
+        gc.collect()
+        gc.freeze()
+
+        context = multiprocessing.get_context("fork")
+        self._ready = context.SimpleQueue()
+        self._ready_pids: Set[int] = set()
+        self.pool = context.Pool(
+            num_workers,
+            initializer=_init_worker,
+            initargs=(torch_threads_per_worker, torch_inter_op_threads, self._ready),
+        )
+        self.num_workers = num_workers
+        logger.info(f"Started {num_workers} pre-forked workers")
+
+    async def process_query(self, query: str, verbose: bool = False) -> Dict[str, Any]:
+        """Process a query on the next idle worker."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _resolve(result):
+            if not future.done():
+                future.set_result(result)
+
+        def _fail(error):
+            if not future.done():
+                future.set_exception(error)
+
+        self.pool.apply_async(
+            _worker_process_query,
+            (query, verbose),
+            callback=lambda r: loop.call_soon_threadsafe(_resolve, r),
+            error_callback=lambda e: loop.call_soon_threadsafe(_fail, e),
+        )
+        return await future
+
+    def wait_ready(self) -> List[int]:
+        """Block until every worker has finished its initialization and warmup."""
+        while len(self._ready_pids) < self.num_workers:
+            self._ready_pids.add(self._ready.get())
+        return sorted(self._ready_pids)
+
+    def worker_pids(self) -> List[int]:
+        return self.wait_ready()
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Per-process memory of the parent and the workers, in MB."""
+        workers = [memory_usage(pid) for pid in self.worker_pids()]
+        parent = memory_usage(os.getpid())
+        return {
+            "parent": parent,
+            "workers": workers,
+            "total_pss": parent["pss"] + sum(w["pss"] for w in workers),
+            "total_rss": parent["rss"] + sum(w["rss"] for w in workers),
+        }
+
+    async def get_document_count(self) -> int:
+        return await _chatbot.get_document_count()
+
+    async def cleanup(self):
+        self.pool.close()
+        self.pool.join()
+
+
+def _log_memory_report(report: Dict[str, Any]):
+    for name, usage in [("parent", report["parent"])] + [
+        (f"worker {w['pid']}", w) for w in report["workers"]
+    ]:
+        logger.info(
+            f"{name}: rss {usage['rss']:.0f} MB, pss {usage['pss']:.0f} MB, "
+            f"shared {usage['shared']:.0f} MB, private {usage['private']:.0f} MB"
+        )
+    logger.info(
+        f"Total: rss {report['total_rss']:.0f} MB (naive sum), "
+        f"pss {report['total_pss']:.0f} MB (actual)"
+    )
+
+
+def main():
+    """Run the interactive session on top of a pre-forked worker pool."""
+    config = Config.load_config()
+    tuned = {}
+    if config.runtime.apply_tuned_settings:
+        tuned = load_tuned_settings(config.runtime.thread_settings_path) or {}
+
+    pool = PreforkWorkerPool(
+        config.workers.num_workers or tuned.get("num_workers") or 4,
+        torch_threads_per_worker=(
+            config.workers.torch_threads_per_worker
+            or tuned.get("intra_op_threads")
+            or 1
+        ),
+        torch_inter_op_threads=(
+            config.runtime.torch_inter_op_threads or tuned.get("inter_op_threads")
+        ),
+        config=config,
+    )
+
+    pool.wait_ready()
+
+    async def _run():
+        try:
+            _log_memory_report(pool.memory_report())
+            await interactive_session(pool)
+        finally:
+            await pool.cleanup()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
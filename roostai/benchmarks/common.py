@@ -0,0 +1,103 @@
+import json
+import logging
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.thread_tuning import host_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """`p` percentile (0-1) of already sorted values (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def summarize(
+    latencies: List[float], elapsed: Optional[float] = None
+) -> Dict[str, float]:
+    """Latency distribution (milliseconds) and throughput of a series of calls.
+
+    `elapsed` is the wall-clock duration of the whole series; it defaults to the
+    sum of the latencies (i.e. calls made one after another).
+    """
+    ordered = sorted(latencies)
+    if elapsed is None:
+        elapsed = sum(ordered)
+    return {
+        "count": len(ordered),
+        "mean_ms": 1000 * sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50_ms": 1000 * percentile(ordered, 0.50),
+        "p95_ms": 1000 * percentile(ordered, 0.95),
+        "p99_ms": 1000 * percentile(ordered, 0.99),
+        "max_ms": 1000 * ordered[-1] if ordered else 0.0,
+        "throughput_qps": len(ordered) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def environment_info() -> Dict[str, Any]:
+    """Hardware and software the benchmark ran on, so runs can be compared."""
+    info = {
+        "host": host_fingerprint(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+    }
+    try:
+        import torch
+
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+
+def use_stub_llm(config: Config) -> Config:
+    """Answer with the simulated local LLM so benchmarks need no network or API key."""
+    config.model.llm_provider = "local"
+    config.model.llm_providers = []
+    return config
+
+
+def save_results(results: Dict[str, Any], output: str) -> Path:
+    """Write benchmark results as JSON, creating parent directories."""
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Saved results to {path}")
+    return path
+
+
+def default_output(name: str) -> str:
+    """Timestamped output path under `bench_results/`."""
+    return f"bench_results/{name}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+
+
+def format_table(rows: List[Dict[str, Any]], columns: List[str]) -> str:
+    """Render rows as a fixed-width text table."""
+
+    def _cell(value: Any) -> str:
+        return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+    widths = {
+        column: max(len(column), *(len(_cell(row.get(column, ""))) for row in rows))
+        for column in columns
+    }
+    lines = [
+        "  ".join(column.rjust(widths[column]) for column in columns),
+        "  ".join("-" * widths[column] for column in columns),
+    ]
+    for row in rows:
+        lines.append(
+            "  ".join(
+                _cell(row.get(column, "")).rjust(widths[column]) for column in columns
+            )
+        )
+    return "\n".join(lines)
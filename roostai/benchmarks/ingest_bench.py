@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.types import Document, DocumentMetadata
+from roostai.back_end.chatbot.vector_store import VectorStore, _generate_document_id
+from roostai.benchmarks.common import (
+    default_output,
+    environment_info,
+    format_table,
+    save_results,
+)
+from roostai.benchmarks.synthetic import (
+    COLLECTION_NAME,
+    load_vocabulary,
+    synthetic_embeddings,
+    synthetic_texts,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["method", "pass", "documents", "added", "seconds", "docs_per_second"]
+
+
+async def get_then_add(
+    store: VectorStore, documents: List[Document], embeddings: np.ndarray
+) -> int:
+    """The previous write path: `collection.get` of the batch ids, then `add` of lists."""
+    doc_ids = [_generate_document_id(doc.content) for doc in documents]
+    existing_ids = set(store.collection.get(ids=doc_ids)["ids"])
+    rows = [i for i, doc_id in enumerate(doc_ids) if doc_id not in existing_ids]
+    if rows:
+        store.collection.add(
+            documents=[documents[i].content for i in rows],
+            embeddings=[embeddings[i].tolist() for i in rows],
+            metadatas=[documents[i].metadata.__dict__ for i in rows],
+            ids=[doc_ids[i] for i in rows],
+        )
+    return len(rows)
+
+
+async def bulk_add(
+    store: VectorStore, documents: List[Document], embeddings: np.ndarray
+) -> int:
+    return await store.bulk_add_documents(documents, embeddings)
+
+
+METHODS = {"get_then_add": get_then_add, "bulk": bulk_add}
+
+
+async def run_benchmark(
+    methods: List[str],
+    data_dir: str,
+    count: int,
+    batch_size: int,
+    dimension: int,
+    vocabulary: List[str],
+) -> List[Dict[str, Any]]:
+    """Write `count` synthetic chunks in `batch_size` batches with each method, twice.
+
+    The first pass adds everything to an empty collection; the second re-ingests
+    the same chunks, which only costs the existence checks.
+    """
+    texts = synthetic_texts(count, vocabulary, words_per_chunk=120, seed=0)
+    documents = [
+        Document(
+            content=text,
+            metadata=DocumentMetadata(url=f"https://example.edu/ingest/{i // 10}"),
+        )
+        for i, text in enumerate(texts)
+    ]
+    embeddings = synthetic_embeddings(count, dimension, seed=0)
+
+    rows = []
+    for method in methods:
+        path = Path(data_dir) / f"ingest_{method}"
+        shutil.rmtree(path, ignore_errors=True)
+        store = VectorStore(collection_name=COLLECTION_NAME, db_path=str(path))
+        write = METHODS[method]
+        try:
+            for pass_name in ["new", "existing"]:
+                added = 0
+                start = time.perf_counter()
+                for offset in range(0, count, batch_size):
+                    added += await write(
+                        store,
+                        documents[offset : offset + batch_size],
+                        embeddings[offset : offset + batch_size],
+                    )
+                seconds = time.perf_counter() - start
+                rows.append(
+                    {
+                        "method": method,
+                        "pass": pass_name,
+                        "documents": count,
+                        "added": added,
+                        "seconds": seconds,
+                        "docs_per_second": count / seconds,
+                    }
+                )
+                logger.info(f"{method} ({pass_name}): {count / seconds:.0f} docs/s")
+        finally:
+            await store.close()
+            shutil.rmtree(path, ignore_errors=True)
+    return rows
+
+
+def main():
+    """Benchmark vector store write throughput of the ingestion write paths."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--count", type=int, default=50_000)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Documents per write call, as batched by data_ingestion.py",
+    )
+    parser.add_argument(
+        "--dimension",
+        type=int,
+        default=384,
+        help="Embedding dimension (384 for all-MiniLM-L6-v2)",
+    )
+    parser.add_argument(
+        "--methods", nargs="+", choices=list(METHODS), default=list(METHODS)
+    )
+    parser.add_argument(
+        "--data-dir",
+        default="bench_data",
+        help="Where the scratch collections are created (and removed afterwards)",
+    )
+    parser.add_argument("--output", default=default_output("ingest_bench"))
+    args = parser.parse_args()
+
+    config = Config.load_config()
+    vocabulary = load_vocabulary(config.faq.faq_files)
+    rows = asyncio.run(
+        run_benchmark(
+            args.methods,
+            args.data_dir,
+            args.count,
+            args.batch_size,
+            args.dimension,
+            vocabulary,
+        )
+    )
+    print(format_table(rows, COLUMNS))
+    save_results(
+        {
+            "benchmark": "ingest_bench",
+            "environment": environment_info(),
+            "batch_size": args.batch_size,
+            "dimension": args.dimension,
+            "results": rows,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
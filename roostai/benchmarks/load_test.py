@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.faq_index import load_faq_pairs
+from roostai.back_end.chatbot.llm_manager import (
+    LLM_ERROR_RESPONSE,
+    LLM_TIMEOUT_RESPONSE,
+)
+from roostai.benchmarks.common import (
+    default_output,
+    environment_info,
+    format_table,
+    save_results,
+    summarize,
+    use_stub_llm,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAQ_FILES = [
+    "eval/ragas_evaluation/data/faq_pairs.csv",
+    "eval/first_faq_evaluation/data/faq_pairs.csv",
+]
+
+# Stages after which the user got an answer (possibly "I don't know")
+ANSWERED_STAGES = {"complete", "faq", "vector_search", "quality_check"}
+
+OUTCOMES = ("ok", "rejected", "error", "timeout", "llm_error", "llm_timeout")
+
+COLUMNS = [
+    "stage",
+    "count",
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "max_ms",
+]
+
+
+@dataclass
+class RequestRecord:
+    latency: float  # Seconds from the scheduled send time to the answer
+    outcome: str  # One of OUTCOMES
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class ChatbotTarget:
+    """Send queries to an in-process `UniversityChatbot`."""
+
+    def __init__(self, config: Config, db_path: Optional[str] = None):
+        from roostai.back_end.main import UniversityChatbot
+
+        self.chatbot = UniversityChatbot(db_path, config=config)
+
+    async def start(self):
+        await self.chatbot.warmup()
+
+    async def send(self, query: str) -> Dict[str, Any]:
+        return await self.chatbot.process_query(query)
+
+    async def close(self):
+        await self.chatbot.cleanup()
+
+
+class HTTPTarget:
+    """POST `{"query": ...}` to an endpoint returning the `process_query` results as JSON."""
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    async def start(self):
+        pass
+
+    async def send(self, query: str) -> Dict[str, Any]:
+        def _post() -> Dict[str, Any]:
+            response = self.session.post(
+                self.url, json={"query": query}, timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return await asyncio.to_thread(_post)
+
+    async def close(self):
+        self.session.close()
+
+
+def _outcome(results: Dict[str, Any]) -> str:
+    # The chatbot apologizes instead of failing when the LLM times out or errors
+    if results.get("stage") == "complete":
+        if results.get("response") == LLM_TIMEOUT_RESPONSE:
+            return "llm_timeout"
+        if results.get("response") == LLM_ERROR_RESPONSE:
+            return "llm_error"
+    if results.get("stage") in ANSWERED_STAGES:
+        return "ok"
+    if results.get("stage") == "admission":
+        return "rejected"
+    return "error"
+
+
+async def _send(target, query: str, timeout: float, scheduled: float) -> RequestRecord:
+    try:
+        results = await asyncio.wait_for(target.send(query), timeout=timeout)
+    except asyncio.TimeoutError:
+        return RequestRecord(time.monotonic() - scheduled, "timeout")
+    except Exception as e:
+        logger.debug(f"Request failed: {e}")
+        return RequestRecord(time.monotonic() - scheduled, "error")
+
+    timings = results.get("metrics", {}).get("timings", {})
+    return RequestRecord(time.monotonic() - scheduled, _outcome(results), timings)
+
+
+async def run_closed_loop(
+    target,
+    queries: List[str],
+    concurrency: int,
+    duration: float,
+    timeout: float,
+    max_requests: Optional[int] = None,
+) -> Tuple[List[RequestRecord], float]:
+    """`concurrency` clients that each send their next query as soon as the last returns."""
+    records: List[RequestRecord] = []
+    issued = 0
+    start = time.monotonic()
+
+    async def client():
+        nonlocal issued
+        while time.monotonic() - start < duration and (
+            max_requests is None or issued < max_requests
+        ):
+            query = queries[issued % len(queries)]
+            issued += 1
+            records.append(await _send(target, query, timeout, time.monotonic()))
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return records, time.monotonic() - start
+
+
+async def run_open_loop(
+    target,
+    queries: List[str],
+    rate: float,
+    duration: float,
+    timeout: float,
+    max_requests: Optional[int] = None,
+    seed: int = 0,
+) -> Tuple[List[RequestRecord], float]:
+    """Poisson arrivals at `rate` queries/s, independent of how fast answers come back.
+
+    Latency is measured from each query's scheduled arrival, so a backlog in the
+    generator itself counts against the system rather than hiding it.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    start = time.monotonic()
+    next_arrival = start
+    while next_arrival - start < duration and (
+        max_requests is None or len(tasks) < max_requests
+    ):
+        delay = next_arrival - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        query = queries[len(tasks) % len(queries)]
+        tasks.append(asyncio.create_task(_send(target, query, timeout, next_arrival)))
+        next_arrival += rng.expovariate(rate)
+
+    records = list(await asyncio.gather(*tasks))
+    return records, time.monotonic() - start
+
+
+def build_report(records: List[RequestRecord], elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles overall and per stage, throughput and outcome rates."""
+    total = len(records)
+    outcomes = {
+        outcome: sum(record.outcome == outcome for record in records)
+        for outcome in OUTCOMES
+    }
+
+    stage_latencies: Dict[str, List[float]] = {}
+    for record in records:
+        for stage, seconds in record.timings.items():
+            stage_latencies.setdefault(stage, []).append(seconds)
+
+    return {
+        "requests": total,
+        "elapsed_seconds": elapsed,
+        "throughput_qps": outcomes["ok"] / elapsed if elapsed > 0 else 0.0,
+        "outcomes": outcomes,
+        "rates": {
+            f"{outcome}_rate": count / total if total else 0.0
+            for outcome, count in outcomes.items()
+        },
+        "latency": summarize([record.latency for record in records], elapsed),
+        "stages": {
+            stage: summarize(latencies)
+            for stage, latencies in stage_latencies.items()
+            if stage != "total"
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    rows = [{"stage": "request", **report["latency"]}] + [
+        {"stage": stage, **summary} for stage, summary in report["stages"].items()
+    ]
+    rates = ", ".join(f"{k} {v:.1%}" for k, v in report["rates"].items())
+    return (
+        f"{report['requests']} requests in {report['elapsed_seconds']:.1f}s, "
+        f"{report['throughput_qps']:.2f} answered/s ({rates})\n"
+        + format_table(rows, COLUMNS)
+    )
+
+
+def load_queries(faq_files: List[str], shuffle: bool, seed: int) -> List[str]:
+    queries = [question for question, _ in load_faq_pairs(faq_files)]
+    if not queries:
+        raise ValueError(f"No FAQ questions found in {faq_files}")
+    if shuffle:
+        random.Random(seed).shuffle(queries)
+    return queries
+
+
+async def run_load_test(target, queries: List[str], args) -> Dict[str, Any]:
+    await target.start()
+    try:
+        if args.rate:
+            records, elapsed = await run_open_loop(
+                target,
+                queries,
+                args.rate,
+                args.duration,
+                args.timeout,
+                args.max_requests,
+                args.seed,
+            )
+        else:
+            records, elapsed = await run_closed_loop(
+                target,
+                queries,
+                args.concurrency,
+                args.duration,
+                args.timeout,
+                args.max_requests,
+            )
+    finally:
+        await target.close()
+    return build_report(records, elapsed)
+
+
+def main():
+    """Replay FAQ questions against the chatbot (in process or over HTTP) under load."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--faq-files", nargs="+", default=DEFAULT_FAQ_FILES)
+    parser.add_argument(
+        "--url", help="HTTP endpoint to test instead of an in-process chatbot"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Clients in closed-loop mode"
+    )
+    parser.add_argument(
+        "--rate", type=float, help="Arrivals per second; switches to open-loop mode"
+    )
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds")
+    parser.add_argument("--max-requests", type=int)
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="Per-request timeout in seconds"
+    )
+    parser.add_argument(
+        "--stub-llm",
+        action="store_true",
+        help="Use the simulated local LLM (in-process chatbot only)",
+    )
+    parser.add_argument(
+        "--faq",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Answer from the FAQ fast path (in-process chatbot only; off by default "
+        "since the replayed questions are the FAQ questions)",
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Use the response cache (in-process chatbot only; off by default "
+        "since questions repeat)",
+    )
+    parser.add_argument("--db-path")
+    parser.add_argument("--shuffle", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=default_output("load_test"))
+    args = parser.parse_args()
+
+    queries = load_queries(args.faq_files, args.shuffle, args.seed)
+    if args.url:
+        target = HTTPTarget(args.url, args.timeout)
+    else:
+        config = Config.load_config()
+        if args.stub_llm:
+            use_stub_llm(config)
+        # Otherwise nearly every replayed question skips the RAG pipeline
+        config.faq.enabled = args.faq
+        config.cache.response_cache_enabled = args.cache
+        # Load test queries are not user traffic; the log writer also skews timings
+        config.query_log.enabled = False
+        target = ChatbotTarget(config, args.db_path)
+
+    report = asyncio.run(run_load_test(target, queries, args))
+    print(format_report(report))
+
+    settings = {
+        key: value for key, value in vars(args).items() if key not in ("output",)
+    }
+    save_results(
+        {
+            "benchmark": "load_test",
+            "environment": environment_info(),
+            "settings": settings,
+            "report": report,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
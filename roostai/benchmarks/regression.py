@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.query_processor import QueryProcessor
+from roostai.back_end.chatbot.warmup import resolve_path
+from roostai.benchmarks.common import (
+    environment_info,
+    format_table,
+    save_results,
+    use_stub_llm,
+)
+from roostai.benchmarks.load_test import (
+    DEFAULT_FAQ_FILES,
+    ChatbotTarget,
+    build_report,
+    load_queries,
+    run_closed_loop,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = "roostai/data/perf_baseline.json"
+
+# Whether a larger value of a metric is worse ("lower" is better) or better ("higher")
+LATENCY, MEMORY, THROUGHPUT = "latency", "memory", "throughput"
+DIRECTIONS = {LATENCY: "lower", MEMORY: "lower", THROUGHPUT: "higher"}
+
+
+def gate_config(db_path: Optional[str]) -> Config:
+    """Pipeline config for repeatable measurements.
+
+    The LLM is stubbed and every shortcut that would let a query skip stages
+    (FAQ answers, cached responses, load shedding) is turned off. Warmup and the
+    on-disk embedding store are off too, so `query_processing` measures the
+    embedding model rather than embeddings of the replayed questions.
+    """
+    config = use_stub_llm(Config.load_config())
+    if db_path:
+        config.vector_db.db_path = db_path
+    config.faq.enabled = False
+    config.cache.response_cache_enabled = False
+    config.admission.enabled = False
+    config.degradation.enabled = False
+    config.warmup.enabled = False
+    config.cache.embedding_store_enabled = False
+    # Keeps gate runs out of the production query log and its writer off the CPU
+    config.query_log.enabled = False
+    return config
+
+
+class GateTarget(ChatbotTarget):
+    """In-process chatbot that embeds every query, even one it has seen before."""
+
+    async def send(self, query: str) -> Dict[str, Any]:
+        QueryProcessor._generate_embedding.cache_clear()
+        return await super().send(query)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def collect_metrics(
+    sequential: Dict[str, Any], concurrent: Dict[str, Any], memory_mb: float
+) -> Dict[str, Tuple[str, float]]:
+    """Flatten the replay reports into `name -> (kind, value)`."""
+    metrics = {
+        "request.p50_ms": (LATENCY, sequential["latency"]["p50_ms"]),
+        "request.p95_ms": (LATENCY, sequential["latency"]["p95_ms"]),
+        "request.p99_ms": (LATENCY, sequential["latency"]["p99_ms"]),
+        "concurrent.p95_ms": (LATENCY, concurrent["latency"]["p95_ms"]),
+        "concurrent.throughput_qps": (THROUGHPUT, concurrent["throughput_qps"]),
+        "peak_rss_mb": (MEMORY, memory_mb),
+    }
+    for stage, summary in sequential["stages"].items():
+        metrics[f"{stage}.p50_ms"] = (LATENCY, summary["p50_ms"])
+        metrics[f"{stage}.p95_ms"] = (LATENCY, summary["p95_ms"])
+    return metrics
+
+
+async def measure(
+    config: Config,
+    queries: List[str],
+    rounds: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """Replay `queries` sequentially and with `concurrency` clients, `rounds` times.
+
+    Each metric is the median over the rounds to damp run-to-run noise.
+    """
+    target = GateTarget(config)
+    await target.start()
+    samples: Dict[str, List[float]] = {}
+    kinds: Dict[str, str] = {}
+    try:
+        for round_index in range(rounds):
+            records, elapsed = await run_closed_loop(
+                target, queries, 1, float("inf"), 60.0, max_requests=len(queries)
+            )
+            sequential = build_report(records, elapsed)
+            records, elapsed = await run_closed_loop(
+                target,
+                queries,
+                concurrency,
+                float("inf"),
+                60.0,
+                max_requests=len(queries),
+            )
+            concurrent = build_report(records, elapsed)
+
+            failed = sum(sequential["outcomes"].values()) - sequential["outcomes"]["ok"]
+            if failed:
+                logger.warning(
+                    f"{failed} queries did not complete in round {round_index}"
+                )
+
+            for name, (kind, value) in collect_metrics(
+                sequential, concurrent, peak_rss_mb()
+            ).items():
+                samples.setdefault(name, []).append(value)
+                kinds[name] = kind
+            logger.info(
+                f"Round {round_index + 1}/{rounds}: "
+                f"p50 {sequential['latency']['p50_ms']:.1f} ms, "
+                f"{concurrent['throughput_qps']:.2f} q/s"
+            )
+        document_count = await target.chatbot.get_document_count()
+    finally:
+        await target.close()
+
+    return {
+        "metrics": {
+            name: {"kind": kinds[name], "value": statistics.median(values)}
+            for name, values in samples.items()
+        },
+        "document_count": document_count,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerances: Dict[str, float],
+    min_delta_ms: float,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Compare metrics against the baseline; returns table rows and whether any regressed.
+
+    A latency regression must exceed both the relative tolerance and
+    `min_delta_ms`, so sub-millisecond stages do not fail on jitter.
+    """
+    rows = []
+    regressed = False
+    for name, entry in current["metrics"].items():
+        kind, value = entry["kind"], entry["value"]
+        base = baseline["metrics"].get(name, {}).get("value")
+        if base is None:
+            rows.append({"metric": name, "current": value, "status": "new"})
+            continue
+
+        change = (value - base) / base if base else 0.0
+        worse = change > 0 if DIRECTIONS[kind] == "lower" else change < 0
+        over_tolerance = abs(change) > tolerances[kind]
+        if kind == LATENCY:
+            over_tolerance = over_tolerance and abs(value - base) > min_delta_ms
+
+        if worse and over_tolerance:
+            status = "REGRESSED"
+            regressed = True
+        elif over_tolerance:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "metric": name,
+                "baseline": base,
+                "current": value,
+                "change": f"{change:+.1%}",
+                "tolerance": f"{tolerances[kind]:.0%}",
+                "status": status,
+            }
+        )
+
+    for name in baseline["metrics"].keys() - current["metrics"].keys():
+        rows.append({"metric": name, "status": "missing"})
+    return rows, regressed
+
+
+def main():
+    """Measure pipeline latency, memory and throughput and compare them to a baseline."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the new baseline instead of comparing",
+    )
+    parser.add_argument("--db-path")
+    parser.add_argument("--faq-files", nargs="+", default=DEFAULT_FAQ_FILES)
+    parser.add_argument("--max-queries", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-tolerance", type=float, default=0.15)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    parser.add_argument("--throughput-tolerance", type=float, default=0.10)
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=2.0,
+        help="Ignore latency changes smaller than this",
+    )
+    parser.add_argument(
+        "--strict-host",
+        action="store_true",
+        help="Fail instead of warning when the baseline was recorded on other hardware",
+    )
+    args = parser.parse_args()
+
+    config = gate_config(args.db_path)
+    queries = load_queries(args.faq_files, shuffle=False, seed=0)[: args.max_queries]
+    result = asyncio.run(measure(config, queries, args.rounds, args.concurrency))
+    result.update(
+        {
+            "environment": environment_info(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "db_path": config.vector_db.db_path,
+            "models": [config.model.embedding_model, config.model.cross_encoder_model],
+            "queries": len(queries),
+            "rounds": args.rounds,
+            "concurrency": args.concurrency,
+        }
+    )
+
+    baseline_path = resolve_path(args.baseline)
+    if args.save_baseline:
+        save_results(result, str(baseline_path))
+        return
+    if not baseline_path.exists():
+        sys.exit(f"No baseline at {baseline_path}; run with --save-baseline first")
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    if baseline["environment"]["host"] != result["environment"]["host"]:
+        message = (
+            f"Baseline was recorded on {baseline['environment']['host']}, "
+            f"this host is {result['environment']['host']}"
+        )
+        if args.strict_host:
+            sys.exit(message)
+        logger.warning(f"{message}; latency comparisons may not be meaningful")
+    for key in ("db_path", "models", "document_count"):
+        if baseline.get(key) != result[key]:
+            logger.info(f"{key} changed: {baseline.get(key)} -> {result[key]}")
+
+    rows, regressed = compare(
+        baseline,
+        result,
+        {
+            LATENCY: args.latency_tolerance,
+            MEMORY: args.memory_tolerance,
+            THROUGHPUT: args.throughput_tolerance,
+        },
+        args.min_delta_ms,
+    )
+    print(
+        format_table(
+            rows,
+            ["metric", "baseline", "current", "change", "tolerance", "status"],
+        )
+    )
+    if regressed:
+        sys.exit("Performance regressed past the tolerance (see REGRESSED rows above)")
+    print("No performance regressions")
+
+
+if __name__ == "__main__":
+    main()
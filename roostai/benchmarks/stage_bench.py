@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, List
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.faq_index import load_faq_pairs
+from roostai.back_end.chatbot.llm_manager import LLMManager
+from roostai.back_end.chatbot.quality_checker import QualityChecker
+from roostai.back_end.chatbot.query_processor import QueryProcessor
+from roostai.back_end.chatbot.reranker import Reranker
+from roostai.back_end.chatbot.types import Document, QueryResult
+from roostai.benchmarks.common import (
+    default_output,
+    environment_info,
+    format_table,
+    save_results,
+    summarize,
+    use_stub_llm,
+)
+from roostai.benchmarks.synthetic import build_corpus, load_vocabulary
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLUMNS = [
+    "stage",
+    "corpus_size",
+    "count",
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "throughput_qps",
+]
+
+
+async def time_stage(
+    call: Callable[[int], Awaitable[Any]], iterations: int, warmup: int
+) -> Dict[str, float]:
+    """Time `call(i)` for `iterations` sequential calls after `warmup` untimed ones."""
+    for i in range(warmup):
+        await call(i)
+
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await call(i)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+async def run_benchmark(
+    config: Config,
+    sizes: List[int],
+    data_dir: str,
+    queries: List[str],
+    iterations: int,
+    warmup: int,
+) -> List[Dict[str, Any]]:
+    """Time every pipeline stage in isolation, the retrieval stages once per corpus size."""
+    query_processor = QueryProcessor(model_name=config.model.embedding_model)
+    reranker = Reranker(model_name=config.model.cross_encoder_model)
+    quality_checker = QualityChecker(
+        min_score=config.thresholds.quality_min_score,
+        min_docs=config.thresholds.quality_min_docs,
+    )
+    llm_manager = LLMManager(
+        model_name=config.model.llm_model,
+        config=config,
+        llm_model=config.model.llm_model,
+    )
+    top_k = config.vector_db.top_k
+    rows = []
+
+    def _query(i: int) -> str:
+        return queries[i % len(queries)]
+
+    async def embed(i: int):
+        # Measure the model, not the embedding cache
+        QueryProcessor._generate_embedding.cache_clear()
+        return await query_processor.process_query(_query(i))
+
+    rows.append({"stage": "query_processing", "corpus_size": "-"})
+    rows[-1].update(await time_stage(embed, iterations, warmup))
+
+    embeddings = [
+        (await query_processor.process_query(query))[1]
+        for query in queries[: iterations + warmup]
+    ]
+    dimension = len(embeddings[0])
+    vocabulary = load_vocabulary(config.faq.faq_files)
+
+    for size in sizes:
+        store = build_corpus(size, data_dir, dimension, vocabulary)
+        candidates: Dict[int, List[Document]] = {}
+
+        async def search(i: int):
+            candidates[i % len(embeddings)] = await store.query(
+                embeddings[i % len(embeddings)], top_k
+            )
+
+        async def rerank(i: int):
+            documents = [replace(doc) for doc in candidates[i % len(embeddings)]]
+            # Keep every candidate; the threshold does not change the cost
+            return await reranker.rerank(_query(i), documents, float("-inf"))
+
+        async def quality_check(i: int):
+            return await quality_checker.check_quality(
+                _query(i), candidates[i % len(embeddings)]
+            )
+
+        async def build_prompt(i: int):
+            result = QueryResult(candidates[i % len(embeddings)], quality_score=1.0)
+            return llm_manager.generate_prompt(_query(i), result)
+
+        for stage, call in [
+            ("vector_search", search),
+            ("rerank", rerank),
+            ("quality_check", quality_check),
+            ("prompt_building", build_prompt),
+        ]:
+            row = {"stage": stage, "corpus_size": size}
+            row.update(await time_stage(call, iterations, warmup))
+            logger.info(f"{stage} @ {size}: p50 {row['p50_ms']:.1f} ms")
+            rows.append(row)
+
+        await store.close()
+
+    async def generate(i: int):
+        result = QueryResult(
+            candidates[i % len(embeddings)], quality_score=float("inf")
+        )
+        return await llm_manager.generate_response(_query(i), result)
+
+    rows.append({"stage": "llm_stub", "corpus_size": "-"})
+    rows[-1].update(await time_stage(generate, iterations, warmup))
+    await llm_manager.close()
+    return rows
+
+
+def main():
+    """Benchmark each chatbot pipeline stage against synthetic corpora of several sizes."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--data-dir",
+        default="bench_data",
+        help="Where synthetic corpora are built and reused",
+    )
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--output", default=default_output("stage_bench"))
+    args = parser.parse_args()
+
+    config = use_stub_llm(Config.load_config())
+    queries = [question for question, _ in load_faq_pairs(config.faq.faq_files)] or [
+        "What majors does USC offer?"
+    ]
+
+    rows = asyncio.run(
+        run_benchmark(
+            config, args.sizes, args.data_dir, queries, args.iterations, args.warmup
+        )
+    )
+    print(format_table(rows, COLUMNS))
+    save_results(
+        {
+            "benchmark": "stage_bench",
+            "environment": environment_info(),
+            "models": [config.model.embedding_model, config.model.cross_encoder_model],
+            "top_k": config.vector_db.top_k,
+            "iterations": args.iterations,
+            "results": rows,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
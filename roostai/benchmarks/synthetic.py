@@ -0,0 +1,85 @@
+import logging
+import re
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from roostai.back_end.chatbot.faq_index import load_faq_pairs
+from roostai.back_end.chatbot.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "synthetic"
+
+
+def load_vocabulary(faq_files: List[str]) -> List[str]:
+    """Words of the FAQ answers, so synthetic chunks tokenize like real ones."""
+    words = [
+        word
+        for _, answer in load_faq_pairs(faq_files)
+        for word in re.findall(r"[A-Za-z][A-Za-z'-]*", answer)
+    ]
+    return words or ["university", "students", "campus", "program", "degree"]
+
+
+def synthetic_texts(
+    count: int, vocabulary: List[str], words_per_chunk: int, seed: int, offset: int = 0
+) -> List[str]:
+    """`count` chunks of random vocabulary words, numbered from `offset` so they are unique."""
+    rng = np.random.default_rng(seed + offset)
+    vocab = np.array(vocabulary)
+    indices = rng.integers(0, len(vocab), size=(count, words_per_chunk))
+    return [
+        f"Chunk {offset + i}: " + " ".join(vocab[row]) for i, row in enumerate(indices)
+    ]
+
+
+def synthetic_embeddings(count: int, dimension: int, seed: int) -> np.ndarray:
+    """`count` random L2-normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dimension), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def build_corpus(
+    size: int,
+    data_dir: str,
+    dimension: int,
+    vocabulary: List[str],
+    words_per_chunk: int = 120,
+    seed: int = 0,
+) -> VectorStore:
+    """Open (or create) a persistent Chroma collection with `size` synthetic chunks.
+
+    Corpora are kept under `data_dir/synthetic_<size>` and reused across runs;
+    an interrupted build is resumed. Embeddings are random unit vectors rather
+    than model embeddings, which keeps building a 1M-chunk corpus to minutes
+    while giving the HNSW index the same dimension and size as a real one.
+    The collection uses the same settings as the production `VectorStore`.
+    """
+    path = Path(data_dir) / f"synthetic_{size}"
+    store = VectorStore(collection_name=COLLECTION_NAME, db_path=str(path))
+    existing = store.collection.count()
+    if existing >= size:
+        logger.info(f"Reusing synthetic corpus with {existing} chunks at {path}")
+        return store
+
+    batch_size = store.client.get_max_batch_size()
+    logger.info(f"Building synthetic corpus of {size} chunks at {path}")
+    for start in range(existing, size, batch_size):
+        count = min(batch_size, size - start)
+        store.collection.add(
+            ids=[f"synthetic-{start + i}" for i in range(count)],
+            documents=synthetic_texts(
+                count, vocabulary, words_per_chunk, seed, offset=start
+            ),
+            embeddings=synthetic_embeddings(count, dimension, seed + start),
+            metadatas=[
+                {"url": f"https://example.edu/synthetic/{(start + i) // 10}"}
+                for i in range(count)
+            ],
+        )
+        logger.info(f"Added {start + count}/{size} chunks")
+    return store
@@ -4,12 +4,20 @@ import asyncio
 from datetime import datetime
 
 from roostai.back_end.main import UniversityChatbot
-from components.utils import save_interaction
+from components.utils import get_interaction_store, save_interaction
 
 
 async def initialize_chatbot() -> UniversityChatbot:
-    """Initialize the chatbot instance."""
-    return UniversityChatbot()
+    """Initialize and warm up the chatbot instance."""
+    chatbot = UniversityChatbot()
+    await chatbot.warmup()
+    return chatbot
+
+
+@st.cache_resource(show_spinner="Starting RoostAI...")
+def get_chatbot() -> UniversityChatbot:
+    """The chatbot shared by all sessions: loaded, warmed up and logging only once."""
+    return asyncio.run(initialize_chatbot())
 
 
 def render_chat_interface(chatbot: UniversityChatbot) -> Optional[Dict]:
@@ -95,7 +103,7 @@ def render_chat_interface(chatbot: UniversityChatbot) -> Optional[Dict]:
 
                     # Save interaction without feedback
                     save_interaction(
-                        st.session_state.config.responses_dir,
+                        get_interaction_store(st.session_state.config.interactions_db),
                         st.session_state.session_id,
                         st.session_state.interaction_num,
                         interaction,
@@ -0,0 +1,203 @@
+import csv
+import itertools
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS interactions ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+    "interaction_num INTEGER NOT NULL, timestamp TEXT, processing_time REAL, "
+    "query TEXT, response TEXT, stage TEXT, error TEXT, initial_docs INTEGER, "
+    "reranked_docs INTEGER, quality_score REAL, top_doc_score REAL, feedback TEXT)",
+    "CREATE INDEX IF NOT EXISTS interactions_session ON interactions(session_id)",
+    "CREATE TABLE IF NOT EXISTS surveys ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+    "timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, responses TEXT NOT NULL)",
+]
+
+# JSON-encoded columns, decoded again on export
+_JSON_COLUMNS = {"feedback", "responses"}
+TABLES = ("interactions", "surveys")
+
+# Put on the queue by `close()` to stop the writer thread
+_STOP = object()
+
+
+def connect_read_only(path: Union[str, Path]) -> sqlite3.Connection:
+    """Open an existing interaction store read-only (no writer thread, no schema setup)."""
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"Interaction store not found: {path}")
+    return sqlite3.connect(f"file:{path.resolve()}?mode=ro", uri=True)
+
+
+def read_rows(path: Union[str, Path], table: str) -> Iterator[Dict[str, Any]]:
+    """All rows of `table` in insertion order, with JSON columns decoded."""
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    conn = connect_read_only(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY id"):
+            record = dict(row)
+            for column in _JSON_COLUMNS & record.keys():
+                record[column] = json.loads(record[column])
+            yield record
+    finally:
+        conn.close()
+
+
+def export_table(
+    path: Union[str, Path], table: str, output: str, fmt: Optional[str] = None
+) -> int:
+    """Write `table` to a JSONL or CSV file (by `fmt` or the file extension).
+
+    Returns the number of exported rows.
+    """
+    fmt = fmt or ("csv" if output.endswith(".csv") else "jsonl")
+    rows = read_rows(path, table)
+    # Fail on a missing store before creating the output file
+    first = next(rows, None)
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        for record in itertools.chain([first] if first is not None else [], rows):
+            if fmt == "csv":
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow(
+                    {
+                        key: json.dumps(value) if key in _JSON_COLUMNS else value
+                        for key, value in record.items()
+                    }
+                )
+            else:
+                f.write(json.dumps(record) + "\n")
+            count += 1
+    logger.info(f"Exported {count} rows of {table} to {output}")
+    return count
+
+
+class InteractionStore:
+    """Append-only SQLite (WAL mode) store of survey interactions and responses.
+
+    Rows are queued by the Streamlit script thread and inserted by a background
+    thread, which commits everything waiting in one transaction. Readers (e.g.
+    `export`) use their own connection and do not block the writer.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="interaction-store-writer", daemon=True
+        )
+        self._thread.start()
+
+    def add_interaction(
+        self,
+        session_id: str,
+        interaction_num: int,
+        interaction_data: Dict,
+        feedback: Dict,
+    ):
+        """Queue one chatbot interaction (see `components/chat.py`) for writing."""
+        raw_results = interaction_data["raw_results"]
+        metrics = raw_results["metrics"]
+        self._queue.put(
+            (
+                "interactions",
+                {
+                    "session_id": session_id,
+                    "interaction_num": interaction_num,
+                    "timestamp": interaction_data["timestamp"],
+                    "processing_time": interaction_data["processing_time"],
+                    "query": interaction_data["query"],
+                    "response": interaction_data["response"],
+                    "stage": raw_results["stage"],
+                    "error": raw_results["error"],
+                    "initial_docs": metrics["initial_docs_count"],
+                    "reranked_docs": metrics["reranked_docs_count"],
+                    "quality_score": metrics["quality_score"],
+                    "top_doc_score": metrics["top_doc_score"],
+                    "feedback": json.dumps(feedback, default=str),
+                },
+            )
+        )
+
+    def add_survey(self, session_id: str, responses: Dict):
+        """Queue the overall survey responses of a session for writing."""
+        self._queue.put(
+            (
+                "surveys",
+                {
+                    "session_id": session_id,
+                    "responses": json.dumps(responses, default=str),
+                },
+            )
+        )
+
+    def flush(self):
+        """Block until every queued row has been committed."""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        """All rows of `table` in insertion order, with JSON columns decoded."""
+        return read_rows(self.path, table)
+
+    def export(self, table: str, output: str, fmt: Optional[str] = None) -> int:
+        """Write `table` to a JSONL or CSV file (see `export_table`)."""
+        return export_table(self.path, table, output, fmt)
+
+    def _run(self):
+        conn = sqlite3.connect(str(self.path))
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [item for item in batch if item is not _STOP]
+            stopping = len(rows) < len(batch)
+            try:
+                with conn:
+                    for table, row in rows:
+                        columns = ", ".join(row)
+                        placeholders = ", ".join("?" for _ in row)
+                        conn.execute(
+                            f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                            list(row.values()),
+                        )
+            except sqlite3.Error as e:
+                logger.error(f"Failed to save {len(rows)} survey rows: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
@@ -10,6 +10,8 @@ class SurveyConfig:
 
     # Paths
     responses_dir: Path = Path("roostai/front_end/responses")
+    # Append-only SQLite store of interactions and survey responses
+    interactions_db: Path = Path("roostai/front_end/responses/interactions.sqlite3")
 
     def __post_init__(self):
         self.overall_questions = [
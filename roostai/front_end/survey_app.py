@@ -1,13 +1,12 @@
-import asyncio
 import time
 import uuid
 from pathlib import Path
 
 import streamlit as st
 
-from components.chat import initialize_chatbot, render_chat_interface
+from components.chat import get_chatbot, render_chat_interface
 from components.questions import render_overall_survey
-from components.utils import save_overall_survey
+from components.utils import get_interaction_store, save_overall_survey
 from config import SurveyConfig
 
 # Page config
@@ -22,7 +21,7 @@ if "session_id" not in st.session_state:
 if "interaction_num" not in st.session_state:
     st.session_state.interaction_num = 0
 if "chatbot" not in st.session_state:
-    st.session_state.chatbot = asyncio.run(initialize_chatbot())
+    st.session_state.chatbot = get_chatbot()
 if "survey_mode" not in st.session_state:
     st.session_state.survey_mode = False
 if "chat_history" not in st.session_state:
@@ -96,7 +95,9 @@ if st.session_state.survey_mode:
 
     if responses:
         save_overall_survey(
-            config.responses_dir, st.session_state.session_id, responses
+            get_interaction_store(config.interactions_db),
+            st.session_state.session_id,
+            responses,
         )
         st.rerun()  # Just rerun to show the thank you message and reset button
 
@@ -0,0 +1,36 @@
+import argparse
+import logging
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.faq_index import FAQIndex
+from roostai.back_end.chatbot.query_processor import QueryProcessor
+from roostai.back_end.chatbot.warmup import resolve_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Precompute the FAQ fast-path index from FAQ pair CSVs."""
+    config = Config.load_config()
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "faq_files",
+        nargs="*",
+        default=config.faq.faq_files,
+        help="CSV files with `question` and `answer` columns",
+    )
+    parser.add_argument("--output", default=config.faq.index_path)
+    args = parser.parse_args()
+
+    query_processor = QueryProcessor(model_name=config.model.embedding_model)
+    faq_index = FAQIndex.build(
+        args.faq_files, query_processor.model, config.model.embedding_model
+    )
+    faq_index.save(str(resolve_path(args.output)))
+    logger.info(f"FAQ index contains {len(faq_index)} questions")
+
+
+if __name__ == "__main__":
+    main()
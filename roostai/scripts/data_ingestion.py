@@ -6,41 +6,73 @@ sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
 import json
 import logging
 import shutil
+import time
 from collections import defaultdict
 from pathlib import Path
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
+import argparse
 import asyncio
+
+import numpy as np
 from tqdm import tqdm
 
 from roostai.back_end.chatbot.types import Document, DocumentMetadata
 from roostai.back_end.chatbot.query_processor import QueryProcessor
-from roostai.back_end.chatbot.vector_store import VectorStore
+from roostai.back_end.chatbot.vector_store import VectorStore, _generate_document_id
 from roostai.back_end.chatbot.config import Config
+from roostai.scripts.dedup_store import DuplicateStore, MinHasher
+from roostai.scripts.ingestion_checkpoint import IngestionCheckpoint
+from roostai.scripts.ingestion_manifest import (
+    FileProgress,
+    FileState,
+    IngestionManifest,
+)
+from roostai.scripts.ingestion_pipeline import PipelineStage, StreamingPipeline
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class DuplicateTracker:
-    def __init__(self):
-        self.content_hashes: Set = set()
+    def __init__(self, store: Optional[DuplicateStore] = None):
+        # In-memory store (exact and near-duplicates) unless a persistent one is given
+        self.store = store or DuplicateStore()
         self.duplicate_counts: Dict[str, int] = defaultdict(int)
         self.duplicate_sources: Dict[str, List[str]] = defaultdict(list)
         self.total_chunks = 0
         self.unique_chunks = 0
+        self.near_duplicates = 0
 
-    def is_duplicate(self, content: str, source_url: str) -> bool:
-        """Check if content is duplicate and track statistics."""
+    def find_duplicate(self, content: str, source_url: str) -> Optional[str]:
+        """Return the id of the kept chunk `content` duplicates, or None if it is new."""
         self.total_chunks += 1
-        content_hash = hash(content.strip())
+        match = self.store.deduplicate(content, _generate_document_id(content))
 
-        if content_hash in self.content_hashes:
+        if match is not None:
+            doc_id, kind = match
             self.duplicate_counts[source_url] += 1
-            return True
+            self.near_duplicates += kind == "near"
+            return doc_id
 
-        self.content_hashes.add(content_hash)
         self.unique_chunks += 1
-        return False
+        return None
+
+    def is_duplicate(self, content: str, source_url: str) -> bool:
+        """Check if content is duplicate and track statistics."""
+        return self.find_duplicate(content, source_url) is not None
+
+    def mark_written(self, documents: List[Document]):
+        """Persist the chunks that reached the vector store."""
+        self.store.mark_written(
+            [_generate_document_id(doc.content) for doc in documents]
+        )
+
+    def forget(self, doc_ids: List[str]):
+        """Forget chunks deleted from the vector store."""
+        self.store.forget(doc_ids)
+
+    def close(self):
+        self.store.close()
 
     def print_statistics(self):
         """Print duplicate statistics."""
@@ -48,6 +80,7 @@ class DuplicateTracker:
         logger.info(f"Total chunks processed: {self.total_chunks}")
         logger.info(f"Unique chunks: {self.unique_chunks}")
         logger.info(f"Duplicate chunks: {self.total_chunks - self.unique_chunks}")
+        logger.info(f"  of which near-duplicates: {self.near_duplicates}")
 
         if self.duplicate_counts:
             logger.info("\nSources with duplicates:")
@@ -57,26 +90,42 @@ class DuplicateTracker:
                 logger.info(f"  {url}: {count} duplicates")
 
 
-def _create_documents_from_chunks(
+def _deduplicate_chunks(
     chunks: List[str], metadata: Dict[str, Any], duplicate_tracker: DuplicateTracker
-) -> List[Document]:
-    """Create Document objects from chunks and metadata, excluding duplicates."""
+) -> Tuple[List[Document], List[str]]:
+    """Create Documents for the new chunks; also return the ids representing every chunk.
+
+    A duplicate chunk is represented by the id of the chunk it duplicates, so the
+    ingestion manifest keeps that chunk while this file still needs it.
+    """
     doc_metadata = DocumentMetadata(**metadata)
     unique_documents = []
+    chunk_ids = []
 
     for chunk in chunks:
-        if not duplicate_tracker.is_duplicate(chunk, metadata.get("url", "unknown")):
+        duplicate_of = duplicate_tracker.find_duplicate(
+            chunk, metadata.get("url", "unknown")
+        )
+        if duplicate_of is None:
             unique_documents.append(
                 Document(content=chunk, metadata=doc_metadata, score=None)
             )
+            chunk_ids.append(_generate_document_id(chunk))
+        else:
+            chunk_ids.append(duplicate_of)
 
-    return unique_documents
+    return unique_documents, chunk_ids
 
 
-async def process_file(
-    file_path: str, duplicate_tracker: DuplicateTracker
+def _create_documents_from_chunks(
+    chunks: List[str], metadata: Dict[str, Any], duplicate_tracker: DuplicateTracker
 ) -> List[Document]:
-    """Process a single JSON file and return list of unique Document objects."""
+    """Create Document objects from chunks and metadata, excluding duplicates."""
+    return _deduplicate_chunks(chunks, metadata, duplicate_tracker)[0]
+
+
+def read_chunk_file(file_path: str) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+    """Read the chunks and metadata of a JSON file (None if unusable)."""
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -91,34 +140,70 @@ async def process_file(
                 metadata.pop("source_url")
             else:
                 logger.warning(f"No URL found in metadata for {file_path}")
-                return []
+                return None
 
         if not chunks:
             logger.warning(f"No chunks found in {file_path}")
-            return []
+            return None
 
-        documents = _create_documents_from_chunks(chunks, metadata, duplicate_tracker)
-        logger.info(f"Processed {len(documents)} unique chunks from {file_path}")
-        return documents
+        return chunks, metadata
 
     except Exception as e:
         logger.error(f"Error processing file {file_path}: {e}")
+        return None
+
+
+async def process_file(
+    file_path: str, duplicate_tracker: DuplicateTracker
+) -> List[Document]:
+    """Process a single JSON file and return list of unique Document objects."""
+    content = read_chunk_file(file_path)
+    if content is None:
         return []
 
+    chunks, metadata = content
+    documents = _create_documents_from_chunks(chunks, metadata, duplicate_tracker)
+    logger.info(f"Processed {len(documents)} unique chunks from {file_path}")
+    return documents
+
 
 class DataIngestionManager:
     def __init__(self, config: Config, db_path: str = None):
         """Initialize the data ingestion manager."""
         self.config = config
 
+        cache = self.config.cache
+        # Shared across databases, so chunks common to several chunking strategies
+        # (and re-runs) are embedded once
         self.query_processor = QueryProcessor(
-            model_name=self.config.model.embedding_model
+            model_name=self.config.model.embedding_model,
+            embedding_store_dir=(
+                cache.embedding_store_dir if cache.embedding_store_enabled else None
+            ),
+            embedding_store_shard_size=cache.embedding_store_shard_size,
         )
         self.vector_store = VectorStore(
             collection_name=self.config.vector_db.collection_name,
             db_path=db_path if db_path else self.config.vector_db.db_path,
         )
-        self.duplicate_tracker = DuplicateTracker()
+        ingestion = self.config.ingestion
+        self.duplicate_tracker = DuplicateTracker(
+            DuplicateStore(
+                str(Path(self.vector_store.db_path) / DuplicateStore.FILENAME),
+                hasher=MinHasher(
+                    ingestion.minhash_permutations, ingestion.shingle_size
+                ),
+                bands=ingestion.lsh_bands,
+                threshold=ingestion.near_duplicate_threshold,
+                near_duplicates=ingestion.near_duplicates,
+            )
+        )
+
+        self.encode_pool = None
+        if self.config.ingestion.encode_processes > 1:
+            self.encode_pool = self.query_processor.start_encode_pool(
+                self.config.ingestion.encode_processes
+            )
 
     async def ingest_documents(self, documents: List[Document]) -> bool:
         """Ingest documents into the vector store."""
@@ -128,15 +213,11 @@ class DataIngestionManager:
 
             logger.info(f"Generating embeddings for {len(documents)} documents...")
 
-            # Generate embeddings for all documents
-            embeddings = []
-            for doc in tqdm(documents, desc="Generating embeddings"):
-                embedding = self.query_processor.model.encode(doc.content).tolist()
-                embeddings.append(embedding)
+            embeddings = self.embed_documents(documents)
 
             logger.info("Adding documents to vector store...")
             # Add documents to vector store
-            await self.vector_store.add_documents(documents, embeddings)
+            await self.vector_store.bulk_add_documents(documents, embeddings)
             logger.info(
                 f"Successfully added {len(documents)} documents to vector store"
             )
@@ -146,63 +227,231 @@ class DataIngestionManager:
             logger.error(f"Error ingesting documents: {e}")
             return False
 
+    def embed_documents(self, documents: List[Document]) -> np.ndarray:
+        """Embed documents in length-sorted batches (see `QueryProcessor.embed_documents`)."""
+        return self.query_processor.embed_documents(
+            [doc.content for doc in documents],
+            batch_size=self.config.ingestion.embedding_batch_size,
+            pool=self.encode_pool,
+        )
+
+    def _build_pipeline(
+        self,
+        batch_size: int,
+        loop: asyncio.AbstractEventLoop,
+        progress: tqdm,
+        file_progress: FileProgress,
+        checkpoint: IngestionCheckpoint,
+    ) -> StreamingPipeline:
+        """Readers -> dedup/batching -> embedders -> vector store writer.
+
+        Documents travel with the manifest key of their file, so `file_progress`
+        can tell when all of a file's chunks have been written. The checkpoint is
+        saved after every written batch.
+        """
+        ingestion = self.config.ingestion
+        pending: List[Tuple[str, Document]] = []
+
+        def read(
+            state: FileState,
+        ) -> Iterator[Tuple[FileState, List[str], Dict[str, Any]]]:
+            content = read_chunk_file(str(state.path))
+            progress.update()
+            if content is None:
+                # Recorded without chunks, so it is not read again until it changes
+                file_progress.add(state, [], 0)
+                return
+            yield state, *content
+
+        def dedup(
+            content: Tuple[FileState, List[str], Dict[str, Any]]
+        ) -> Iterator[List[Tuple[str, Document]]]:
+            state, chunks, metadata = content
+            documents, chunk_ids = _deduplicate_chunks(
+                chunks, metadata, self.duplicate_tracker
+            )
+            file_progress.add(state, chunk_ids, len(documents))
+            pending.extend((state.key, doc) for doc in documents)
+            while len(pending) >= batch_size:
+                yield pending[:batch_size]
+                del pending[:batch_size]
+
+        def flush() -> Iterator[List[Tuple[str, Document]]]:
+            if pending:
+                yield list(pending)
+
+        def embed(
+            batch: List[Tuple[str, Document]],
+        ) -> Iterator[Tuple[List[str], List[Document], np.ndarray]]:
+            keys = [key for key, _ in batch]
+            documents = [doc for _, doc in batch]
+            yield keys, documents, self.embed_documents(documents)
+
+        def write(batch: Tuple[List[str], List[Document], np.ndarray]) -> Iterator[int]:
+            keys, documents, embeddings = batch
+            # The writer is the only thread using this loop
+            loop.run_until_complete(
+                self.vector_store.bulk_add_documents(documents, embeddings)
+            )
+            self.duplicate_tracker.mark_written(documents)
+            file_progress.written(keys)
+            checkpoint.batch_committed(len(documents))
+            yield len(documents)
+
+        return StreamingPipeline(
+            [
+                PipelineStage("read", read, workers=ingestion.reader_threads),
+                PipelineStage("dedup", dedup, flush=flush),
+                PipelineStage("embed", embed, workers=ingestion.embed_workers),
+                PipelineStage("write", write),
+            ],
+            queue_size=ingestion.queue_size,
+            report_interval=ingestion.report_interval,
+        )
+
     async def process_directory(
-        self, directory_path: str, batch_size: int = 100
-    ) -> None:
-        """Process all JSON files in a directory and ingest them into the vector store."""
+        self, directory_path: str, batch_size: int = 100, resume: bool = False
+    ) -> Dict[str, Any]:
+        """Stream the new and changed JSON files of a directory into the vector store.
+
+        The ingestion manifest next to the database records the content hash and
+        chunk ids of every ingested file: unchanged files are skipped, and chunks
+        of changed or removed files that no other file contains are deleted.
+        Reading, deduplication, embedding and writing run concurrently in a
+        bounded pipeline (see `ingestion_pipeline.py`); returns its per-stage
+        throughput summary.
+
+        Progress is checkpointed next to the database after every written batch.
+        With `resume`, an interrupted run over the same directory is continued:
+        files it completed are skipped even if `IngestionConfig.incremental` is off.
+        Chunks of a partially written file are not written twice, and with the
+        embedding store they are not embedded twice either.
+        """
+        manifest = IngestionManifest.for_db(self.vector_store.db_path)
         try:
             directory = Path(directory_path)
             if not directory.exists():
                 raise FileNotFoundError(f"Directory not found: {directory_path}")
 
+            checkpoint = IngestionCheckpoint.start(
+                self.vector_store.db_path, str(directory.resolve()), resume
+            )
+            if checkpoint.is_resumed:
+                state = checkpoint.state
+                logger.info(
+                    f"Resuming run started {time.ctime(state.started_at)}: "
+                    f"{state.files_committed} files and {state.batches_committed} "
+                    f"batches committed, last file {state.last_file}"
+                )
+            elif resume:
+                logger.info(f"No interrupted run over {directory} to resume")
+
             # Get all JSON files
             json_files = list(directory.glob("*.json"))
-            logger.info(f"Found {len(json_files)} JSON files to process")
-
-            # Process files in batches
-            current_batch: List[Document] = []
-            total_documents = 0
-
-            # Use tqdm for progress bar
-            for file_path in tqdm(json_files, desc="Processing files"):
-                documents = await process_file(str(file_path), self.duplicate_tracker)
-                current_batch.extend(documents)
-
-                # If batch is full, process it
-                if len(current_batch) >= batch_size:
-                    success = await self.ingest_documents(current_batch)
-                    if success:
-                        total_documents += len(current_batch)
-                        logger.info(
-                            f"Successfully ingested batch. Total documents: {total_documents}"
-                        )
-                    current_batch = []
-
-            # Process remaining documents
-            if current_batch:
-                success = await self.ingest_documents(current_batch)
-                if success:
-                    total_documents += len(current_batch)
+            scan = manifest.scan(
+                directory,
+                json_files,
+                force=not self.config.ingestion.incremental,
+                ingested_since=(
+                    checkpoint.state.started_at if checkpoint.is_resumed else None
+                ),
+            )
+            logger.info(
+                f"Found {len(json_files)} JSON files: {len(scan.changed)} new or "
+                f"changed, {scan.unchanged} unchanged, {len(scan.removed)} removed"
+            )
+            for key in scan.removed:
+                manifest.remove_file(key)
+            # The old chunks of changed files must not absorb their own edits as
+            # near-duplicates; they stay in the vector store until the run is done
+            self.duplicate_tracker.forget(
+                manifest.exclusive_chunks([state.key for state in scan.changed])
+            )
+
+            def file_committed(state: FileState, chunk_ids: List[str]):
+                manifest.record_file(state, chunk_ids)
+                checkpoint.file_committed(state.key)
+
+            file_progress = FileProgress(file_committed)
+            loop = asyncio.new_event_loop()
+            try:
+                with tqdm(total=len(scan.changed), desc="Processing files") as progress:
+                    pipeline = self._build_pipeline(
+                        batch_size, loop, progress, file_progress, checkpoint
+                    )
+                    summary = await asyncio.to_thread(pipeline.run, scan.changed)
+            finally:
+                loop.close()
+
+            # Chunks only the old versions of changed or removed files had
+            stale_ids = manifest.unreferenced_chunks()
+            if stale_ids:
+                await self.vector_store.delete_documents(stale_ids)
+                self.duplicate_tracker.forget(stale_ids)
+            manifest.clear_pending()
 
             # Print final statistics
             self.duplicate_tracker.print_statistics()
+            written = summary["stages"]["write"]
             logger.info(
-                f"Completed ingestion. Total unique documents processed: {total_documents}"
+                f"Completed ingestion. Batches written: {written['items_out']}, "
+                f"failed: {written['errors']}, "
+                f"total unique documents: {self.duplicate_tracker.unique_chunks}, "
+                f"stale documents deleted: {len(stale_ids)}"
             )
+            if file_progress.incomplete:
+                logger.warning(
+                    f"{file_progress.incomplete} files were not fully written "
+                    "and will be ingested again on the next run (or with --resume)"
+                )
+            else:
+                checkpoint.complete()
+            summary["files"] = {
+                "changed": len(scan.changed),
+                "unchanged": scan.unchanged,
+                "removed": len(scan.removed),
+                "incomplete": file_progress.incomplete,
+                "stale_deleted": len(stale_ids),
+            }
+            summary["checkpoint"] = checkpoint.summary()
+            return summary
 
         except Exception as e:
             logger.error(f"Error processing directory: {e}")
             raise
+        finally:
+            manifest.close()
 
     async def cleanup(self):
         """Cleanup resources."""
         await self.vector_store.close()
+        self.duplicate_tracker.close()
+        if self.encode_pool is not None:
+            self.query_processor.stop_encode_pool(self.encode_pool)
+            self.encode_pool = None
         self.query_processor.clear_cache()
+        self.query_processor.close()
 
 
 async def main():
-    """Main function to run the data ingestion process."""
+    """Ingest the chunked scrapes into their vector databases."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue interrupted runs from their checkpoints",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-ingest every file, not only new and changed ones",
+    )
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
     config = Config.load_config()
+    if args.full:
+        config.ingestion.incremental = False
     # ingestion_manager = DataIngestionManager(config)
     # data_directory = "/home/cc/chunks_and_metadata"
 
@@ -230,7 +479,9 @@ async def main():
         try:
             logger.info(f"Starting ingestion from directory: {data_directory}")
             logger.info(f"Using database path: {config.vector_db.db_path}")
-            await ingestion_manager.process_directory(data_directory)
+            await ingestion_manager.process_directory(
+                data_directory, batch_size=args.batch_size, resume=args.resume
+            )
 
             # Verify ingestion
             doc_count = await ingestion_manager.vector_store.get_document_count()
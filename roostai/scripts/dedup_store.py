@@ -0,0 +1,203 @@
+import hashlib
+import re
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a chunk's text (unlike `hash()`, the same in every process)."""
+    return hashlib.sha256(text.strip().encode()).hexdigest()
+
+
+class MinHasher:
+    """MinHash signatures of word shingles, for estimating Jaccard similarity.
+
+    The fraction of equal signature entries of two texts estimates the Jaccard
+    similarity of their sets of `shingle_size`-word shingles. Signatures are
+    deterministic for a given `seed`, so they can be stored and compared later.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        if len(words) <= self.shingle_size:
+            return [" ".join(words)]
+        return [
+            " ".join(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        ]
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.array(
+            [
+                int.from_bytes(
+                    hashlib.blake2b(shingle.encode(), digest_size=4).digest(), "little"
+                )
+                for shingle in set(self.shingles(text))
+            ],
+            dtype=np.uint64,
+        )
+        # Universal hashing (a * x + b) mod p; the uint64 product may wrap, which
+        # still gives a valid (deterministic) hash family
+        permuted = (hashes[:, None] * self.a + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class DuplicateStore:
+    """Persistent record of the chunks kept by ingestion, for exact and near-duplicates.
+
+    Exact duplicates are found by `content_hash`, near-duplicates by locality
+    sensitive hashing of MinHash signatures: the signature is split into `bands`,
+    and chunks sharing any band are candidates whose estimated Jaccard similarity
+    is checked against `threshold`. Stored next to the vector database, so
+    re-runs and other processes see the same chunks.
+
+    Chunks count as kept for the current run as soon as they are added, but only
+    stay in the store once `mark_written` confirms they reached the vector store;
+    entries of failed or interrupted writes are dropped when the store is opened.
+    """
+
+    FILENAME = "chunk_hashes.sqlite3"
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        hasher: Optional[MinHasher] = None,
+        bands: int = 16,
+        threshold: float = 0.85,
+        near_duplicates: bool = True,
+    ):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError(
+                f"{self.hasher.num_perm} permutations do not split into {bands} bands"
+            )
+        self.bands = bands
+        self.threshold = threshold
+        self.near_duplicates = near_duplicates
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "content_hash TEXT PRIMARY KEY, doc_id TEXT NOT NULL, "
+            "signature BLOB, written INTEGER NOT NULL DEFAULT 0);"
+            "CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks(doc_id);"
+            "CREATE TABLE IF NOT EXISTS lsh_buckets ("
+            "bucket INTEGER NOT NULL, content_hash TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS lsh_buckets_bucket ON lsh_buckets(bucket);"
+            "CREATE INDEX IF NOT EXISTS lsh_buckets_hash ON lsh_buckets(content_hash);"
+        )
+        with self._conn:
+            self._delete("SELECT content_hash FROM chunks WHERE written = 0", ())
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        """One bucket per band; the band number is hashed in, so bands never collide."""
+        rows = len(signature) // self.bands
+        return [
+            int.from_bytes(
+                hashlib.blake2b(
+                    signature[band * rows : (band + 1) * rows].tobytes(),
+                    digest_size=8,
+                    salt=band.to_bytes(16, "little"),
+                ).digest(),
+                "little",
+                signed=True,
+            )
+            for band in range(self.bands)
+        ]
+
+    def deduplicate(self, text: str, doc_id: str) -> Optional[Tuple[str, str]]:
+        """Return `(doc_id, kind)` of a kept chunk matching `text`, or keep `text`.
+
+        `kind` is "exact" or "near". If nothing matches, `text` is recorded as a
+        kept chunk with id `doc_id` and None is returned.
+        """
+        digest = content_hash(text)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_id FROM chunks WHERE content_hash = ?", (digest,)
+            ).fetchone()
+            if row:
+                return row[0], "exact"
+
+            signature = buckets = None
+            if self.near_duplicates:
+                signature = self.hasher.signature(text)
+                buckets = self._buckets(signature)
+                match = self._near_duplicate(signature, buckets)
+                if match:
+                    return match, "near"
+
+            self._conn.execute(
+                "INSERT INTO chunks (content_hash, doc_id, signature) VALUES (?, ?, ?)",
+                (digest, doc_id, None if signature is None else signature.tobytes()),
+            )
+            if buckets:
+                self._conn.executemany(
+                    "INSERT INTO lsh_buckets (bucket, content_hash) VALUES (?, ?)",
+                    [(bucket, digest) for bucket in buckets],
+                )
+            return None
+
+    def _near_duplicate(
+        self, signature: np.ndarray, buckets: List[int]
+    ) -> Optional[str]:
+        candidates = self._conn.execute(
+            "SELECT doc_id, signature FROM chunks WHERE content_hash IN ("
+            "SELECT content_hash FROM lsh_buckets WHERE bucket IN ("
+            + ", ".join("?" for _ in buckets)
+            + ")) AND signature IS NOT NULL",
+            buckets,
+        ).fetchall()
+
+        best_id, best_similarity = None, self.threshold
+        for doc_id, blob in candidates:
+            similarity = float(
+                np.mean(np.frombuffer(blob, dtype=np.uint32) == signature)
+            )
+            if similarity >= best_similarity:
+                best_id, best_similarity = doc_id, similarity
+        return best_id
+
+    def mark_written(self, doc_ids: List[str]):
+        """Confirm that chunks were written to the vector store, and commit."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE chunks SET written = 1 WHERE doc_id = ?",
+                [(doc_id,) for doc_id in doc_ids],
+            )
+
+    def forget(self, doc_ids: List[str]):
+        """Drop chunks deleted from the vector store, so their content can return."""
+        with self._lock, self._conn:
+            for doc_id in doc_ids:
+                self._delete(
+                    "SELECT content_hash FROM chunks WHERE doc_id = ?", (doc_id,)
+                )
+
+    def _delete(self, selection: str, parameters: tuple):
+        self._conn.execute(
+            f"DELETE FROM lsh_buckets WHERE content_hash IN ({selection})", parameters
+        )
+        self._conn.execute(
+            f"DELETE FROM chunks WHERE content_hash IN ({selection})", parameters
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
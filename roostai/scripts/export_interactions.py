@@ -0,0 +1,29 @@
+import argparse
+import logging
+
+from roostai.front_end.components.store import TABLES, export_table
+from roostai.front_end.config import SurveyConfig
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Export the survey interaction store to JSONL or CSV for analysis."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--db", default=str(SurveyConfig.interactions_db))
+    parser.add_argument("--table", choices=TABLES, default="interactions")
+    parser.add_argument(
+        "--output", required=True, help="Output file; .csv for CSV, else JSONL"
+    )
+    args = parser.parse_args()
+
+    # Read-only: a mistyped --db fails instead of creating an empty store
+    try:
+        export_table(args.db, args.table, args.output)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
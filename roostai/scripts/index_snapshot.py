@@ -0,0 +1,73 @@
+__import__("pysqlite3")
+import sys
+
+sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+
+import argparse
+import asyncio
+import json
+import logging
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.snapshot import (
+    IndexSnapshot,
+    export_snapshot,
+    import_snapshot,
+)
+from roostai.back_end.chatbot.vector_store import VectorStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(args: argparse.Namespace):
+    if args.command == "info":
+        snapshot = IndexSnapshot(args.snapshot)
+        info = {key: value for key, value in snapshot.info.items() if key != "sections"}
+        print(json.dumps(info, indent=2))
+        return
+
+    store = VectorStore(collection_name=args.collection, db_path=args.db_path)
+    try:
+        if args.command == "export":
+            info = await export_snapshot(store, args.snapshot, dtype=args.dtype)
+            logger.info(
+                f"Wrote {info['count']} documents ({info['embedding_dtype']}) "
+                f"to {args.snapshot}"
+            )
+        else:
+            added = await import_snapshot(IndexSnapshot(args.snapshot), store)
+            logger.info(f"Imported {added} new documents into {args.db_path}")
+    finally:
+        await store.close()
+
+
+def main():
+    """Export a vector database to a compact snapshot file, or import one."""
+    config = Config.load_config()
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in [
+        ("export", "Write the collection at --db-path to SNAPSHOT"),
+        ("import", "Add the documents of SNAPSHOT to the collection at --db-path"),
+    ]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("snapshot")
+        command.add_argument("--db-path", default=config.vector_db.db_path)
+        command.add_argument("--collection", default=config.vector_db.collection_name)
+    commands.choices["export"].add_argument(
+        "--dtype",
+        choices=["int8", "float16"],
+        default="int8",
+        help="Embedding precision (int8 stores a float32 scale per row)",
+    )
+    commands.add_parser("info", help="Print the header of SNAPSHOT").add_argument(
+        "snapshot"
+    )
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckpointState:
+    directory: str
+    status: str = "running"  # "running" until the run finishes, then "complete"
+    started_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    batches_committed: int = 0
+    documents_committed: int = 0
+    files_committed: int = 0
+    last_file: Optional[str] = None  # Last file whose chunks were all written
+    resumed: int = 0  # Times the run was resumed
+
+
+class IngestionCheckpoint:
+    """Progress of an ingestion run, saved atomically next to the vector database.
+
+    Saved after every committed batch by writing a temporary file and renaming it
+    over `ingestion_checkpoint.json`, so a crash or preemption leaves either the
+    previous or the new checkpoint, never a partial one. Which files are fully
+    ingested is recorded by the manifest; the checkpoint adds the run they belong
+    to (`started_at`), so a resumed run can skip them even when re-ingesting
+    everything.
+    """
+
+    FILENAME = "ingestion_checkpoint.json"
+
+    def __init__(self, db_path: str, state: CheckpointState):
+        self.path = Path(db_path) / self.FILENAME
+        self.state = state
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, db_path: str) -> Optional["IngestionCheckpoint"]:
+        path = Path(db_path) / cls.FILENAME
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(db_path, CheckpointState(**json.load(f)))
+
+    @classmethod
+    def start(
+        cls, db_path: str, directory: str, resume: bool = False
+    ) -> "IngestionCheckpoint":
+        """Continue the interrupted run over `directory` if `resume`, else start a new one."""
+        previous = cls.load(db_path)
+        if (
+            resume
+            and previous is not None
+            and previous.state.directory == directory
+            and previous.state.status == "running"
+        ):
+            previous.state.resumed += 1
+            previous.save()
+            return previous
+
+        if previous is not None and previous.state.status == "running":
+            logger.warning(
+                f"Previous ingestion of {previous.state.directory} into {db_path} was "
+                "interrupted; starting a new run (use --resume to continue it)"
+            )
+
+        checkpoint = cls(db_path, CheckpointState(directory=directory))
+        checkpoint.save()
+        return checkpoint
+
+    @property
+    def is_resumed(self) -> bool:
+        return self.state.resumed > 0
+
+    def batch_committed(self, documents: int):
+        with self._lock:
+            self.state.batches_committed += 1
+            self.state.documents_committed += documents
+            self._save()
+
+    def file_committed(self, key: str):
+        with self._lock:
+            self.state.files_committed += 1
+            self.state.last_file = key
+
+    def complete(self):
+        with self._lock:
+            self.state.status = "complete"
+            self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        self.state.updated_at = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(asdict(self.state), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return asdict(self.state)
@@ -0,0 +1,236 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class FileState:
+    path: Path
+    key: str  # Path relative to the ingested directory
+    content_hash: str
+    mtime_ns: int
+    size: int
+
+
+@dataclass
+class ScanResult:
+    changed: List[FileState]  # New or modified files that need to be ingested
+    unchanged: int
+    removed: List[str]  # Keys of files in the manifest that no longer exist
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """Which source files were ingested into a vector store, and as which chunks.
+
+    Stored as SQLite next to the Chroma files of the database. Every ingested file
+    has its content hash and the ids of all its chunks; a chunk id shared by
+    several files (e.g. common boilerplate) is only deleted from the collection
+    once no file references it anymore. Ids that lost a reference are kept in
+    `pending_deletes` until they are deleted, so an interrupted run does not
+    leave orphaned chunks behind.
+    """
+
+    FILENAME = "ingestion_manifest.sqlite3"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "key TEXT PRIMARY KEY, content_hash TEXT NOT NULL, mtime_ns INTEGER, "
+            "size INTEGER, ingested_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS file_chunks ("
+            "key TEXT NOT NULL, chunk_id TEXT NOT NULL, PRIMARY KEY (key, chunk_id));"
+            "CREATE INDEX IF NOT EXISTS file_chunks_chunk ON file_chunks(chunk_id);"
+            "CREATE TABLE IF NOT EXISTS pending_deletes (chunk_id TEXT PRIMARY KEY);"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def for_db(cls, db_path: str) -> "IngestionManifest":
+        return cls(str(Path(db_path) / cls.FILENAME))
+
+    def scan(
+        self,
+        directory: Path,
+        files: List[Path],
+        force: bool = False,
+        ingested_since: Optional[float] = None,
+    ) -> ScanResult:
+        """Compare the files of `directory` with the manifest.
+
+        Files whose size and modification time match the manifest are not read;
+        others are hashed, and only count as changed if their content differs.
+        With `force`, every file counts as changed, except files ingested at or
+        after `ingested_since` (i.e. earlier in the run being resumed).
+        """
+        with self._lock:
+            known: Dict[str, Tuple[str, int, int]] = {}
+            resumed = set()
+            for key, content_hash, mtime_ns, size, ingested_at in self._conn.execute(
+                "SELECT key, content_hash, mtime_ns, size, ingested_at FROM files"
+            ):
+                known[key] = (content_hash, mtime_ns, size)
+                if ingested_since is not None and ingested_at >= ingested_since:
+                    resumed.add(key)
+
+        changed = []
+        unchanged = 0
+        seen = set()
+        for path in files:
+            key = str(path.relative_to(directory))
+            seen.add(key)
+            stat = path.stat()
+            entry = known.get(key)
+            forced = force and key not in resumed
+            if not forced and entry and entry[1:] == (stat.st_mtime_ns, stat.st_size):
+                unchanged += 1
+                continue
+
+            state = FileState(
+                path, key, hash_file(path), stat.st_mtime_ns, stat.st_size
+            )
+            if not forced and entry and entry[0] == state.content_hash:
+                # Touched but identical: remember the new stat, skip the content
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE key = ?",
+                        (state.mtime_ns, state.size, key),
+                    )
+                unchanged += 1
+                continue
+            changed.append(state)
+
+        return ScanResult(changed, unchanged, sorted(known.keys() - seen))
+
+    def record_file(self, state: FileState, chunk_ids: List[str]):
+        """Store the chunks a file was ingested as, replacing its previous entry."""
+        with self._lock, self._conn:
+            self._release_chunks(state.key)
+            self._conn.execute(
+                "INSERT INTO files (key, content_hash, mtime_ns, size, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    state.key,
+                    state.content_hash,
+                    state.mtime_ns,
+                    state.size,
+                    time.time(),
+                ),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO file_chunks (key, chunk_id) VALUES (?, ?)",
+                [(state.key, chunk_id) for chunk_id in chunk_ids],
+            )
+
+    def remove_file(self, key: str):
+        """Forget a file that no longer exists; its chunks become deletion candidates."""
+        with self._lock, self._conn:
+            self._release_chunks(key)
+
+    def _release_chunks(self, key: str):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO pending_deletes (chunk_id) "
+            "SELECT chunk_id FROM file_chunks WHERE key = ?",
+            (key,),
+        )
+        self._conn.execute("DELETE FROM file_chunks WHERE key = ?", (key,))
+        self._conn.execute("DELETE FROM files WHERE key = ?", (key,))
+
+    def exclusive_chunks(self, keys: List[str]) -> List[str]:
+        """Chunk ids that no file other than `keys` references."""
+        with self._lock:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS scan_keys (key TEXT PRIMARY KEY)"
+            )
+            self._conn.execute("DELETE FROM scan_keys")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO scan_keys (key) VALUES (?)",
+                [(key,) for key in keys],
+            )
+            chunk_ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT DISTINCT chunk_id FROM file_chunks "
+                    "WHERE key IN (SELECT key FROM scan_keys) AND chunk_id NOT IN "
+                    "(SELECT chunk_id FROM file_chunks "
+                    "WHERE key NOT IN (SELECT key FROM scan_keys))"
+                )
+            ]
+            self._conn.execute("DELETE FROM scan_keys")
+            self._conn.commit()
+            return chunk_ids
+
+    def unreferenced_chunks(self) -> List[str]:
+        """Chunk ids released by changed or removed files that no file uses anymore."""
+        with self._lock:
+            return [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT chunk_id FROM pending_deletes WHERE chunk_id NOT IN "
+                    "(SELECT chunk_id FROM file_chunks)"
+                )
+            ]
+
+    def clear_pending(self):
+        """Forget the deletion candidates once unreferenced ones were deleted."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending_deletes")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FileProgress:
+    """Track when every unique chunk of a file has been written to the vector store.
+
+    `on_complete(state, chunk_ids)` is called once the last pending chunk of a file
+    was written, so the manifest only lists files that are fully ingested.
+    """
+
+    def __init__(self, on_complete: Callable[[FileState, List[str]], None]):
+        self.on_complete = on_complete
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[FileState, List[str], int]] = {}
+
+    def add(self, state: FileState, chunk_ids: List[str], pending_chunks: int):
+        """Register a file whose `pending_chunks` unique chunks were queued for writing."""
+        if pending_chunks == 0:
+            self.on_complete(state, chunk_ids)
+            return
+        with self._lock:
+            self._pending[state.key] = (state, chunk_ids, pending_chunks)
+
+    def written(self, keys: List[str]):
+        """Report written chunks, one file key per chunk."""
+        completed = []
+        with self._lock:
+            for key in keys:
+                state, chunk_ids, remaining = self._pending[key]
+                if remaining == 1:
+                    del self._pending[key]
+                    completed.append((state, chunk_ids))
+                else:
+                    self._pending[key] = (state, chunk_ids, remaining - 1)
+        for state, chunk_ids in completed:
+            self.on_complete(state, chunk_ids)
+
+    @property
+    def incomplete(self) -> int:
+        return len(self._pending)
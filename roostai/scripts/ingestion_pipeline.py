@@ -0,0 +1,188 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class PipelineStage:
+    """One step of a `StreamingPipeline`.
+
+    `process` is called for every input item and returns the items to pass on
+    (possibly none). `flush` is called once after the last input, e.g. to emit a
+    partially filled batch; stages with a `flush` (or other state) should use a
+    single worker.
+    """
+
+    name: str
+    process: Callable[[Any], Iterable[Any]]
+    workers: int = 1
+    flush: Optional[Callable[[], Iterable[Any]]] = None
+
+
+@dataclass
+class StageStats:
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0  # Summed over the stage's workers
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, items_out: int, seconds: float, error: bool = False):
+        with self._lock:
+            self.items_in += 1
+            self.items_out += items_out
+            self.busy_seconds += seconds
+            self.errors += error
+
+
+class StreamingPipeline:
+    """Run stages concurrently, connected by bounded queues.
+
+    Every stage runs in its own worker threads and reads from the queue filled by
+    the previous stage, so disk reads, embedding and database writes overlap. The
+    bounded queues apply back-pressure: a fast stage blocks once the next stage
+    falls `queue_size` items behind. Throughput and queue depths are logged every
+    `report_interval` seconds; the queue in front of the bottleneck stage is the
+    one that stays full.
+    """
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        queue_size: int = 8,
+        report_interval: float = 30.0,
+    ):
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.stats = [StageStats(stage.name) for stage in stages]
+        self.report_interval = report_interval
+
+    def run(self, inputs: Iterable[Any]) -> Dict[str, Any]:
+        """Feed `inputs` through all stages and wait until they are processed."""
+        start = time.monotonic()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(index, remaining, lock),
+                    name=f"{stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        stop_reporting = threading.Event()
+        reporter = threading.Thread(
+            target=self._report, args=(start, stop_reporting), daemon=True
+        )
+        reporter.start()
+
+        for item in inputs:
+            self.queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            self.queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        stop_reporting.set()
+        reporter.join()
+
+        summary = self.summary(time.monotonic() - start)
+        self._log_summary(summary)
+        return summary
+
+    def _work(self, index: int, remaining: List[int], lock: threading.Lock):
+        stage = self.stages[index]
+        stats = self.stats[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.stages) else None
+
+        def _emit(items: Optional[Iterable[Any]]) -> int:
+            count = 0
+            for item in items or ():
+                count += 1
+                if outbox is not None:
+                    outbox.put(item)
+            return count
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            started = time.monotonic()
+            try:
+                produced = _emit(stage.process(item))
+                stats.record(produced, time.monotonic() - started)
+            except Exception as e:
+                logger.error(f"Stage {stage.name} failed on an item: {e}")
+                stats.record(0, time.monotonic() - started, error=True)
+
+        with lock:
+            remaining[0] -= 1
+            last_worker = remaining[0] == 0
+        if not last_worker:
+            return
+
+        # The last worker of a stage flushes it and ends the next stage's input
+        if stage.flush is not None:
+            try:
+                stats.items_out += _emit(stage.flush())
+            except Exception as e:
+                logger.error(f"Stage {stage.name} failed to flush: {e}")
+        if outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                outbox.put(_DONE)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "elapsed_seconds": elapsed,
+            "stages": {
+                stats.name: {
+                    "items_in": stats.items_in,
+                    "items_out": stats.items_out,
+                    "errors": stats.errors,
+                    "items_per_second": stats.items_in / elapsed if elapsed else 0.0,
+                    # Fraction of wall time the stage's workers were busy
+                    "utilization": (
+                        stats.busy_seconds / (elapsed * stage.workers)
+                        if elapsed
+                        else 0.0
+                    ),
+                    "queue_depth": inbox.qsize(),
+                }
+                for stage, stats, inbox in zip(self.stages, self.stats, self.queues)
+            },
+        }
+
+    def _report(self, start: float, stop: threading.Event):
+        while not stop.wait(self.report_interval):
+            summary = self.summary(time.monotonic() - start)
+            logger.info(
+                "Pipeline: "
+                + ", ".join(
+                    f"{name} {s['items_per_second']:.1f}/s "
+                    f"(busy {s['utilization']:.0%}, queued {s['queue_depth']})"
+                    for name, s in summary["stages"].items()
+                )
+            )
+
+    def _log_summary(self, summary: Dict[str, Any]):
+        logger.info(f"Pipeline finished in {summary['elapsed_seconds']:.1f}s")
+        for name, s in summary["stages"].items():
+            logger.info(
+                f"  {name}: {s['items_in']} in, {s['items_out']} out, "
+                f"{s['errors']} errors, {s['items_per_second']:.1f}/s, "
+                f"busy {s['utilization']:.0%}"
+            )
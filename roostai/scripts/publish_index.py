@@ -0,0 +1,48 @@
+import argparse
+import logging
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.index_manager import (
+    IndexPointer,
+    read_index_pointer,
+    write_index_pointer,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Point the running chatbot at a new index version (blue/green switch)."""
+    config = Config.load_config()
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("version", help="Label of the new index version")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db-path", help="Chroma database directory to serve")
+    source.add_argument("--snapshot", help="Snapshot file to serve")
+    parser.add_argument("--collection", default=config.vector_db.collection_name)
+    parser.add_argument(
+        "--pointer",
+        default=config.vector_db.index_pointer,
+        help="Pointer file the chatbot watches (vector_db.index_pointer)",
+    )
+    args = parser.parse_args()
+    if not args.pointer:
+        parser.error("no --pointer given and vector_db.index_pointer is not set")
+
+    pointer = IndexPointer(
+        version=args.version,
+        db_path=args.db_path,
+        snapshot_path=args.snapshot,
+        collection_name=args.collection,
+    )
+    try:
+        previous = read_index_pointer(args.pointer).version
+    except (OSError, ValueError, TypeError):
+        previous = None
+    write_index_pointer(args.pointer, pointer)
+    logger.info(f"Index pointer {args.pointer}: {previous} -> {pointer.version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, List
+
+from roostai.back_end.chatbot.config import Config
+from roostai.back_end.chatbot.faq_index import load_faq_pairs
+from roostai.back_end.chatbot.thread_tuning import host_fingerprint
+from roostai.back_end.chatbot.warmup import resolve_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _bench_worker(
+    config: Config,
+    intra_op: int,
+    inter_op: int,
+    duration: float,
+    queries: List[str],
+    passages: List[str],
+    ready,
+    start,
+    results,
+):
+    """Measure embedding + cross-encoder throughput in a fresh process."""
+    import torch
+    from sentence_transformers import CrossEncoder, SentenceTransformer
+
+    # Thread counts must be set before any parallel work happens in the process
+    torch.set_num_threads(intra_op)
+    torch.set_num_interop_threads(inter_op)
+
+    embedder = SentenceTransformer(config.model.embedding_model)
+    cross_encoder = CrossEncoder(config.model.cross_encoder_model)
+    top_k = config.vector_db.top_k
+
+    def unit(i: int):
+        # One query's worth of model work in `process_query`
+        query = queries[i % len(queries)]
+        embedder.encode(query)
+        candidates = [passages[(i + j) % len(passages)] for j in range(top_k)]
+        cross_encoder.predict([[query, passage] for passage in candidates])
+
+    unit(0)  # Warm up outside the measured window
+    ready.put(os.getpid())
+    start.wait()
+
+    latencies = []
+    begin = time.perf_counter()
+    while time.perf_counter() - begin < duration:
+        unit_start = time.perf_counter()
+        unit(len(latencies))
+        latencies.append(time.perf_counter() - unit_start)
+    results.put(latencies)
+
+
+def run_configuration(
+    config: Config,
+    num_workers: int,
+    intra_op: int,
+    inter_op: int,
+    duration: float,
+    queries: List[str],
+    passages: List[str],
+) -> Dict[str, Any]:
+    """Run `num_workers` concurrent benchmark processes with the given thread counts."""
+    # Spawn rather than fork: every process needs its own, untouched torch runtime
+    context = multiprocessing.get_context("spawn")
+    ready, results, start = context.Queue(), context.Queue(), context.Event()
+    processes = [
+        context.Process(
+            target=_bench_worker,
+            args=(
+                config,
+                intra_op,
+                inter_op,
+                duration,
+                queries,
+                passages,
+                ready,
+                start,
+                results,
+            ),
+        )
+        for _ in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+
+    start.set()
+    latencies = sorted(
+        latency for _ in processes for latency in results.get(timeout=duration + 120)
+    )
+    for process in processes:
+        process.join()
+
+    return {
+        "num_workers": num_workers,
+        "intra_op_threads": intra_op,
+        "inter_op_threads": inter_op,
+        "queries_per_second": len(latencies) / duration,
+        "latency_p50": latencies[len(latencies) // 2],
+        "latency_p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+
+def _candidates(max_value: int) -> List[int]:
+    """Powers of two up to `max_value`, plus `max_value` itself."""
+    values = [1]
+    while values[-1] * 2 <= max_value:
+        values.append(values[-1] * 2)
+    if values[-1] != max_value:
+        values.append(max_value)
+    return values
+
+
+def main():
+    """Benchmark torch thread and worker counts and record the best setting."""
+    config = Config.load_config()
+    cpu_count = os.cpu_count() or 1
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=_candidates(cpu_count)
+    )
+    parser.add_argument(
+        "--intra-op", type=int, nargs="+", default=_candidates(cpu_count)
+    )
+    parser.add_argument("--inter-op", type=int, nargs="+", default=[1, 2])
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per configuration"
+    )
+    parser.add_argument("--output", default=config.runtime.thread_settings_path)
+    args = parser.parse_args()
+
+    pairs = load_faq_pairs(config.faq.faq_files) or [
+        ("What majors does USC offer?", "USC offers more than 350 degree programs.")
+    ]
+    queries = [question for question, _ in pairs]
+    passages = [answer for _, answer in pairs]
+
+    # Oversubscribed configurations only add noise
+    combinations = [
+        (num_workers, intra_op, inter_op)
+        for num_workers, intra_op, inter_op in itertools.product(
+            args.workers, args.intra_op, args.inter_op
+        )
+        if num_workers * intra_op <= cpu_count
+    ]
+    if not combinations:
+        parser.error(
+            f"every combination of --workers and --intra-op uses more than the "
+            f"{cpu_count} CPUs of this host; pick smaller values"
+        )
+
+    table = []
+    for num_workers, intra_op, inter_op in combinations:
+        result = run_configuration(
+            config, num_workers, intra_op, inter_op, args.duration, queries, passages
+        )
+        logger.info(
+            f"workers={num_workers} intra={intra_op} inter={inter_op}: "
+            f"{result['queries_per_second']:.1f} q/s, "
+            f"p50 {result['latency_p50'] * 1000:.0f} ms, "
+            f"p95 {result['latency_p95'] * 1000:.0f} ms"
+        )
+        table.append(result)
+
+    def _best(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return max(rows, key=lambda r: (r["queries_per_second"], -r["latency_p95"]))
+
+    best = _best(table)
+    # A single process (no pre-fork workers) should use the best single-worker threads
+    single_process = [r for r in table if r["num_workers"] == 1]
+    best_single_process = _best(single_process) if single_process else best
+    logger.info(f"Best setting: {best}")
+    logger.info(f"Best single-process setting: {best_single_process}")
+
+    output = resolve_path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "host": host_fingerprint(),
+                "models": [
+                    config.model.embedding_model,
+                    config.model.cross_encoder_model,
+                ],
+                "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "best": best,
+                "best_single_process": best_single_process,
+                "results": table,
+            },
+            f,
+            indent=2,
+        )
+    logger.info(f"Saved thread settings to {output}")
+
+
+if __name__ == "__main__":
+    main()